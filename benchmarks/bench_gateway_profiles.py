@@ -0,0 +1,178 @@
+# Archivo: benchmarks/bench_gateway_profiles.py
+# Mide la memoria (RSS) y el tiempo hasta on_ready de cada perfil de gateway con un servidor
+# sintético de 10.000 miembros, sin conectarse a Discord.
+#
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.bench_gateway_profiles
+#   python -m benchmarks.bench_gateway_profiles --members 50000 --messages 20000
+#
+# Cada perfil se mide en un proceso aparte para que el RSS de uno no afecte al siguiente. Los
+# eventos del gateway (READY, GUILD_CREATE, GUILD_MEMBERS_CHUNK, MESSAGE_CREATE) se entregan
+# directamente al estado interno de discord.py; la descarga de miembros responde de a 1000 por
+# chunk, como Discord.
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import discord
+from discord.ext import commands
+
+from utils.gateway_profile import PROFILES, gateway_options
+
+GUILD_ID = 1_000
+CHANNEL_ID = 2_000
+BOT_ID = 3_000
+CHUNK_SIZE = 1000  # Miembros por GUILD_MEMBERS_CHUNK, igual que Discord
+
+
+def rss_mib() -> float:
+    """RSS actual del proceso en MiB (Linux), o el máximo si /proc no está disponible."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def user_payload(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"estudiante{user_id}", "discriminator": "0", "global_name": None, "avatar": None}
+
+
+def member_payload(user_id: int) -> dict:
+    return {"user": user_payload(user_id), "roles": [], "joined_at": "2025-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_payload(members: int) -> dict:
+    return {
+        "id": str(GUILD_ID), "name": "Servidor sintético", "icon": None, "owner_id": str(BOT_ID + 1),
+        "member_count": members, "large": True, "unavailable": False,
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                   "hoist": False, "managed": False, "mentionable": False, "flags": 0}],
+        "channels": [{"id": str(CHANNEL_ID), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        "members": [member_payload(BOT_ID)],
+        "voice_states": [], "presences": [], "threads": [], "emojis": [], "stickers": [], "features": [],
+        "stage_instances": [], "guild_scheduled_events": [], "soundboard_sounds": [],
+    }
+
+
+def message_payload(index: int, members: int) -> dict:
+    author_id = BOT_ID + 1 + index % members
+    return {
+        "id": str(10_000_000 + index), "channel_id": str(CHANNEL_ID), "guild_id": str(GUILD_ID),
+        "author": user_payload(author_id), "member": {k: v for k, v in member_payload(author_id).items() if k != "user"},
+        "content": f"Mensaje {index} de ejemplo", "timestamp": "2025-01-01T00:00:00+00:00", "edited_timestamp": None,
+        "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+        "embeds": [], "pinned": False, "type": 0,
+    }
+
+
+class FakeWebSocket:
+    """Responde a las peticiones de miembros con GUILD_MEMBERS_CHUNK sintéticos."""
+    def __init__(self, state, members: int):
+        self.state = state
+        self.members = members
+        self.requests = 0
+        self.tasks = []
+
+    async def request_chunks(self, guild_id, query=None, *, limit=0, user_ids=None, presences=False, nonce=None):
+        # Como en Discord, los chunks llegan después de que la petición se envió
+        self.requests += 1
+        self.tasks.append(asyncio.create_task(self._send_chunks(guild_id, nonce)))
+
+    async def _send_chunks(self, guild_id, nonce):
+        chunk_count = (self.members + CHUNK_SIZE - 1) // CHUNK_SIZE
+        for index in range(chunk_count):
+            await asyncio.sleep(0)  # Cada chunk llega como un evento aparte
+            start = BOT_ID + 1 + index * CHUNK_SIZE
+            end = BOT_ID + 1 + min(self.members, (index + 1) * CHUNK_SIZE)
+            self.state.parse_guild_members_chunk({
+                "guild_id": str(guild_id), "members": [member_payload(i) for i in range(start, end)],
+                "chunk_index": index, "chunk_count": chunk_count, "nonce": nonce,
+            })
+
+
+async def run_profile(profile: str, members: int, messages: int) -> dict:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    intents.guilds = True
+    bot = commands.Bot(command_prefix='&', intents=intents, guild_ready_timeout=0.05,
+                       **gateway_options(profile, intents))
+    await bot._async_setup_hook()  # Lo que hace `login` antes de conectarse (prepara el loop del estado)
+    state = bot._connection
+    ws = FakeWebSocket(state, members)
+    state._get_websocket = lambda guild_id=None, shard_id=None: ws
+
+    baseline = rss_mib()
+    ready = asyncio.Event()
+
+    async def on_ready():
+        ready.set()
+    bot.add_listener(on_ready, 'on_ready')
+    start = time.perf_counter()
+    state.parse_ready({"user": user_payload(BOT_ID) | {"bot": True}, "guilds": [{"id": str(GUILD_ID), "unavailable": True}],
+                       "session_id": "benchmark", "application": {"id": str(BOT_ID), "flags": 0}})
+    state.parse_guild_create(guild_payload(members))
+    await ready.wait()
+    # El ready espera `guild_ready_timeout` tras el último GUILD_CREATE; se descuenta para
+    # comparar solo el trabajo de cada perfil (en producción son 2 s fijos en todos los perfiles).
+    time_to_ready = time.perf_counter() - start - state.guild_ready_timeout
+
+    for index in range(messages):
+        state.parse_message_create(message_payload(index, members))
+        if index % 500 == 0:
+            await asyncio.sleep(0)
+
+    guild = bot.get_guild(GUILD_ID)
+    result = {
+        "profile": profile,
+        "time_to_ready_ms": time_to_ready * 1000,
+        "rss_mib": rss_mib() - baseline,
+        "cached_members": len(guild.members),
+        "cached_messages": len(bot.cached_messages),
+        "chunk_requests": ws.requests,
+    }
+    await bot.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de perfiles de gateway.")
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=5_000,
+                        help="Mensajes que llegan después del ready (llenan la caché de mensajes).")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="Mide un solo perfil en este proceso (uso interno).")
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(asyncio.run(run_profile(args.profile, args.members, args.messages))))
+        return
+
+    results = []
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_gateway_profiles", "--profile", profile,
+             "--members", str(args.members), "--messages", str(args.messages)],
+            check=True, capture_output=True, text=True, cwd=os.getcwd(),
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Servidor sintético: {args.members} miembros, {args.messages} mensajes tras el ready")
+    print(f"{'perfil':<10} {'ready':>10} {'RSS extra':>11} {'miembros':>10} {'mensajes':>10} {'chunks':>7}")
+    for r in results:
+        print(f"{r['profile']:<10} {r['time_to_ready_ms']:>8.0f}ms {r['rss_mib']:>8.1f}MiB "
+              f"{r['cached_members']:>10} {r['cached_messages']:>10} {r['chunk_requests']:>7}")
+
+
+if __name__ == "__main__":
+    main()
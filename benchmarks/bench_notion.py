@@ -0,0 +1,380 @@
+# Archivo: benchmarks/bench_notion.py
+# Escenarios de carga contra el Notion falso (benchmarks/fake_notion.py): miden `DBManager`,
+# `notion_utils` y los cogs que usan Notion sin credenciales reales ni conexión a Discord.
+#
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.bench_notion
+#   python -m benchmarks.bench_notion --scenario catalogo --latency 0.2 --rate-limit-ratio 0.05
+#   python -m benchmarks.bench_notion --rate 3 --burst 3   # Con el límite real de Notion
+#   python -m benchmarks.bench_notion --json resultados.json
+#
+# Escenarios:
+#   catalogo   - Sesiones del menú de recursos (dificultad → categoría → subcategoría → recursos)
+#                sobre un catálogo de 1.000 recursos, con varias sesiones a la vez.
+#   programados - Una pasada de `ScheduledMessageTask` con 500 mensajes vencidos.
+#   voz        - Un día de actividad: 5.000 eventos de voz por `Events.on_voice_state_update`.
+#   reporte    - El reporte diario de `ScheduledMessageTask` sobre el día de actividad.
+#
+# Por defecto el limitador de peticiones permite 1.000 por segundo para medir el código del bot
+# y no el límite de Notion; `--rate 3 --burst 3` reproduce el límite real.
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+
+# IDs de las bases falsas y de los canales. Se definen antes de importar `config`, que los lee
+# del entorno al importarse.
+RESOURCES_DB = "recursos-falsos"
+MESSAGES_DB = "mensajes-falsos"
+ACTIVITY_DB = "actividad-falsa"
+VOICE_CHANNEL_ID = 500
+REPORT_CHANNEL_ID = 600
+SCHEDULED_CHANNEL_ID = 700
+DATA_DIR = tempfile.mkdtemp(prefix="bench-notion-")
+os.environ.update({
+    "NOTION_TOKEN": "token-falso",
+    "NOTION_DATABASE_ID": RESOURCES_DB,
+    "NOTION_DATABASE_MENSAJES_ID": MESSAGES_DB,
+    "NOTION_DATABASE_ACTIVIDAD_ID": ACTIVITY_DB,
+    "COWORKING_CHANNEL_ID": str(VOICE_CHANNEL_ID),
+    "TEST_CHANNEL_ID": str(REPORT_CHANNEL_ID),
+    "DATA_DIR": DATA_DIR,
+})
+
+import config
+from benchmarks.fake_notion import FakeNotion, rich_text
+from cogs.events import Events
+from cogs.scheduled_message_task import ScheduledMessageTask
+from database.db_manager import DBManager
+from utils import metrics
+from utils.lifecycle import Lifecycle
+from utils.notion_limiter import LANE_INTERACTIVE
+from utils.notion_service import NotionService
+
+DIFFICULTIES = ["basico", "intermedio", "avanzado"]
+CATEGORIES = ["neurociencia", "memoria", "atencion", "lenguaje", "emociones", "sueno", "aprendizaje", "metodos"]
+SUBCATEGORIES = ["lecturas", "videos", "ejercicios", "podcasts"]
+FREQUENCIES = ["unico", "diario", "semanal"]
+
+
+# --- DATOS ---
+
+def seed_catalog(notion: FakeNotion, resources: int, rng: random.Random):
+    for index in range(resources):
+        category = rng.choice(CATEGORIES)
+        notion.add_page(RESOURCES_DB, {
+            "resource_name": {"title": rich_text(f"recurso {index}")},
+            "link": {"url": f"https://example.com/recursos/{index}"},
+            "category": {"select": {"name": category}},
+            "subcategory": {"select": {"name": rng.choice(SUBCATEGORIES)}},
+            "difficulty": {"select": {"name": rng.choice(DIFFICULTIES)}},
+        })
+
+
+def seed_scheduled(notion: FakeNotion, messages: int, rng: random.Random):
+    due = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(time.time() - 3600))
+    for index in range(messages):
+        notion.add_page(MESSAGES_DB, {
+            "cuerpo": {"title": rich_text(f"Recordatorio {index}")},
+            "fecha": {"date": {"start": due}},
+            "canal": {"rich_text": rich_text(str(SCHEDULED_CHANNEL_ID))},
+            "frecuencia": {"select": {"name": rng.choice(FREQUENCIES)}},
+            "activo": {"checkbox": True},
+            "enviado": {"checkbox": False},
+        })
+
+
+# --- OBJETOS DE DISCORD SIMULADOS ---
+
+class FakeMember:
+    def __init__(self, member_id: int):
+        self.id = member_id
+        self.bot = False
+        self.display_name = f"estudiante{member_id}"
+
+
+class FakeGuild:
+    def get_member(self, member_id: int):
+        return FakeMember(member_id)
+
+    async def fetch_member(self, member_id: int):
+        return FakeMember(member_id)
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, name: str, latency: float = 0.0):
+        self.id = channel_id
+        self.name = name
+        self.guild = FakeGuild()
+        self.latency = latency
+        self.sent = []
+
+    async def send(self, content=None, *, embed=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append(embed if embed is not None else content)
+
+
+class FakeVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+
+class BenchBot:
+    """Lo que los cogs usan de `bot`: Notion, DBManager, lifecycle y la búsqueda de canales."""
+    def __init__(self, notion: NotionService, db_manager: DBManager, discord_latency: float):
+        self.notion = notion
+        self.db_manager = db_manager
+        self.lifecycle = Lifecycle(self, os.path.join(DATA_DIR, "warm_start.json.gz"))
+        self.channels = {
+            SCHEDULED_CHANNEL_ID: FakeChannel(SCHEDULED_CHANNEL_ID, "anuncios", discord_latency),
+            REPORT_CHANNEL_ID: FakeChannel(REPORT_CHANNEL_ID, "reportes", discord_latency),
+        }
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def wait_until_ready(self):
+        # Las tareas de los cogs nunca arrancan solas: cada escenario llama a su iteración
+        await asyncio.Event().wait()
+
+    async def fetch_user(self, user_id: int):
+        return FakeMember(user_id)
+
+
+def build(base_url: str, args) -> BenchBot:
+    service = NotionService(
+        config.NOTION_TOKEN, max_connections=args.connections, rate_per_second=args.rate,
+        burst=args.burst, max_retries=config.NOTION_MAX_RETRIES, base_url=base_url,
+    )
+    ttl = 0 if args.no_cache else None
+    db_manager = DBManager(
+        service,
+        resources_ttl=config.NOTION_CACHE_RESOURCES_TTL if ttl is None else ttl,
+        catalog_ttl=config.NOTION_CACHE_CATALOG_TTL if ttl is None else ttl,
+    )
+    return BenchBot(service, db_manager, args.discord_latency)
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """Silencia los `print` del bot (uno por página en algunas consultas) durante la medición."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# --- ESCENARIOS ---
+
+async def scenario_catalog(bot: BenchBot, notion: FakeNotion, args, rng: random.Random) -> dict:
+    seed_catalog(notion, args.resources, rng)
+    db = bot.db_manager
+    latencies = []
+
+    async def session():
+        start = time.perf_counter()
+        difficulties = await bot.notion.run(LANE_INTERACTIVE, db.get_distinct_difficulties)
+        difficulty = rng.choice(difficulties)
+        categories = await bot.notion.run(LANE_INTERACTIVE, db.get_distinct_categories, difficulty=difficulty)
+        category = rng.choice(categories)
+        await bot.notion.run(LANE_INTERACTIVE, db.get_distinct_subcategories, difficulty=difficulty, category=category)
+        await bot.notion.run(LANE_INTERACTIVE, db.get_resources, category=category, difficulty=difficulty)
+        latencies.append(time.perf_counter() - start)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited():
+        async with semaphore:
+            await session()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    cache = db.cache.stats()
+    return {
+        "operations": args.sessions, "unit": "sesiones", "elapsed": elapsed, "latencies": latencies,
+        "extra": f"{args.resources} recursos · caché {cache['hit_ratio']:.0%} aciertos",
+    }
+
+
+async def scenario_scheduled(bot: BenchBot, notion: FakeNotion, args, rng: random.Random) -> dict:
+    seed_scheduled(notion, args.scheduled, rng)
+    cog = ScheduledMessageTask(bot)
+    cog.cog_unload()  # Sin el bucle automático: se ejecuta una pasada a mano
+    channel = bot.channels[SCHEDULED_CHANNEL_ID]
+    start = time.perf_counter()
+    await cog.send_scheduled_messages()
+    elapsed = time.perf_counter() - start
+    pending = sum(1 for page in notion.databases[MESSAGES_DB] if not page["properties"]["enviado"]["checkbox"])
+    return {
+        "operations": len(channel.sent), "unit": "mensajes", "elapsed": elapsed,
+        "latencies": notion_latencies("DBManager.mark_message_as_sent", "DBManager.reschedule_message"),
+        "extra": f"{len(channel.sent)} de {args.scheduled} enviados · {pending} quedan pendientes en Notion (diarios/semanales reprogramados)",
+    }
+
+
+async def scenario_voice(bot: BenchBot, notion: FakeNotion, args, rng: random.Random) -> dict:
+    cog = Events(bot)
+    cog.cog_unload()
+    voice = FakeChannel(VOICE_CHANNEL_ID, "coworking")
+    empty = FakeVoiceState(None)
+    inside = FakeVoiceState(voice)
+    members = [FakeMember(10_000 + index) for index in range(args.members)]
+    connected = set()
+    latencies = []
+    interval = 1 / args.event_rate if args.event_rate else 0
+
+    async def event(member):
+        # Cada miembro alterna entre entrar y salir del canal
+        joining = member.id not in connected
+        (connected.add if joining else connected.discard)(member.id)
+        start = time.perf_counter()
+        await cog.on_voice_state_update(member, empty if joining else inside, inside if joining else empty)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tasks = []
+    for index in range(args.voice_events):
+        tasks.append(asyncio.create_task(event(rng.choice(members))))
+        if interval:
+            await asyncio.sleep(interval)
+        elif index % args.concurrency == 0:
+            await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {
+        "operations": args.voice_events, "unit": "eventos", "elapsed": elapsed, "latencies": latencies,
+        "extra": f"{len(notion.databases[ACTIVITY_DB])} registros en Notion · {cog.spool.pending} guardados en disco para reenviar",
+    }
+
+
+async def scenario_report(bot: BenchBot, notion: FakeNotion, args, rng: random.Random) -> dict:
+    if not notion.databases[ACTIVITY_DB]:
+        # Si no se ejecutó el escenario de voz, se genera un día de actividad directamente
+        today = time.strftime("%Y-%m-%d")
+        for index in range(args.voice_events):
+            member_id = 10_000 + rng.randrange(args.members)
+            notion.add_page(ACTIVITY_DB, {
+                "id_member": {"title": rich_text(str(member_id))},
+                "fecha_hora": {"date": {"start": f"{today}T{8 + index * 12 // args.voice_events:02d}:{index % 60:02d}:00"}},
+                "entrada": {"checkbox": index % 2 == 0},
+                "canal": {"rich_text": rich_text("coworking")},
+            })
+    notion.reset_counters()
+    logs = notion.databases[ACTIVITY_DB]
+    users = len({page["properties"]["id_member"]["title"][0]["plain_text"] for page in logs})
+    cog = ScheduledMessageTask(bot)
+    cog.cog_unload()
+    channel = bot.channels[REPORT_CHANNEL_ID]
+    start = time.perf_counter()
+    await cog.daily_activity_report()
+    elapsed = time.perf_counter() - start
+    reported = len(channel.sent[-1].fields) if channel.sent and hasattr(channel.sent[-1], "fields") else 0
+    return {
+        "operations": 1, "unit": "reportes", "elapsed": elapsed, "latencies": [elapsed],
+        "extra": f"{len(logs)} registros del día · {reported} de {users} usuarios en el reporte",
+    }
+
+
+def notion_latencies(*names) -> list:
+    """Latencias recientes de las funciones de Notion indicadas (desde utils/metrics.py)."""
+    return [sample for name in names for sample in metrics.REGISTRY.samples(metrics.KIND_NOTION, name)]
+
+
+SCENARIOS = {
+    "catalogo": scenario_catalog,
+    "programados": scenario_scheduled,
+    "voz": scenario_voice,
+    "reporte": scenario_report,
+}
+
+
+async def run(args) -> list:
+    rng = random.Random(args.seed)
+    notion = FakeNotion(latency=args.latency, jitter=args.jitter, rate_limit_ratio=args.rate_limit_ratio,
+                        retry_after=args.retry_after, seed=args.seed)
+    base_url = await notion.start()
+    results = []
+    try:
+        for name in args.scenario or SCENARIOS:
+            bot = build(base_url, args)
+            notion.reset_counters()
+            metrics.REGISTRY.reset()
+            with quiet(not args.verbose):
+                result = await SCENARIOS[name](bot, notion, args, rng)
+            bot.notion.close()
+            result.update({
+                "scenario": name,
+                "throughput": result["operations"] / result["elapsed"] if result["elapsed"] else 0.0,
+                "p50": metrics.percentile(result["latencies"], 0.50),
+                "p95": metrics.percentile(result["latencies"], 0.95),
+                "requests": dict(notion.requests),
+                "rate_limited": notion.rate_limited,
+                "notion_calls": {r["name"]: {"count": r["count"], "p95": r["p95"]}
+                                 for r in metrics.REGISTRY.summary() if r["kind"] == metrics.KIND_NOTION},
+            })
+            del result["latencies"]
+            results.append(result)
+    finally:
+        await notion.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escenarios de carga contra un Notion falso.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Escenario a ejecutar (se puede repetir). Por defecto, todos.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos de latencia de cada respuesta de Notion.")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Segundos extra aleatorios (hasta) en cada respuesta.")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Proporción de respuestas 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Segundos de Retry-After en las respuestas 429.")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Peticiones por segundo del limitador del bot.")
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=config.NOTION_MAX_CONNECTIONS)
+    parser.add_argument("--no-cache", action="store_true", help="Desactiva la caché de consultas de DBManager.")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="Segundos de cada envío a un canal.")
+    parser.add_argument("--resources", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scheduled", type=int, default=500)
+    parser.add_argument("--voice-events", type=int, default=5000)
+    parser.add_argument("--members", type=int, default=300)
+    parser.add_argument("--event-rate", type=float, default=0.0, help="Eventos de voz por segundo (0 = todos de golpe).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Muestra los mensajes del bot durante la medición.")
+    parser.add_argument("--json", help="Guarda los resultados en este archivo.")
+    args = parser.parse_args()
+
+    from notion_client.api_endpoints import DatabasesEndpoint
+    if not hasattr(DatabasesEndpoint, "query"):
+        # notion-client 3.x movió las consultas a `data_sources.query`; el bot usa `databases.query`
+        print("❌ La versión instalada de notion-client no tiene `databases.query` (la que usa el bot). Instala notion-client 2.x.")
+        return
+
+    results = asyncio.run(run(args))
+
+    print(f"Notion falso: latencia {args.latency * 1000:.0f}+{args.jitter * 1000:.0f} ms, "
+          f"{args.rate_limit_ratio:.0%} de 429 · limitador {args.rate:g}/s (ráfaga {args.burst}), {args.connections} conexiones")
+    print(f"{'escenario':<12} {'operaciones':>16} {'tiempo':>9} {'por segundo':>12} {'p50':>9} {'p95':>9} {'peticiones':>11} {'429':>5}")
+    for r in results:
+        print(f"{r['scenario']:<12} {r['operations']:>7} {r['unit']:<8} {r['elapsed']:>8.2f}s {r['throughput']:>12.1f} "
+              f"{r['p50'] * 1000:>7.0f}ms {r['p95'] * 1000:>7.0f}ms {sum(r['requests'].values()):>11} {r['rate_limited']:>5}")
+        print(f"  {r['extra']}")
+        print("  peticiones: " + ", ".join(f"{op} {count}" for op, count in sorted(r['requests'].items())))
+        for name, call in sorted(r['notion_calls'].items()):
+            print(f"  {name}: {call['count']} llamadas · p95 {call['p95'] * 1000:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✅ Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
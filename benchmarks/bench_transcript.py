@@ -0,0 +1,117 @@
+# Archivo: benchmarks/bench_transcript.py
+# Mide la memoria y el tiempo de exportar el transcript de un canal con muchos mensajes.
+#
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.bench_transcript
+#   python -m benchmarks.bench_transcript --messages 50000 --max-peak-mib 4
+
+import argparse
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from utils.transcripts import export_transcript, message_record
+
+PAGE_SIZE = 100  # Igual que discord.py al recorrer el historial
+
+
+class FakeAuthor:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = user_id == 1
+
+    def __str__(self):
+        return f"usuario{self.id}"
+
+
+class FakeAttachment:
+    def __init__(self, message_id: int):
+        self.url = f"https://cdn.discordapp.com/attachments/1/{message_id}/captura.png"
+        self.filename = "captura.png"
+        self.size = 123_456
+        self.content_type = "image/png"
+
+
+class FakeMessage:
+    def __init__(self, index: int, start: datetime.datetime):
+        self.id = 10_000_000 + index
+        self.created_at = start + datetime.timedelta(seconds=index * 30)
+        self.author = FakeAuthor(index % 3)
+        self.content = f"Mensaje {index}: " + "texto de ejemplo del problema reportado " * 4
+        self.attachments = [FakeAttachment(self.id)] if index % 20 == 0 else []
+        self.embeds = []
+        self.reference = None
+
+
+class FakeChannel:
+    """
+    Canal con `history()` que genera los mensajes de a páginas, como la API de Discord: solo
+    existe en memoria la página que se está recorriendo.
+    """
+    def __init__(self, messages: int):
+        self.id = 1
+        self.name = "bug-benchmark"
+        self.messages = messages
+        self.start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+    async def history(self, limit=None, oldest_first=False):
+        for page_start in range(0, self.messages, PAGE_SIZE):
+            await asyncio.sleep(0)  # Simula la petición de la página
+            page = [FakeMessage(i, self.start) for i in range(page_start, min(page_start + PAGE_SIZE, self.messages))]
+            for message in page:
+                yield message
+
+
+async def export_all_at_once(channel: FakeChannel, path: str) -> int:
+    """Versión ingenua, para comparar: junta todo el historial en una lista antes de escribirlo."""
+    messages = [message async for message in channel.history(limit=None, oldest_first=True)]
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(json.dumps(message_record(m), ensure_ascii=False) for m in messages))
+    return len(messages)
+
+
+def measure(coro_factory):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = asyncio.run(coro_factory())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de exportación de transcripts.")
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--max-peak-mib", type=float, default=2.0,
+                        help="Pico de memoria máximo permitido para la exportación en streaming.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        streaming_path = os.path.join(tmp, "streaming.jsonl.gz")
+        naive_path = os.path.join(tmp, "naive.jsonl.gz")
+
+        count, elapsed, peak = measure(lambda: export_transcript(FakeChannel(args.messages), streaming_path))
+        naive_count, naive_elapsed, naive_peak = measure(lambda: export_all_at_once(FakeChannel(args.messages), naive_path))
+
+        with gzip.open(streaming_path, "rt", encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        size = os.path.getsize(streaming_path)
+
+    mib = 1024 * 1024
+    print(f"Mensajes: {args.messages}")
+    print(f"Streaming:  {count} mensajes en {elapsed:.2f}s, pico de memoria {peak / mib:.2f} MiB, archivo {size / 1024:.0f} KiB")
+    print(f"Todo junto: {naive_count} mensajes en {naive_elapsed:.2f}s, pico de memoria {naive_peak / mib:.2f} MiB")
+
+    assert lines == args.messages, f"El transcript tiene {lines} líneas en lugar de {args.messages}"
+    assert peak <= args.max_peak_mib * mib, f"El pico de memoria ({peak / mib:.2f} MiB) supera {args.max_peak_mib} MiB"
+    print("✅ El pico de memoria de la exportación está acotado.")
+
+
+if __name__ == "__main__":
+    main()
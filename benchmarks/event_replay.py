@@ -0,0 +1,468 @@
+# Archivo: benchmarks/event_replay.py
+# Prueba de carga de los cogs con eventos del gateway sintéticos o grabados, sin conexión a
+# Discord: tormentas de `on_voice_state_update`, ráfagas de `on_member_join`, flujos de mensajes
+# y clics en los botones de las vistas, a la velocidad que se indique. Mide la latencia de cada
+# listener y de cada vista (utils/metrics.py) y, con `--allocations`, la memoria que asigna cada uno.
+#
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.event_replay --preset voz --events 5000 --rate 500
+#   python -m benchmarks.event_replay --preset ingresos --events 300 --rate 50
+#   python -m benchmarks.event_replay --preset mensajes --events 20000 --rate 2000
+#   python -m benchmarks.event_replay --preset botones --sessions 100 --rate 5
+#   python -m benchmarks.event_replay --preset botones --allocations
+#   python -m benchmarks.event_replay --trace grabacion.jsonl.gz --speed 10
+#   python -m benchmarks.event_replay --preset voz --save-trace voz.jsonl.gz
+#
+# Las grabaciones reales se obtienen con `&perf grabar <segundos>` (utils/event_trace.py) y no
+# contienen IDs ni textos reales. Los eventos se entregan al estado interno de discord.py
+# (benchmarks/fake_discord.py), así que los cogs reciben los mismos objetos que en producción;
+# Notion es el servidor falso de benchmarks/fake_notion.py.
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+# IDs del servidor sintético. Se definen antes de importar `config`, que los lee del entorno.
+NUEVO_INGRESO_CATEGORY_ID = 1_100
+GENERAL_CATEGORY_ID = 1_101
+COWORKING_CHANNEL_ID = 1_200
+REUNIONES_CHANNEL_ID = 1_201
+NEURO_TEAM_ROLE_ID = 1_300
+VALERY_USER_ID = 1_400
+BELU_USER_ID = 1_401
+CHANNEL_BASE_ID = 20_000  # Canales 'c<n>' de las grabaciones
+USER_BASE_ID = 100_000  # Usuarios 'u<n>' de las grabaciones
+RESOURCES_DB = "recursos-falsos"
+ACTIVITY_DB = "actividad-falsa"
+DATA_DIR = tempfile.mkdtemp(prefix="event-replay-")
+os.environ.update({
+    "SERVER_ID": "1000",
+    "NUEVO_INGRESO_CATEGORY_ID": str(NUEVO_INGRESO_CATEGORY_ID),
+    "GENERAL_CATEGORY_ID": str(GENERAL_CATEGORY_ID),
+    "COWORKING_CHANNEL_ID": str(COWORKING_CHANNEL_ID),
+    "REUNIONES_CHANNEL_ID": str(REUNIONES_CHANNEL_ID),
+    "NEURO_TEAM_ROLE_ID": str(NEURO_TEAM_ROLE_ID),
+    "VALERY_USER_ID": str(VALERY_USER_ID),
+    "BELU_USER_ID": str(BELU_USER_ID),
+    "NOTION_TOKEN": "token-falso",
+    "NOTION_DATABASE_ID": RESOURCES_DB,
+    "NOTION_DATABASE_ACTIVIDAD_ID": ACTIVITY_DB,
+    "DATA_DIR": DATA_DIR,
+})
+
+import discord
+
+import config
+from benchmarks.fake_discord import (
+    CHANNEL_CATEGORY, CHANNEL_TEXT, CHANNEL_VOICE, FakeDiscord, channel_payload, role_payload,
+)
+from benchmarks.fake_notion import FakeNotion, rich_text
+from cogs.perf import format_bytes, format_line
+from database.db_manager import DBManager
+from utils import metrics
+from utils.event_trace import EVENT_INTERACTION, EVENT_JOIN, EVENT_MESSAGE, EVENT_VOICE, read_trace, write_trace
+from utils.gateway_profile import PROFILES, gateway_options
+from utils.instrumentation import InstrumentedBot
+from utils.lifecycle import Lifecycle
+from utils.message_router import MessageRouter
+from utils.notion_service import NotionService
+from utils.profiler import PROJECT_ROOT
+
+# Los cogs que reciben los eventos de la prueba, en el orden de dependencias de bot.py
+COGS = [
+    'cogs.conversations',
+    'cogs.events',
+    'cogs.ticket_management',
+    'cogs.onboarding',
+    'cogs.human_interaction',
+    'cogs.bug_info',
+    'cogs.commands',
+]
+NAMED_CHANNELS = {"coworking": COWORKING_CHANNEL_ID, "reuniones": REUNIONES_CHANNEL_ID}
+# Tareas que discord.py crea por cada evento y por cada clic (las que se esperan entre eventos)
+EVENT_TASK_PREFIXES = ("discord.py: ", "discord-ui-view-dispatch-")
+
+DIFFICULTIES = ["basico", "intermedio", "avanzado"]
+CATEGORIES = ["neurociencia", "memoria", "atencion", "lenguaje"]
+SUBCATEGORIES = ["lecturas", "videos", "ejercicios"]
+
+
+def user_id(ref: str) -> int:
+    return USER_BASE_ID + int(ref[1:])
+
+
+def channel_id(ref: str) -> int:
+    if ref is None:
+        return None
+    return NAMED_CHANNELS.get(ref) or CHANNEL_BASE_ID + int(ref[1:])
+
+
+# --- EVENTOS SINTÉTICOS (en el mismo formato que las grabaciones) ---
+
+def preset_voice(args, rng: random.Random) -> list:
+    """Cada evento mueve a un miembro al azar: si estaba fuera entra a un canal rastreado, si estaba dentro sale."""
+    inside = {}
+    events = []
+    for index in range(args.events):
+        member = f"u{rng.randrange(args.members) + 1}"
+        before = inside.get(member)
+        after = None if before else rng.choice(list(NAMED_CHANNELS))
+        inside[member] = after
+        events.append({"t": index / args.rate, "type": EVENT_VOICE, "member": member, "before": before, "after": after})
+    return events
+
+
+def preset_joins(args, rng: random.Random) -> list:
+    """Una cohorte de miembros nuevos entrando al servidor."""
+    return [{"t": index / args.rate, "type": EVENT_JOIN, "member": f"u{index + 1}"} for index in range(args.events)]
+
+
+def preset_messages(args, rng: random.Random) -> list:
+    """Conversación en varios canales; una parte de los mensajes son comandos."""
+    events = []
+    for index in range(args.events):
+        content = "&ayuda" if rng.random() < args.command_ratio else "x" * rng.randint(5, 200)
+        events.append({"t": index / args.rate, "type": EVENT_MESSAGE, "channel": f"c{rng.randrange(args.channels) + 1}",
+                       "author": f"u{rng.randrange(args.members) + 1}", "content": content})
+    return events
+
+
+def preset_buttons(args, rng: random.Random) -> list:
+    """
+    Sesiones completas de las vistas, cada una en su canal: `&iniciar` y luego el menú de recursos
+    (dificultad → categoría → subcategoría) o el contacto con un humano y sus cuatro respuestas.
+    `--rate` es la cantidad de sesiones que empiezan por segundo y `--think` la pausa entre pasos.
+    """
+    events = []
+    for index in range(args.sessions):
+        channel, user = f"c{index + 1}", f"u{index + 1}"
+        start = index / args.rate
+        steps = [("message", "&iniciar")]
+        if rng.random() < args.human_ratio:
+            steps += [("click", "human_contact"), ("click", "select_*")]
+            steps += [("message", "x" * rng.randint(20, 300)) for _ in range(4)]
+        else:
+            steps += [("click", "request_resource"), ("click", "diff_*"), ("click", "cat_*"), ("click", "subcat_*")]
+        for step, (kind, value) in enumerate(steps):
+            t = start + step * args.think
+            if kind == "message":
+                events.append({"t": t, "type": EVENT_MESSAGE, "channel": channel, "author": user, "content": value})
+            else:
+                events.append({"t": t, "type": EVENT_INTERACTION, "channel": channel, "user": user, "custom_id": value})
+    return sorted(events, key=lambda event: event["t"])
+
+
+PRESETS = {
+    "voz": preset_voice,
+    "ingresos": preset_joins,
+    "mensajes": preset_messages,
+    "botones": preset_buttons,
+}
+
+
+# --- ARMADO DEL BOT ---
+
+def guild_layout(events: list) -> tuple:
+    """Canales y roles del servidor sintético, con todos los canales que aparecen en los eventos."""
+    voice_refs, text_refs = set(NAMED_CHANNELS), set()
+    for event in events:
+        if event["type"] == EVENT_VOICE:
+            voice_refs.update(ref for ref in (event["before"], event["after"]) if ref)
+        elif event["type"] in (EVENT_MESSAGE, EVENT_INTERACTION):
+            text_refs.add(event["channel"])
+    channels = [
+        channel_payload(NUEVO_INGRESO_CATEGORY_ID, "nuevo ingreso", CHANNEL_CATEGORY),
+        channel_payload(GENERAL_CATEGORY_ID, "general", CHANNEL_CATEGORY),
+    ]
+    channels += [channel_payload(channel_id(ref), ref, CHANNEL_VOICE) for ref in sorted(voice_refs)]
+    channels += [channel_payload(channel_id(ref), ref, CHANNEL_TEXT, position=index) for index, ref in enumerate(sorted(text_refs))]
+    roles = [role_payload(NEURO_TEAM_ROLE_ID, "neuro team")]
+    return channels, roles
+
+
+def seed_catalog(notion: FakeNotion, resources: int, rng: random.Random):
+    for index in range(resources):
+        notion.add_page(RESOURCES_DB, {
+            "resource_name": {"title": rich_text(f"recurso {index}")},
+            "link": {"url": f"https://example.com/recursos/{index}"},
+            "category": {"select": {"name": rng.choice(CATEGORIES)}},
+            "subcategory": {"select": {"name": rng.choice(SUBCATEGORIES)}},
+            "difficulty": {"select": {"name": rng.choice(DIFFICULTIES)}},
+        })
+
+
+async def build_bot(base_url: str, args) -> tuple:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    intents.guilds = True
+    # Sin descarga de miembros al conectarse: no hay gateway que responda los chunks
+    options = gateway_options(args.profile, intents) | {"chunk_guilds_at_startup": False, "guild_ready_timeout": 0.05}
+    bot = InstrumentedBot(command_prefix='&', intents=intents, **options)
+    bot.router = MessageRouter(bot)
+
+    async def on_message(message):
+        await bot.router.route(message)
+    on_message.__qualname__ = "on_message"  # El mismo nombre que en bot.py, para comparar con `&perf listeners`
+    bot.event(on_message)
+
+    bot.notion = NotionService(config.NOTION_TOKEN, rate_per_second=args.notion_rate, burst=args.notion_rate,
+                               max_retries=config.NOTION_MAX_RETRIES, base_url=base_url)
+    bot.db_manager = DBManager(bot.notion)
+    bot.lifecycle = Lifecycle(bot, os.path.join(DATA_DIR, "warm_start.json.gz"))
+    await bot._async_setup_hook()  # Lo que hace `login` antes de conectarse (prepara el loop del estado)
+    fake = FakeDiscord(bot, latency=args.discord_latency)
+    fake.install()
+    for cog in COGS:
+        await bot.load_extension(cog)
+    return bot, fake
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """Silencia los `print` del bot durante la medición."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# --- REPRODUCCIÓN ---
+
+class Replayer:
+    """Entrega los eventos al bot a través de `FakeDiscord` y lleva la cuenta de los clics sin botón."""
+    def __init__(self, bot, fake: FakeDiscord, click_timeout: float):
+        self.bot = bot
+        self.fake = fake
+        self.click_timeout = click_timeout
+        self.delivered = 0
+        self.missed_clicks = 0
+
+    def deliver(self, event: dict):
+        if event["type"] == EVENT_VOICE:
+            self.fake.dispatch_voice(user_id(event["member"]), channel_id(event["after"]))
+        elif event["type"] == EVENT_JOIN:
+            self.fake.dispatch_join(user_id(event["member"]))
+        elif event["type"] == EVENT_MESSAGE:
+            self.fake.dispatch_message(channel_id(event["channel"]), user_id(event["author"]), event["content"])
+        self.delivered += 1
+
+    async def click(self, event: dict):
+        """Hace clic en el botón pedido; si el bot todavía no lo envió, lo espera hasta `click_timeout`."""
+        channel = channel_id(event["channel"])
+        deadline = time.monotonic() + self.click_timeout
+        while True:
+            found = self.fake.find_component(channel, event["custom_id"])
+            if found is not None:
+                self.fake.dispatch_interaction(channel, user_id(event["user"]), *found)
+                self.delivered += 1
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.missed_clicks += 1
+                return
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.fake.message_added.wait(), remaining)
+
+    async def settle(self):
+        """Espera a que terminen los listeners, los clics y las bienvenidas encoladas."""
+        onboarding = self.bot.get_cog('Onboarding')
+        while True:
+            current = asyncio.current_task()
+            pending = [task for task in asyncio.all_tasks()
+                       if task is not current and task.get_name().startswith(EVENT_TASK_PREFIXES)]
+            if pending:
+                await asyncio.wait(pending)
+                continue
+            if onboarding and not onboarding.queue.empty():
+                await onboarding.queue.join()
+                continue
+            break
+
+    async def run(self, events: list, speed: float):
+        """Entrega los eventos respetando sus tiempos (divididos por `speed`)."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        clicks = []
+        for index, event in enumerate(events):
+            delay = event["t"] / speed - (loop.time() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif index % 100 == 0:
+                await asyncio.sleep(0)  # Deja correr a los listeners aunque el reproductor vaya atrasado
+            if event["type"] == EVENT_INTERACTION:
+                clicks.append(asyncio.create_task(self.click(event)))
+            else:
+                self.deliver(event)
+        await asyncio.gather(*clicks)
+        await self.settle()
+
+    async def run_serial(self, events: list) -> dict:
+        """
+        Entrega los eventos de a uno, esperando a que el bot termine cada uno, y mide con
+        tracemalloc la memoria que asignó (máximo transitorio y lo que quedó retenido). Cada
+        evento se atribuye a los listeners y vistas que se ejecutaron mientras se procesaba.
+        """
+        allocations = {}
+        for event in events:
+            before_counts = metrics.REGISTRY.counts(metrics.KIND_LISTENER, metrics.KIND_INTERACTION)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            if event["type"] == EVENT_INTERACTION:
+                await self.click(event)
+            else:
+                self.deliver(event)
+            await self.settle()
+            current, peak = tracemalloc.get_traced_memory()
+            after_counts = metrics.REGISTRY.counts(metrics.KIND_LISTENER, metrics.KIND_INTERACTION)
+            ran = sorted(name for (kind, name), count in after_counts.items() if count > before_counts.get((kind, name), 0))
+            row = allocations.setdefault(" + ".join(ran) or "(ninguno)", {"events": 0, "peak": 0, "retained": 0})
+            row["events"] += 1
+            row["peak"] += peak - before
+            row["retained"] += current - before
+        return allocations
+
+
+async def run(events: list, args) -> dict:
+    rng = random.Random(args.seed)
+    notion = FakeNotion(latency=args.notion_latency, seed=args.seed)
+    seed_catalog(notion, args.resources, rng)
+    base_url = await notion.start()
+    try:
+        with quiet(not args.verbose):
+            bot, fake = await build_bot(base_url, args)
+            fake.connect(*guild_layout(events))
+            await bot.wait_until_ready()
+            replayer = Replayer(bot, fake, args.click_timeout)
+            await replayer.settle()
+        metrics.REGISTRY.reset()
+        fake.requests.clear()
+        notion.reset_counters()
+
+        allocations, top = None, []
+        start = time.perf_counter()
+        with quiet(not args.verbose):
+            if args.allocations:
+                tracemalloc.start(args.frames)
+                first = tracemalloc.take_snapshot()
+                allocations = await replayer.run_serial(events)
+                last = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                # Solo el código del bot (sin el Discord y el Notion falsos de esta prueba)
+                filters = (tracemalloc.Filter(True, os.path.join(PROJECT_ROOT, "*")),
+                           tracemalloc.Filter(False, os.path.join(PROJECT_ROOT, "benchmarks", "*")))
+                top = [
+                    {"line": format_line(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                    for stat in last.filter_traces(filters).compare_to(first.filter_traces(filters), "lineno")[:args.top]
+                ]
+            else:
+                await replayer.run(events, args.speed)
+        elapsed = time.perf_counter() - start
+        summary = metrics.REGISTRY.summary()
+        with quiet(not args.verbose):
+            await bot.close()
+            bot.notion.close()
+    finally:
+        await notion.stop()
+    return {
+        "events": len(events),
+        "delivered": replayer.delivered,
+        "missed_clicks": replayer.missed_clicks,
+        "elapsed": elapsed,
+        "series": [row for row in summary if row["kind"] in (metrics.KIND_LISTENER, metrics.KIND_INTERACTION)],
+        "discord_requests": dict(fake.requests),
+        "unhandled": dict(fake.unhandled),
+        "notion_requests": dict(notion.requests),
+        "allocations": allocations,
+        "top_allocations": top,
+    }
+
+
+def print_report(result: dict, args):
+    mode = "en serie, con tracemalloc" if args.allocations else f"velocidad x{args.speed:g}"
+    print(f"✅ {result['delivered']} de {result['events']} eventos entregados en {result['elapsed']:.2f}s "
+          f"({result['delivered'] / result['elapsed'] if result['elapsed'] else 0:.0f}/s, {mode})")
+    if result["missed_clicks"]:
+        print(f"Advertencia: {result['missed_clicks']} clics no encontraron su botón en {args.click_timeout:g}s.")
+    print(f"{'listener / vista':<48} {'llamadas':>9} {'errores':>8} {'media':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for r in sorted(result["series"], key=lambda r: -r["avg"] * r["count"]):
+        print(f"{r['name'][:48]:<48} {r['count']:>9} {r['errors']:>8} {r['avg'] * 1000:>7.2f}ms "
+              f"{r['p50'] * 1000:>7.2f}ms {r['p95'] * 1000:>7.2f}ms {r['p99'] * 1000:>7.2f}ms")
+    print("Peticiones a Discord: " + (", ".join(f"{k} {v}" for k, v in sorted(result["discord_requests"].items(), key=lambda i: -i[1])) or "ninguna"))
+    if result["unhandled"]:
+        print("  sin simular (respondieron vacío): " + ", ".join(f"{k} {v}" for k, v in result["unhandled"].items()))
+    print("Peticiones a Notion: " + (", ".join(f"{k} {v}" for k, v in sorted(result["notion_requests"].items())) or "ninguna"))
+    if result["allocations"] is not None:
+        print(f"{'memoria por evento (quién lo atendió)':<60} {'eventos':>8} {'máximo medio':>13} {'retenido medio':>15}")
+        for name, row in sorted(result["allocations"].items(), key=lambda item: -item[1]["peak"]):
+            print(f"{name[:60]:<60} {row['events']:>8} {format_bytes(row['peak'] / row['events']):>13} "
+                  f"{format_bytes(row['retained'] / row['events']):>15}")
+        print("Líneas del proyecto con más memoria retenida al final:")
+        for stat in result["top_allocations"]:
+            print(f"  {stat['line']}: {'+' if stat['size_diff'] >= 0 else ''}{format_bytes(stat['size_diff'])} ({stat['count_diff']:+d} bloques)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de los cogs con eventos sintéticos o grabados.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--preset", choices=sorted(PRESETS), default="voz", help="Eventos sintéticos a generar.")
+    source.add_argument("--trace", help="Grabación a reproducir (de `&perf grabar` o de --save-trace).")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiplicador de velocidad de la reproducción.")
+    parser.add_argument("--rate", type=float, default=200.0, help="Eventos (o sesiones, en 'botones') por segundo de los presets.")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--members", type=int, default=300)
+    parser.add_argument("--channels", type=int, default=20, help="Canales de texto del preset 'mensajes'.")
+    parser.add_argument("--command-ratio", type=float, default=0.01, help="Proporción de comandos en el preset 'mensajes'.")
+    parser.add_argument("--sessions", type=int, default=50, help="Sesiones del preset 'botones'.")
+    parser.add_argument("--think", type=float, default=0.5, help="Segundos entre los pasos de una sesión de 'botones'.")
+    parser.add_argument("--human-ratio", type=float, default=0.3, help="Proporción de sesiones de 'botones' que piden un humano.")
+    parser.add_argument("--click-timeout", type=float, default=10.0, help="Segundos que un clic espera a que aparezca su botón.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=config.GATEWAY_PROFILE, help="Perfil de caché del gateway.")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="Segundos de cada petición a Discord.")
+    parser.add_argument("--notion-latency", type=float, default=0.05, help="Segundos de cada petición a Notion.")
+    parser.add_argument("--notion-rate", type=float, default=1000.0, help="Peticiones por segundo del limitador de Notion.")
+    parser.add_argument("--resources", type=int, default=300, help="Recursos del catálogo falso de Notion.")
+    parser.add_argument("--allocations", action="store_true", help="Entrega los eventos de a uno y mide la memoria de cada uno.")
+    parser.add_argument("--frames", type=int, default=1, help="Marcos de pila que guarda tracemalloc.")
+    parser.add_argument("--top", type=int, default=10, help="Líneas con más memoria retenida a mostrar.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-trace", help="Guarda los eventos sintéticos en este archivo (.jsonl o .jsonl.gz).")
+    parser.add_argument("--verbose", action="store_true", help="Muestra los mensajes del bot durante la prueba.")
+    parser.add_argument("--json", help="Guarda los resultados en este archivo.")
+    args = parser.parse_args()
+
+    if args.trace:
+        header, events = read_trace(args.trace)
+        print(f"ℹ️ Grabación {args.trace}: {len(events)} eventos ({header.get('seconds', '?')} s grabados).")
+    else:
+        events = PRESETS[args.preset](args, random.Random(args.seed))
+        print(f"ℹ️ Preset '{args.preset}': {len(events)} eventos sintéticos.")
+        if args.save_trace:
+            write_trace(args.save_trace, events, preset=args.preset, seconds=events[-1]["t"] if events else 0)
+            print(f"✅ Eventos guardados en {args.save_trace}")
+    if not events:
+        print("❌ No hay eventos que reproducir.")
+        return
+
+    from notion_client.api_endpoints import DatabasesEndpoint
+    if not hasattr(DatabasesEndpoint, "query"):
+        print("Advertencia: La versión instalada de notion-client no tiene `databases.query` (la que usa el bot): "
+              "los menús de recursos quedarán vacíos. Instala notion-client 2.x.")
+
+    result = asyncio.run(run(events, args))
+    print_report(result, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"✅ Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+# Archivo: benchmarks/fake_discord.py
+# Discord falso para pruebas de carga sin conexión: arma los payloads del gateway (READY,
+# GUILD_CREATE, VOICE_STATE_UPDATE, GUILD_MEMBER_ADD, MESSAGE_CREATE, INTERACTION_CREATE) que se
+# entregan directamente al estado interno de discord.py, y responde en memoria a las peticiones
+# HTTP del bot y a las respuestas de las interacciones (webhooks).
+#
+# Los cogs y las vistas reciben así objetos reales de discord.py (Member, TextChannel, Message,
+# Interaction) y todo lo que envían queda guardado aquí, incluidos los botones de cada mensaje
+# para poder hacer clic en ellos (ver `find_component`).
+#
+# Uso (ver benchmarks/event_replay.py):
+#   fake = FakeDiscord(bot, latency=0.05)
+#   fake.install()  # Después de `bot._async_setup_hook()`
+#   fake.connect(channels, roles)
+#   fake.dispatch_message(channel_id, user_id, "&iniciar")
+
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+
+from discord.http import Route
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from utils.instrumentation import instrument_http
+
+GUILD_ID = 1_000
+BOT_ID = 3_000
+OWNER_ID = 3_001
+MESSAGES_PER_CHANNEL = 50  # Mensajes del bot que se recuerdan por canal (para los clics)
+
+CHANNEL_TEXT = 0
+CHANNEL_VOICE = 2
+CHANNEL_CATEGORY = 4
+COMPONENT_ACTION_ROW = 1
+
+# Tipos de respuesta a una interacción (los de la API de Discord)
+RESPONSE_MESSAGE = 4
+RESPONSE_UPDATE = 7
+
+
+def timestamp() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def user_payload(user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"{'bot' if bot else 'estudiante'}{user_id}", "discriminator": "0",
+            "global_name": None, "avatar": None, "bot": bot}
+
+
+def member_payload(user_id: int, roles=(), bot: bool = False) -> dict:
+    return {"user": user_payload(user_id, bot), "roles": [str(role) for role in roles], "joined_at": timestamp(),
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def role_payload(role_id: int, name: str, position: int = 1, permissions: int = 0) -> dict:
+    return {"id": str(role_id), "name": name, "permissions": str(permissions), "position": position, "color": 0,
+            "hoist": False, "managed": False, "mentionable": True, "flags": 0}
+
+
+def channel_payload(channel_id: int, name: str, channel_type: int = CHANNEL_TEXT, parent_id: int = None,
+                    position: int = 0, overwrites=()) -> dict:
+    channel = {"id": str(channel_id), "guild_id": str(GUILD_ID), "type": channel_type, "name": name, "position": position,
+               "parent_id": str(parent_id) if parent_id else None, "permission_overwrites": list(overwrites),
+               "nsfw": False, "topic": None, "last_message_id": None, "rate_limit_per_user": 0}
+    if channel_type == CHANNEL_VOICE:
+        channel.update({"bitrate": 64000, "user_limit": 0, "rtc_region": None})
+    return channel
+
+
+def iter_buttons(components: list):
+    """Recorre los componentes (dentro de las filas) de un mensaje."""
+    for component in components or ():
+        if component.get("type") == COMPONENT_ACTION_ROW:
+            yield from component.get("components", ())
+        else:
+            yield component
+
+
+def custom_id_matches(pattern: str, custom_id: str) -> bool:
+    """'diff_*' coincide con cualquier botón cuyo custom_id empiece con 'diff_'."""
+    if pattern.endswith("*"):
+        return custom_id.startswith(pattern[:-1])
+    return custom_id == pattern
+
+
+def _body(json_body=None, form=None, payload=None, multipart=None) -> dict:
+    """El JSON enviado por el bot, venga como JSON o dentro de un formulario multipart."""
+    if json_body is not None:
+        return json_body
+    if payload is not None:
+        return payload
+    for part in form or multipart or ():
+        if part.get("name") == "payload_json":
+            return json.loads(part["value"])
+    return {}
+
+
+def route_params(route: Route) -> dict:
+    """Valores de los parámetros de la ruta ({'channel_id': '123', ...}) sacados de la URL."""
+    actual = route.url[len(Route.BASE):].split("?", 1)[0].split("/")
+    template = route.path.split("/")
+    return {name[1:-1]: value for name, value in zip(template, actual) if name.startswith("{")}
+
+
+class FakeWebhookAdapter(AsyncWebhookAdapter):
+    """Transporte de los webhooks (respuestas y followups de interacciones) hacia `FakeDiscord`."""
+    def __init__(self, fake):
+        super().__init__()
+        self.fake = fake
+
+    async def request(self, route, session=None, *, payload=None, multipart=None, files=None, params=None, **kwargs):
+        return await self.fake.webhook_request(route, _body(payload=payload, multipart=multipart))
+
+
+class FakeDiscord:
+    """
+    Servidor de Discord en memoria para un solo guild.
+
+    - `latency`: segundos de espera en cada petición HTTP o de webhook.
+    - `requests`: peticiones por 'MÉTODO ruta'; `unhandled`: las que no se simulan (responden vacío).
+    - `messages`: los últimos mensajes de cada canal, como payloads de la API.
+    """
+    def __init__(self, bot, latency: float = 0.0):
+        self.bot = bot
+        self.latency = latency
+        self.requests = collections.Counter()
+        self.unhandled = collections.Counter()
+        self.channels = {}  # {channel_id: payload}
+        self.messages = collections.defaultdict(lambda: collections.deque(maxlen=MESSAGES_PER_CHANNEL))
+        self.interactions = {}  # {token: {'channel_id', 'message', 'original'}}
+        self.message_added = asyncio.Event()
+        self._ids = itertools.count(10_000_000)
+
+    @property
+    def state(self):
+        return self.bot._connection
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def install(self):
+        """Reemplaza el transporte HTTP del bot y el de los webhooks de este contexto por los falsos."""
+        self.bot.http.request = self.request
+        instrument_http(self.bot.http)
+        async_context.set(FakeWebhookAdapter(self))
+
+    # --- GATEWAY ---
+
+    def connect(self, channels: list, roles: list, members=()):
+        """Entrega READY y GUILD_CREATE con los canales, roles y miembros indicados."""
+        for channel in channels:
+            self.channels[int(channel["id"])] = channel
+        self.state.parse_ready({
+            "user": user_payload(BOT_ID, bot=True), "guilds": [{"id": str(GUILD_ID), "unavailable": True}],
+            "session_id": "benchmark", "application": {"id": str(BOT_ID), "flags": 0},
+        })
+        self.state.parse_guild_create({
+            "id": str(GUILD_ID), "name": "Servidor sintético", "icon": None, "owner_id": str(OWNER_ID),
+            "member_count": len(members) + 1, "large": False, "unavailable": False,
+            "roles": [role_payload(GUILD_ID, "@everyone", position=0)] + list(roles),
+            "channels": list(channels), "members": [member_payload(BOT_ID, bot=True)] + list(members),
+            "voice_states": [], "presences": [], "threads": [], "emojis": [], "stickers": [], "features": [],
+            "stage_instances": [], "guild_scheduled_events": [], "soundboard_sounds": [],
+        })
+
+    def dispatch_voice(self, user_id: int, channel_id: int = None):
+        """VOICE_STATE_UPDATE: el miembro entra a `channel_id` (o sale de la voz si es None)."""
+        self.state.parse_voice_state_update({
+            "guild_id": str(GUILD_ID), "channel_id": str(channel_id) if channel_id else None,
+            "user_id": str(user_id), "member": member_payload(user_id), "session_id": f"voz-{user_id}",
+            "deaf": False, "mute": False, "self_deaf": False, "self_mute": False, "self_video": False,
+            "suppress": False, "request_to_speak_timestamp": None,
+        })
+
+    def dispatch_join(self, user_id: int):
+        """GUILD_MEMBER_ADD."""
+        self.state.parse_guild_member_add({"guild_id": str(GUILD_ID), **member_payload(user_id)})
+
+    def dispatch_message(self, channel_id: int, user_id: int, content: str):
+        """MESSAGE_CREATE de un usuario."""
+        data = self._message(channel_id, user_payload(user_id), {"content": content})
+        data["member"] = {k: v for k, v in member_payload(user_id).items() if k != "user"}
+        self.state.parse_message_create(data)
+
+    def find_component(self, channel_id: int, pattern: str):
+        """
+        Busca, del mensaje más reciente al más antiguo, un botón o menú habilitado del bot en el
+        canal cuyo custom_id coincida con `pattern` (ver `custom_id_matches`).
+
+        Returns:
+            tuple: (payload del mensaje, componente) o None si no hay ninguno.
+        """
+        for message in reversed(self.messages.get(channel_id, ())):
+            for component in iter_buttons(message.get("components")):
+                if not component.get("disabled") and custom_id_matches(pattern, component.get("custom_id", "")):
+                    return message, component
+        return None
+
+    def dispatch_interaction(self, channel_id: int, user_id: int, message: dict, component: dict):
+        """INTERACTION_CREATE: el usuario hace clic en `component` de `message`."""
+        interaction_id = self.next_id()
+        token = f"token-{interaction_id}"
+        self.interactions[token] = {"channel_id": channel_id, "message": message, "original": None}
+        self.state.parse_interaction_create({
+            "id": str(interaction_id), "application_id": str(BOT_ID), "type": 3, "token": token, "version": 1,
+            "guild_id": str(GUILD_ID), "channel_id": str(channel_id), "channel": self.channels.get(channel_id),
+            "member": {**member_payload(user_id), "permissions": "0"}, "message": message,
+            "data": {"custom_id": component["custom_id"], "component_type": component["type"]},
+            "app_permissions": "0", "locale": "es-ES", "guild_locale": "es-ES", "entitlements": [],
+            "authorizing_integration_owners": {}, "context": 0, "attachment_size_limit": 8 * 1024 * 1024,
+        })
+
+    # --- HTTP DEL BOT ---
+
+    def _message(self, channel_id: int, author: dict, body: dict) -> dict:
+        return {
+            "id": str(self.next_id()), "channel_id": str(channel_id), "guild_id": str(GUILD_ID), "author": author,
+            "content": body.get("content") or "", "timestamp": timestamp(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": body.get("embeds") or [], "components": body.get("components") or [], "pinned": False,
+            "type": 0, "flags": body.get("flags", 0),
+        }
+
+    def _bot_message(self, channel_id: int, body: dict) -> dict:
+        message = self._message(channel_id, user_payload(BOT_ID, bot=True), body)
+        self.messages[channel_id].append(message)
+        self.message_added.set()
+        self.message_added = asyncio.Event()
+        return message
+
+    def _edit_message(self, channel_id: int, message_id: str, body: dict) -> dict:
+        for message in self.messages.get(channel_id, ()):
+            if message["id"] == message_id:
+                break
+        else:
+            message = self._message(channel_id, user_payload(BOT_ID, bot=True), {})
+            message["id"] = message_id
+        for key in ("content", "embeds", "components"):
+            if key in body:
+                message[key] = body[key] or ([] if key != "content" else "")
+        message["edited_timestamp"] = timestamp()
+        return dict(message)
+
+    async def request(self, route: Route, **kwargs):
+        """Reemplazo de `HTTPClient.request`."""
+        self.requests[f"{route.method} {route.path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        params = route_params(route)
+        body = _body(kwargs.get("json"), kwargs.get("form"))
+        key = (route.method, route.path)
+        channel_id = int(params["channel_id"]) if "channel_id" in params else None
+
+        if key == ("POST", "/channels/{channel_id}/messages"):
+            return self._bot_message(channel_id, body)
+        if key == ("PATCH", "/channels/{channel_id}/messages/{message_id}"):
+            return self._edit_message(channel_id, params["message_id"], body)
+        if key == ("GET", "/channels/{channel_id}/messages"):
+            limit = int((kwargs.get("params") or {}).get("limit", 50))
+            return list(reversed(self.messages.get(channel_id, ())))[:limit]
+        if key == ("POST", "/guilds/{guild_id}/channels"):
+            channel = channel_payload(self.next_id(), body.get("name", "canal"), body.get("type", CHANNEL_TEXT),
+                                      body.get("parent_id"), body.get("position") or 0, body.get("permission_overwrites") or ())
+            channel["topic"] = body.get("topic")
+            self.channels[int(channel["id"])] = channel
+            # Como en Discord, el CHANNEL_CREATE del gateway llega después de la respuesta
+            asyncio.get_running_loop().call_soon(self.state.parse_channel_create, channel)
+            return channel
+        if key == ("PATCH", "/channels/{channel_id}"):
+            channel = self.channels.setdefault(channel_id, channel_payload(channel_id, "canal"))
+            channel.update({k: v for k, v in body.items() if k in ("name", "position", "parent_id", "permission_overwrites", "topic")})
+            asyncio.get_running_loop().call_soon(self.state.parse_channel_update, dict(channel))
+            return dict(channel)
+        if key == ("DELETE", "/channels/{channel_id}"):
+            channel = self.channels.pop(channel_id, None) or channel_payload(channel_id, "canal")
+            self.messages.pop(channel_id, None)
+            asyncio.get_running_loop().call_soon(self.state.parse_channel_delete, channel)
+            return channel
+        if key == ("GET", "/guilds/{guild_id}/members/{user_id}"):
+            return member_payload(int(params["user_id"]))
+        if key == ("GET", "/users/{user_id}"):
+            return user_payload(int(params["user_id"]))
+        if key == ("POST", "/users/@me/channels"):
+            recipient = int(body.get("recipient_id", 0))
+            return {"id": str(self.next_id()), "type": 1, "recipients": [user_payload(recipient)], "last_message_id": None}
+        if route.method in ("PUT", "DELETE"):
+            return None  # Permisos, reacciones, borrado de mensajes: sin cuerpo en la respuesta
+        self.unhandled[f"{route.method} {route.path}"] += 1
+        return None
+
+    # --- WEBHOOKS (RESPUESTAS A INTERACCIONES) ---
+
+    async def webhook_request(self, route: Route, body: dict):
+        """Respuestas, followups y ediciones de las interacciones (reemplazo de `AsyncWebhookAdapter.request`)."""
+        self.requests[f"{route.method} {route.path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        params = route_params(route)
+        interaction = self.interactions.get(params.get("webhook_token"))
+        if interaction is None:
+            self.unhandled[f"{route.method} {route.path}"] += 1
+            return None
+        channel_id = interaction["channel_id"]
+        key = (route.method, route.path)
+
+        if key == ("POST", "/interactions/{webhook_id}/{webhook_token}/callback"):
+            response = {"interaction": {"id": params["webhook_id"], "type": 3}}
+            response_type = body.get("type")
+            if response_type == RESPONSE_MESSAGE:
+                message = interaction["original"] = self._bot_message(channel_id, body.get("data") or {})
+                response["resource"] = {"type": response_type, "message": message}
+            elif response_type == RESPONSE_UPDATE:
+                message = self._edit_message(channel_id, interaction["message"]["id"], body.get("data") or {})
+                response["resource"] = {"type": response_type, "message": message}
+            return response
+        if key == ("POST", "/webhooks/{webhook_id}/{webhook_token}"):
+            return self._bot_message(channel_id, body)
+        if route.method in ("GET", "PATCH") and route.path.startswith("/webhooks/{webhook_id}/{webhook_token}/messages/"):
+            message_id = params.get("message_id", "@original")
+            if message_id == "@original":
+                original = interaction["original"] or self._bot_message(channel_id, {})
+                interaction["original"] = original
+                message_id = original["id"]
+            if route.method == "GET":
+                return self._edit_message(channel_id, message_id, {})
+            return self._edit_message(channel_id, message_id, body)
+        if route.method == "DELETE":
+            return None
+        self.unhandled[f"{route.method} {route.path}"] += 1
+        return None
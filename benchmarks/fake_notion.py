@@ -0,0 +1,215 @@
+# Archivo: benchmarks/fake_notion.py
+# Servidor local (aiohttp) que imita la parte de la API de Notion que usa el bot, para medir sin
+# credenciales reales: `databases.query` (filtros y paginación), `pages.create` y `pages.update`.
+#
+# Uso desde un benchmark:
+#   notion = FakeNotion(latency=0.05, rate_limit_ratio=0.02)
+#   base_url = await notion.start()
+#   service = NotionService("token-falso", base_url=base_url)
+#
+# También se puede levantar solo, para probar el bot a mano con NOTION_TOKEN cualquiera y
+# NOTION_BASE_URL=http://127.0.0.1:8765 en el .env:
+#   python -m benchmarks.fake_notion --port 8765 --latency 0.1
+
+import argparse
+import asyncio
+import collections
+import random
+import uuid
+
+from aiohttp import web
+
+MAX_PAGE_SIZE = 100  # Igual que Notion
+
+
+def rich_text(content: str) -> list:
+    """Valor de un texto tal como lo devuelve Notion (con `plain_text`)."""
+    return [{"type": "text", "text": {"content": content, "link": None}, "plain_text": content}]
+
+
+def _as_response(value: dict) -> dict:
+    """Convierte el valor de una propiedad enviado al crear/actualizar al formato de respuesta."""
+    for key in ("title", "rich_text"):
+        if key in value:
+            return {key: [item if "plain_text" in item else rich_text(item.get("text", {}).get("content", ""))[0]
+                          for item in value[key]]}
+    return dict(value)
+
+
+def _text(value: dict) -> str:
+    items = value.get("title") or value.get("rich_text") or []
+    return "".join(item.get("plain_text", "") for item in items)
+
+
+def matches(page: dict, query_filter: dict) -> bool:
+    """Evalúa un filtro de Notion (and/or, checkbox, select, date, title, rich_text) sobre una página."""
+    if not query_filter:
+        return True
+    if "and" in query_filter:
+        return all(matches(page, condition) for condition in query_filter["and"])
+    if "or" in query_filter:
+        return any(matches(page, condition) for condition in query_filter["or"])
+    value = page["properties"].get(query_filter.get("property"), {})
+    if "checkbox" in query_filter:
+        return value.get("checkbox", False) == query_filter["checkbox"].get("equals")
+    if "select" in query_filter:
+        selected = (value.get("select") or {}).get("name")
+        condition = query_filter["select"]
+        if "equals" in condition:
+            return selected == condition["equals"]
+        if "is_empty" in condition:
+            return selected is None
+        return True
+    if "date" in query_filter:
+        start = (value.get("date") or {}).get("start")
+        if start is None:
+            return False
+        condition = query_filter["date"]
+        # Las fechas ISO 8601 se comparan como texto (alcanza para las que genera el bot)
+        if "on_or_after" in condition and start < condition["on_or_after"]:
+            return False
+        if "before" in condition and start >= condition["before"]:
+            return False
+        if "equals" in condition and not start.startswith(condition["equals"]):
+            return False
+        return True
+    for key in ("title", "rich_text"):
+        if key in query_filter:
+            condition = query_filter[key]
+            text = _text(value)
+            if "equals" in condition:
+                return text == condition["equals"]
+            if "contains" in condition:
+                return condition["contains"] in text
+            return True
+    return True
+
+
+class FakeNotion:
+    """
+    Bases de datos de Notion en memoria servidas por HTTP.
+
+    - `latency` (+ hasta `jitter`) segundos de espera en cada respuesta.
+    - `rate_limit_ratio`: proporción de peticiones que responden 429 con `Retry-After`.
+    - Cuenta las peticiones por operación (`requests`) y las respuestas 429 (`rate_limited`).
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit_ratio: float = 0.0,
+                 retry_after: float = 1.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.databases = collections.defaultdict(list)  # {database_id: [páginas]}
+        self.pages = {}  # {page_id: página}
+        self.requests = collections.Counter()
+        self.rate_limited = 0
+        self.runner = None
+
+    # --- DATOS ---
+
+    def add_page(self, database_id: str, properties: dict) -> dict:
+        page = {
+            "object": "page",
+            "id": str(uuid.UUID(int=self.random.getrandbits(128))),
+            "parent": {"type": "database_id", "database_id": database_id},
+            "archived": False,
+            "properties": {name: _as_response(value) for name, value in properties.items()},
+        }
+        self.databases[database_id].append(page)
+        self.pages[page["id"]] = page
+        return page
+
+    def reset_counters(self):
+        self.requests.clear()
+        self.rate_limited = 0
+
+    # --- SERVIDOR ---
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/v1/databases/{database_id}/query", self._query)
+        app.router.add_post("/v1/pages", self._create_page)
+        app.router.add_patch("/v1/pages/{page_id}", self._update_page)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Levanta el servidor en el event loop actual. Returns: la URL base para `NotionService`."""
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        operation = {"_query": "databases.query", "_create_page": "pages.create", "_update_page": "pages.update"}.get(
+            getattr(handler, "__name__", ""), request.path)
+        self.requests[operation] += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.rate_limit_ratio and self.random.random() < self.rate_limit_ratio:
+            self.rate_limited += 1
+            return web.json_response(
+                {"object": "error", "status": 429, "code": "rate_limited", "message": "Rate limited (simulado)."},
+                status=429, headers={"Retry-After": f"{self.retry_after:g}"},
+            )
+        return await handler(request)
+
+    async def _query(self, request):
+        database_id = request.match_info["database_id"]
+        body = await request.json() if request.can_read_body else {}
+        page_size = min(MAX_PAGE_SIZE, int(body.get("page_size") or MAX_PAGE_SIZE))
+        results = [page for page in self.databases.get(database_id, ()) if matches(page, body.get("filter"))]
+        start = int(body.get("start_cursor") or 0)
+        chunk = results[start:start + page_size]
+        has_more = start + page_size < len(results)
+        return web.json_response({
+            "object": "list",
+            "results": chunk,
+            "next_cursor": str(start + page_size) if has_more else None,
+            "has_more": has_more,
+            "type": "page_or_database",
+        })
+
+    async def _create_page(self, request):
+        body = await request.json()
+        database_id = body.get("parent", {}).get("database_id")
+        if not database_id:
+            return self._error(400, "validation_error", "parent.database_id es obligatorio.")
+        return web.json_response(self.add_page(database_id, body.get("properties", {})))
+
+    async def _update_page(self, request):
+        page = self.pages.get(request.match_info["page_id"])
+        if page is None:
+            return self._error(404, "object_not_found", "Página inexistente.")
+        body = await request.json()
+        for name, value in body.get("properties", {}).items():
+            page["properties"][name] = _as_response(value)
+        return web.json_response(page)
+
+    @staticmethod
+    def _error(status: int, code: str, message: str):
+        return web.json_response({"object": "error", "status": status, "code": code, "message": message}, status=status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notion falso para pruebas locales.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+    notion = FakeNotion(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio)
+    print(f"ℹ️ Notion falso en http://127.0.0.1:{args.port} (NOTION_BASE_URL=http://127.0.0.1:{args.port}).")
+    web.run_app(notion.app(), host="127.0.0.1", port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
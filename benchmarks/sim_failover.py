@@ -0,0 +1,212 @@
+# Archivo: benchmarks/sim_failover.py
+# Simulación de conmutación por error de la elección de líder (utils/leader_election.py): levanta
+# varias instancias (procesos) que comparten el lease y que, mientras son líderes, registran un
+# "trabajo" cada pocos milisegundos. Después mata a la líder (kill -9), la congela (SIGSTOP, como
+# un event loop bloqueado) y la apaga de forma ordenada (SIGTERM), y comprueba que:
+#   - otra instancia toma el lease a tiempo (`ttl + renew` tras una caída, ~`renew` tras un apagado),
+#   - nunca hay dos líderes a la vez (ningún trabajo de un periodo anterior después del siguiente),
+#   - una líder congelada no vuelve a ejecutar trabajos al despertar.
+#
+# Uso (desde la raíz del repositorio):
+#   python -m benchmarks.sim_failover
+#   python -m benchmarks.sim_failover --backend file --instances 4 --ttl 3 --renew 1
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.leader_election import LeaderElection, build_backend
+
+TICK_SECONDS = 0.02  # Cada cuánto "trabaja" la líder
+SLACK_SECONDS = 1.0  # Margen por el arranque de procesos y la planificación del sistema
+
+
+# --- Instancia (proceso hijo) ---
+
+async def run_worker(args):
+    election = LeaderElection(build_backend(args.backend, args.path), holder=args.holder, ttl=args.ttl, renew_interval=args.renew)
+    log = os.open(args.log, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    await election.start()
+    try:
+        while not stop.is_set():
+            if election.is_leader:
+                # Una línea corta con O_APPEND se escribe entera aunque varios procesos escriban a la vez
+                os.write(log, (json.dumps({'holder': args.holder, 'epoch': election.epoch, 't': time.time()}) + "\n").encode())
+            try:
+                await asyncio.wait_for(stop.wait(), TICK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await election.stop()
+        os.close(log)
+
+
+# --- Coordinador ---
+
+class Cluster:
+    def __init__(self, args, workdir: str):
+        self.args = args
+        self.path = os.path.join(workdir, 'leader.db' if args.backend == 'sqlite' else 'leader.json')
+        self.log = os.path.join(workdir, 'ticks.jsonl')
+        self.procs = {}  # {holder: Popen}
+        self.spawned = 0
+
+    def spawn(self):
+        self.spawned += 1
+        holder = f"i{self.spawned}"
+        self.procs[holder] = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.sim_failover", "--worker", "--holder", holder,
+             "--backend", self.args.backend, "--path", self.path, "--log", self.log,
+             "--ttl", str(self.args.ttl), "--renew", str(self.args.renew)],
+            stdout=subprocess.DEVNULL,
+        )
+
+    def ticks(self) -> list:
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.endswith("\n")]
+
+    def wait_leader(self, after: float, exclude=(), timeout: float = 30.0):
+        """Espera el primer trabajo registrado después de `after` por una instancia que no esté en `exclude`."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for tick in self.ticks():
+                if tick['t'] > after and tick['holder'] not in exclude:
+                    return tick
+            time.sleep(0.05)
+        return None
+
+    def close(self):
+        for proc in self.procs.values():
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGCONT)
+                proc.terminate()
+        for proc in self.procs.values():
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def check_overlap(ticks: list) -> list:
+    """
+    Returns:
+        list[str]: Problemas encontrados. Ordenados por hora, los trabajos tienen que formar un
+        bloque por periodo (`epoch`), en orden creciente y de una sola instancia.
+    """
+    problems = []
+    owners = {}
+    last_epoch = 0
+    for tick in sorted(ticks, key=lambda t: t['t']):
+        owner = owners.setdefault(tick['epoch'], tick['holder'])
+        if owner != tick['holder']:
+            problems.append(f"el periodo {tick['epoch']} lo usan {owner} y {tick['holder']}")
+        if tick['epoch'] < last_epoch:
+            problems.append(f"{tick['holder']} trabajó con el periodo {tick['epoch']} después del periodo {last_epoch} (t={tick['t']:.3f})")
+        last_epoch = max(last_epoch, tick['epoch'])
+    return problems
+
+
+def run_scenarios(args) -> bool:
+    ok = True
+
+    def report(passed: bool, message: str):
+        nonlocal ok
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} {message}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cluster = Cluster(args, workdir)
+        try:
+            started = time.time()
+            for _ in range(args.instances):
+                cluster.spawn()
+            first = cluster.wait_leader(0.0)
+            if first is None:
+                report(False, "Ninguna instancia llegó a ser líder.")
+                return False
+            report(True, f"Líder inicial: {first['holder']} (periodo {first['epoch']}) a los {first['t'] - started:.2f}s del arranque.")
+            time.sleep(args.renew * 2)
+
+            # 1. Caída sin liberar el lease: la siguiente lo toma cuando vence
+            leader = cluster.ticks()[-1]['holder']
+            killed = time.time()
+            cluster.procs[leader].kill()
+            takeover = cluster.wait_leader(killed, exclude={leader})
+            limit = args.ttl + args.renew + SLACK_SECONDS
+            elapsed = takeover['t'] - killed if takeover else float('inf')
+            report(elapsed <= limit, f"kill -9 de {leader}: {takeover['holder'] if takeover else 'nadie'} tomó el lease en {elapsed:.2f}s (límite {limit:.1f}s).")
+            cluster.spawn()  # Se reemplaza la instancia caída, como en un despliegue
+            time.sleep(args.renew * 2)
+
+            # 2. Líder congelada (event loop bloqueado): pierde el lease y no trabaja al despertar
+            leader = cluster.ticks()[-1]['holder']
+            paused = time.time()
+            cluster.procs[leader].send_signal(signal.SIGSTOP)
+            takeover = cluster.wait_leader(paused, exclude={leader})
+            elapsed = takeover['t'] - paused if takeover else float('inf')
+            report(elapsed <= limit, f"SIGSTOP de {leader}: {takeover['holder'] if takeover else 'nadie'} tomó el lease en {elapsed:.2f}s (límite {limit:.1f}s).")
+            resumed = time.time()
+            cluster.procs[leader].send_signal(signal.SIGCONT)
+            time.sleep(args.renew * 2)
+            stale = [t for t in cluster.ticks() if t['holder'] == leader and t['t'] > resumed]
+            report(not stale, f"{leader} al despertar: {len(stale)} trabajos ejecutados con un lease vencido.")
+
+            # 3. Apagado ordenado: libera el lease y la siguiente lo toma en una renovación
+            leader = cluster.ticks()[-1]['holder']
+            stopped = time.time()
+            cluster.procs[leader].terminate()
+            takeover = cluster.wait_leader(stopped, exclude={leader})
+            limit = args.renew + SLACK_SECONDS
+            elapsed = takeover['t'] - stopped if takeover else float('inf')
+            report(elapsed <= limit, f"SIGTERM de {leader}: {takeover['holder'] if takeover else 'nadie'} tomó el lease en {elapsed:.2f}s (límite {limit:.1f}s).")
+            time.sleep(args.renew * 2)
+        finally:
+            cluster.close()
+
+        ticks = cluster.ticks()
+        problems = check_overlap(ticks)
+        epochs = sorted({t['epoch'] for t in ticks})
+        report(not problems, f"{len(ticks)} trabajos en {len(epochs)} periodos de liderazgo, sin líderes simultáneos."
+               if not problems else "Hubo líderes simultáneos:\n  " + "\n  ".join(problems[:10]))
+        for code in (proc.returncode for proc in cluster.procs.values()):
+            if code not in (0, -signal.SIGKILL, -signal.SIGTERM):
+                report(False, f"Una instancia terminó con el código {code}.")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula caídas de la instancia líder y mide la conmutación.")
+    parser.add_argument("--backend", choices=("sqlite", "file", "all"), default="all")
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--ttl", type=float, default=2.0, help="Duración del lease en segundos.")
+    parser.add_argument("--renew", type=float, default=0.5, help="Intervalo de renovación en segundos.")
+    # Opciones internas de cada instancia
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--holder", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--log", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(run_worker(args))
+        return
+
+    ok = True
+    for backend in (("sqlite", "file") if args.backend == "all" else (args.backend,)):
+        print(f"\nℹ️ Backend '{backend}' · {args.instances} instancias · lease de {args.ttl}s renovado cada {args.renew}s")
+        ok = run_scenarios(argparse.Namespace(**{**vars(args), 'backend': backend})) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,28 @@
 # Archivo: bot.py
 # Punto de entrada principal para el Bot de Neurocogniciones.
 
+import time
+_PROCESS_START = time.perf_counter()  # Antes de cualquier otra importación, para medir el arranque completo
+
 import os
 import discord
-from discord.ext import commands
 import asyncio
 import traceback
 
 # Importa las configuraciones
 import config
+from database.db_manager import DBManager
+from utils.gateway_profile import gateway_options
+from utils.instrumentation import InstrumentedBot
+from utils.leader_election import LeaderElection, build_backend
+from utils.lifecycle import Lifecycle
+from utils.message_router import MessageRouter
+from utils.notion_limiter import LANE_REPORTS
+from utils.notion_service import NotionService
+from utils.startup_timer import StartupTimer
+
+startup = StartupTimer(_PROCESS_START)
+startup.mark("importación de módulos")
 
 # --- CONFIGURACIÓN DE INTENTS (PERMISOS) ---
 intents = discord.Intents.default()
@@ -16,34 +30,121 @@ intents.message_content = True
 intents.members = True
 intents.guilds = True
 
-# Inicializa el bot
-bot = commands.Bot(command_prefix='&', intents=intents)
+# Inicializa el bot. El perfil de gateway decide si se descargan todos los miembros al conectarse
+# y cuántos miembros y mensajes se guardan en memoria (ver utils/gateway_profile.py). El bot mide
+# cada listener y cada petición a Discord (ver utils/metrics.py y el comando `&estado`).
+bot = InstrumentedBot(
+    command_prefix='&',
+    intents=intents,
+    **gateway_options(config.GATEWAY_PROFILE, intents, config.GATEWAY_MAX_MESSAGES),
+)
+
+# Enrutador central de mensajes (cuestionarios abiertos, comandos o nada)
+bot.router = MessageRouter(bot)
+
+# Cliente de Notion compartido (se conecta la primera vez que se usa) y gestor de la base de
+# datos de recursos y mensajes programados. Los cogs y las vistas los usan desde `bot`.
+bot.notion = NotionService(
+    config.NOTION_TOKEN,
+    max_connections=config.NOTION_MAX_CONNECTIONS,
+    keepalive_expiry=config.NOTION_KEEPALIVE_SECONDS,
+    rate_per_second=config.NOTION_RATE_PER_SECOND,
+    burst=config.NOTION_BURST,
+    max_retries=config.NOTION_MAX_RETRIES,
+    timeout=config.NOTION_TIMEOUT_SECONDS,
+    breaker_failures=config.NOTION_BREAKER_FAILURES,
+    breaker_reset=config.NOTION_BREAKER_RESET_SECONDS,
+    base_url=config.NOTION_BASE_URL,
+    workers=config.NOTION_WORKERS,
+    interactive_workers=config.NOTION_INTERACTIVE_WORKERS,
+)
+bot.db_manager = DBManager(
+    bot.notion,
+    resources_ttl=config.NOTION_CACHE_RESOURCES_TTL,
+    catalog_ttl=config.NOTION_CACHE_CATALOG_TTL,
+    stale_ttl=config.NOTION_CACHE_STALE_SECONDS,
+    cache_entries=config.NOTION_CACHE_MAX_ENTRIES,
+)
+
+# Apagado ordenado y arranque en caliente: la instantánea se lee antes de cargar los cogs, que
+# recuperan su estado al registrarse (antes de `on_ready`).
+bot.lifecycle = Lifecycle(bot, os.path.join(config.DATA_DIR, 'warm_start.json.gz'), drain_timeout=config.SHUTDOWN_DRAIN_SECONDS)
+bot.lifecycle.load()
+bot.lifecycle.register('catalog', bot.db_manager.cache.export, bot.db_manager.cache.restore)
+
+# Elección de líder entre instancias: los trabajos programados solo corren en la que tiene el
+# lease (ver utils/leader_election.py). Al apagarse se libera enseguida para la otra instancia.
+bot.leader = LeaderElection(
+    build_backend(config.LEADER_BACKEND, config.LEADER_LEASE_PATH),
+    ttl=config.LEADER_LEASE_SECONDS,
+    renew_interval=config.LEADER_RENEW_SECONDS,
+)
+bot.lifecycle.on_shutdown(bot.leader.stop)
+startup.mark("servicios compartidos e instantánea")
+
+@bot.event
+async def on_message(message):
+    """Reemplaza el procesamiento por defecto: cada mensaje pasa por el enrutador central."""
+    await bot.router.route(message)
+
+@bot.listen('on_ready')
+async def report_startup():
+    startup.mark("conexión al gateway hasta on_ready")
+    startup.report()
 
 # --- FUNCIÓN PARA CARGAR LOS COGS ---
+# Cada cog con los cogs que tienen que estar cargados antes que él. Las dependencias se declaran
+# siempre antes que el cog que las usa; los cogs sin dependencias pendientes se cargan en paralelo.
+COGS = {
+    'cogs.conversations': [],
+    'cogs.events': [],
+    'cogs.ticket_management': [],
+    'cogs.onboarding': ['cogs.ticket_management'],
+    'cogs.ticket_reaper': ['cogs.ticket_management'],
+    'cogs.human_interaction': ['cogs.conversations'],
+    'cogs.resources': [],
+    'cogs.bug_info': ['cogs.conversations', 'cogs.ticket_management'],
+    'cogs.commands': ['cogs.ticket_management', 'cogs.bug_info'],
+    'cogs.scheduled_message_task': [],
+    'cogs.monitoring': [],
+    'cogs.perf': [],
+}
+
 async def load_all_cogs():
-    """Carga todas las extensiones de cogs."""
-    cogs_to_load = [
-        'cogs.events',
-        'cogs.commands',
-        'cogs.ticket_management',
-        'cogs.human_interaction',
-        'cogs.resources',
-        'cogs.bug_info',
-        'cogs.scheduled_message_task'
-    ]
-    print("ℹ️ Cargando cogs...")
-    for cog in cogs_to_load:
+    """Carga todas las extensiones de cogs, en paralelo salvo las que dependen de otras."""
+    declared = []
+    for cog, dependencies in COGS.items():
+        missing = [dep for dep in dependencies if dep not in declared]
+        if missing:
+            raise ValueError(f"El cog '{cog}' depende de {missing}, que no están declarados antes en COGS.")
+        declared.append(cog)
+
+    async def load(cog):
+        # Espera a que terminen sus dependencias; si alguna falló, este cog tampoco se carga
+        if not all(await asyncio.gather(*(tasks[dep] for dep in COGS[cog]))):
+            print(f"❌ El cog {cog} no se cargó porque falló una de sus dependencias: {COGS[cog]}")
+            return False
+        start = time.perf_counter()
         try:
             await bot.load_extension(cog)
-            print(f"  -> Cog '{cog}' cargado.")
         except Exception as e:
             print(f"❌ Error al cargar el cog {cog}: {e}")
-    print("✅ Cogs cargados exitosamente.")
+            return False
+        startup.cog(cog, time.perf_counter() - start)
+        print(f"  -> Cog '{cog}' cargado.")
+        return True
+
+    print("ℹ️ Cargando cogs...")
+    tasks = {cog: asyncio.create_task(load(cog)) for cog in COGS}
+    results = await asyncio.gather(*tasks.values())
+    print(f"✅ {sum(results)} de {len(COGS)} cogs cargados.")
 
 
 # --- FUNCIÓN PRINCIPAL DE INICIO ---
 async def main():
     """Función principal que carga los cogs y luego inicia el bot."""
+    config.validate_env_variables()
+    startup.mark("validación de la configuración")
     if not config.TOKEN:
         print("❌ No se encontró el TOKEN del bot. Asegúrate de que está configurado en tu archivo .env.")
         return
@@ -52,8 +153,23 @@ async def main():
     async with bot:
         # Cargamos los cogs antes de iniciar el bot
         await load_all_cogs()
+        startup.mark("carga de cogs")
+        bot.lifecycle.install_signal_handlers()
+        await bot.leader.start()
+        # Revalida en segundo plano el catálogo restaurado (o lo precarga si no había instantánea)
+        prewarm = asyncio.create_task(bot.notion.run(LANE_REPORTS, bot.db_manager.prewarm))
         # Iniciamos el bot
-        await bot.start(config.TOKEN)
+        try:
+            # Equivale a `bot.start`, en dos pasos para medir cada uno
+            await bot.login(config.TOKEN)
+            startup.mark("inicio de sesión")
+            await bot.connect()
+        finally:
+            if not bot.lifecycle.saved:
+                bot.lifecycle.save()
+            prewarm.cancel()
+            await bot.leader.stop()
+            bot.notion.close()
 
 # --- PUNTO DE ENTRADA ---
 if __name__ == "__main__":
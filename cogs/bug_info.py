@@ -1,9 +1,48 @@
 # Archivo: cogs/bug_info.py
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
+import datetime
+import os
+import pytz
 
 import config
+from database.bug_store import BugStore, utc_now_iso
+from database.bug_analytics import BugAnalytics, METRIC_FIRST_RESPONSE, METRIC_RESOLUTION, week_key, format_duration, REPORT_TIMEZONE
+from utils import metrics, notion_utils
+from utils.attachment_relay import AttachmentRelay, close_files
+from utils.leader_election import leader_only
+from utils.notion_limiter import LANE_INTERACTIVE, LANE_REPORTS
+from utils.questionnaire import Question, Questionnaire, register_questionnaire, require_text, require_text_or_attachment
+from utils.ticket_registry import KIND_BUG, ticket_marker
+
+# --- CUESTIONARIOS ---
+
+BUG_REPORT_QUESTIONNAIRE = register_questionnaire(Questionnaire(
+    name='bug_report',
+    questions=[
+        Question("1. **¿En qué plataforma ocurrió el problema?** (Por ejemplo: Manychat, Kommo, Zapier, Google Sheets, etc.)", validator=require_text),
+        Question("2. **Describe el problema en detalle.** (Qué pasó, qué estabas haciendo, etc.)", validator=require_text),
+        Question("3. **Por favor, envía una imagen para ver más detalles del problema**", validator=require_text_or_attachment),
+    ],
+    cog='BugInfo',
+    on_complete='finish_bug_report',
+    timeout=800.0,
+    timeout_message="❌ Se ha agotado el tiempo. Por favor, reinicia el proceso con `&bug` si deseas continuar.",
+))
+
+BUG_SOLVED_QUESTIONNAIRE = register_questionnaire(Questionnaire(
+    name='bug_solved',
+    questions=[
+        Question("1. **¿Cuál fue la solución?**", validator=require_text),
+        Question("2. **Detalles: **", validator=require_text),
+        Question("3. **¿Hay alguna información adicional a tener en cuenta?**", validator=require_text),
+    ],
+    cog='BugInfo',
+    on_complete='finish_bug_solved',
+    timeout=500.0,
+    timeout_message="❌ Se ha agotado el tiempo. El canal no se cerrará. Puedes usar `&bug_resuelto` nuevamente si lo deseas.",
+))
 
 class BugInfo(commands.Cog):
     """
@@ -11,43 +50,62 @@ class BugInfo(commands.Cog):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.store = BugStore(os.path.join(config.DATA_DIR, 'bot.db'))
+        self.analytics = BugAnalytics(self.store)
+        self.relay = AttachmentRelay(config.ATTACHMENT_MAX_BYTES, config.ATTACHMENT_MAX_CONCURRENCY)
+
+        # Observar los canales de bugs abiertos que todavía esperan la primera respuesta del equipo
+        for report in self.store.list_awaiting_first_response():
+            self.bot.router.watch_channel(report['channel_id'], self.on_bug_channel_message)
+
+        self.weekly_bug_digest.start()
+
+    async def cog_unload(self):
+        self.weekly_bug_digest.cancel()
+        await self.relay.close()
+        self.store.close()
+
+    def _conversations(self):
+        return self.bot.get_cog('Conversations')
 
     async def start_bug_report_flow(self, channel: discord.TextChannel, member: discord.Member):
         """
         Inicia un flujo de preguntas y respuestas para recolectar la información del bug.
+        Las respuestas se procesan en `finish_bug_report` cuando el cuestionario termina.
         """
+        conversations = self._conversations()
+        if not conversations:
+            await channel.send("❌ Error: El módulo de conversaciones no está disponible. Contacta a un administrador.")
+            return
+
         # Mensaje de bienvenida y primera pregunta
         await channel.send(
             f"¡Hola, {member.mention}! El equipo de <@&{config.OPERECIONES_ROLES_ID}> ha sido notificado. "
             "Por favor, responde a las siguientes preguntas para ayudarnos a resolver tu bug de la mejor manera posible."
         )
+        await conversations.start(channel, member, BUG_REPORT_QUESTIONNAIRE.name)
 
-        questions = [
-            "1. **¿En qué plataforma ocurrió el problema?** (Por ejemplo: Manychat, Kommo, Zapier, Google Sheets, etc.)",
-            "2. **Describe el problema en detalle.** (Qué pasó, qué estabas haciendo, etc.)",
-            "3. **Por favor, envía una imagen para ver más detalles del problema**"
-        ]
-
-        # Almacenará las respuestas del usuario
-        answers = {}
+    async def finish_bug_report(self, channel: discord.TextChannel, member: discord.Member, answers: list, data: dict):
+        """
+        Compila el reporte del bug una vez que el usuario respondió todas las preguntas.
+        """
+        answers = {f"answer_{i+1}": answer for i, answer in enumerate(answers)}
 
-        def check_message(message):
-            """Función de verificación para wait_for."""
-            return message.author == member and message.channel == channel
+        # Guardar el reporte localmente: la resolución y los listados se consultan aquí
+        report = self.store.open_report(
+            channel_id=channel.id,
+            reporter_id=member.id,
+            platform=answers.get("answer_1"),
+            description=answers.get("answer_2"),
+            details=answers.get("answer_3"),
+            attachments=data.get('attachments'),
+        )
+        self.analytics.record_opened(report)
+        self.bot.router.watch_channel(channel.id, self.on_bug_channel_message)
+        notion_page_id = await self.bot.notion.run(LANE_INTERACTIVE, notion_utils.add_bug_report, self.bot.notion, report)
+        if notion_page_id:
+            self.store.update_report(report['id'], notion_page_id=notion_page_id)
 
-        # Iterar a través de las preguntas
-        for i, question in enumerate(questions):
-            await channel.send(question)
-            try:
-                # Esperar la respuesta del usuario con un tiempo de espera de 800 segundos
-                response = await self.bot.wait_for('message', check=check_message, timeout=800.0)
-                answers[f"answer_{i+1}"] = response.content
-            except asyncio.TimeoutError:
-                # Si el usuario no responde a tiempo
-                await channel.send("❌ Se ha agotado el tiempo. Por favor, reinicia el proceso con `&bug` si deseas continuar.")
-                return
-
-        # Una vez que se tienen todas las respuestas, compilar el reporte
         embed = discord.Embed(
             title="🐞 Nuevo Reporte de Bug",
             description=f"Reporte enviado por {member.mention}",
@@ -59,15 +117,26 @@ class BugInfo(commands.Cog):
         
         embed.add_field(name="Plataforma", value=answers.get("answer_1", "N/A"), inline=False)
         embed.add_field(name="Descripción del Problema", value=answers.get("answer_2", "N/A"), inline=False)
-        embed.add_field(name="Detalles: ", value=answers.get("answer_3", "N/A"), inline=False)
-        embed.set_footer(text=f"ID del Usuario: {member.id}")
+        embed.add_field(name="Detalles: ", value=answers.get("answer_3", "N/A") or "N/A", inline=False)
+        embed.set_footer(text=f"ID del Usuario: {member.id} | Bug #{report['id']}")
 
         # Enviar el reporte al canal de bugs oficial y al canal privado
         bug_channel = self.bot.get_channel(config.BUGS_CHANNEL_ID)
         if bug_channel:
-            report_message = await bug_channel.send(f"Reporte de {member.mention} para el equipo de <@&{config.OPERECIONES_ROLES_ID}>:", embed=embed)
-            # Guardar el ID del mensaje en el topic del canal
-            await channel.edit(topic=f"ID del reporte de bug: {report_message.id}")
+            # Adjuntos: se suben de nuevo si no son muy grandes (la primera imagen se ve en el embed)
+            image_url, files, links = await self.relay.prepare(report['attachments'])
+            if image_url:
+                embed.set_image(url=image_url)
+            if links:
+                links_value = "\n".join(f"[{meta['filename']}]({meta['url']})" for meta in links)
+                embed.add_field(name="Adjuntos", value=links_value[:1024], inline=False)
+            try:
+                report_message = await bug_channel.send(f"Reporte de {member.mention} para el equipo de <@&{config.OPERECIONES_ROLES_ID}>:", embed=embed, files=files)
+            finally:
+                close_files(files)
+            self.store.update_report(report['id'], report_message_id=report_message.id)
+            # Guardar el ID del mensaje en el topic del canal (solo informativo), conservando la marca del ticket
+            await channel.edit(topic=f"{ticket_marker(KIND_BUG, member.id)} ID del reporte de bug: {report_message.id}")
             await channel.send("✅ ¡Reporte enviado! El equipo de Operaciones ha sido notificado en el canal oficial de bugs y se comunicará contigo por este medio.")
         else:
             await channel.send(f"✅ ¡Reporte enviado! No se pudo enviar al canal oficial de bugs (ID no encontrado), pero el equipo de <@&{config.OPERECIONES_ROLES_ID}> ha sido notificado.")
@@ -76,44 +145,38 @@ class BugInfo(commands.Cog):
     async def start_bug_solved_flow(self, channel: discord.TextChannel, member: discord.Member):
         """
         Inicia un flujo de preguntas para saber cómo se resolvió el problema.
+        Las respuestas se procesan en `finish_bug_solved` cuando el cuestionario termina.
         """
-        await channel.send(f"¡Hola, {member.mention}! Responde a las siguientes preguntas para documentar la solución del bug. El canal se cerrará una vez finalizado el proceso.")
-        
-        questions = [
-            "1. **¿Cuál fue la solución?**",
-            "2. **Detalles: **",
-            "3. **¿Hay alguna información adicional a tener en cuenta?**"
-        ]
-
-        answers = {}
+        conversations = self._conversations()
+        if not conversations:
+            await channel.send("❌ Error: El módulo de conversaciones no está disponible. Contacta a un administrador.")
+            return
 
-        def check_message(message):
-            return message.author == member and message.channel == channel
+        await channel.send(f"¡Hola, {member.mention}! Responde a las siguientes preguntas para documentar la solución del bug. El canal se cerrará una vez finalizado el proceso.")
+        await conversations.start(channel, member, BUG_SOLVED_QUESTIONNAIRE.name)
 
-        for i, question in enumerate(questions):
-            await channel.send(question)
-            try:
-                response = await self.bot.wait_for('message', check=check_message, timeout=500.0)
-                answers[f"answer_{i+1}"] = response.content
-            except asyncio.TimeoutError:
-                await channel.send("❌ Se ha agotado el tiempo. El canal no se cerrará. Puedes usar `&bug_resuelto` nuevamente si lo deseas.")
-                return
+    async def finish_bug_solved(self, channel: discord.TextChannel, member: discord.Member, answers: list, data: dict):
+        """
+        Envía el reporte de la solución y cierra el canal del bug.
+        """
+        answers = {f"answer_{i+1}": answer for i, answer in enumerate(answers)}
 
-        # Compilar el reporte de la solución
+        # Compilar el reporte de la solución a partir del reporte guardado localmente
         plataforma = "No especificada"
-        if channel.topic and "ID del reporte de bug: " in channel.topic:
-            try:
-                report_id = int(channel.topic.split("ID del reporte de bug: ")[1])
-                bug_channel = self.bot.get_channel(config.BUGS_CHANNEL_ID)
-                if bug_channel:
-                    report_message = await bug_channel.fetch_message(report_id)
-                    if report_message.embeds:
-                        for field in report_message.embeds[0].fields:
-                            if field.name == "Plataforma":
-                                plataforma = field.value
-                                break
-            except (ValueError, discord.NotFound, discord.Forbidden):
-                pass
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        report = self.store.get_open_by_channel(channel.id)
+        if report:
+            plataforma = report.get('platform') or plataforma
+            report = self.store.resolve_report(
+                report['id'],
+                resolver_id=member.id,
+                solution=answers.get("answer_1"),
+                solution_details=answers.get("answer_2"),
+                notes=answers.get("answer_3"),
+            )
+            self.analytics.record_resolved(report)
+            self.bot.router.unwatch_channel(channel.id, self.on_bug_channel_message)
+            await self.bot.notion.run(LANE_INTERACTIVE, notion_utils.update_bug_report, self.bot.notion, report.get('notion_page_id'), report)
 
         embed = discord.Embed(
             title="✅ Bug Resuelto",
@@ -131,17 +194,118 @@ class BugInfo(commands.Cog):
         # Enviar el reporte al canal de bugs oficial y luego cerrar el canal privado
         bug_channel = self.bot.get_channel(config.BUGS_CHANNEL_ID)
         if bug_channel:
-            await bug_channel.send(f"Reporte de solución para el equipo de <@&{config.OPERECIONES_ROLES_ID}>:", embed=embed)
+            # Exportar la conversación antes de cerrar el canal y adjuntarla al reporte de solución
+            transcript_path = await ticket_cog.export_transcript(channel) if ticket_cog else None
+            transcript_file = ticket_cog.transcript_file(transcript_path) if transcript_path else None
+            if transcript_path and transcript_file is None:
+                embed.add_field(name="Transcript", value=f"Guardado en el servidor: `{transcript_path}`", inline=False)
+
+            files = [transcript_file] if transcript_file else []
+            try:
+                report_message = await bug_channel.send(f"Reporte de solución para el equipo de <@&{config.OPERECIONES_ROLES_ID}>:", embed=embed, files=files)
+            finally:
+                close_files(files)
+            if report and transcript_path:
+                # Se guarda el enlace al mensaje (no el del adjunto, que caduca) o la ruta en el servidor
+                transcript = report_message.jump_url if report_message.attachments else transcript_path
+                self.store.update_report(report['id'], transcript=transcript)
+
             await channel.send("✅ ¡Reporte de solución enviado! El equipo de Operaciones ha sido notificado y este canal se cerrará en 5 segundos.")
             await asyncio.sleep(5)
-            # Intentar eliminar el canal
-            ticket_cog = self.bot.get_cog('TicketManagement')
+            # Intentar eliminar el canal (si no se pudo exportar la conversación, se vuelve a intentar al cerrar)
             if ticket_cog:
-                await ticket_cog.close_bug_channel(channel)
+                await ticket_cog.close_bug_channel(channel, transcript_path)
         else:
             await channel.send("❌ No se pudo enviar el reporte de solución (ID de canal de bugs no encontrado). El canal no se cerrará automáticamente.")
             print(f"Advertencia: No se encontró el canal de bugs con el ID: {config.BUGS_CHANNEL_ID}")
 
+    async def abandon_bug_report(self, channel_id: int, idle_hours: float):
+        """
+        Marca como abandonado el reporte abierto de un canal que se cerró por inactividad.
+        No cuenta en los tiempos de resolución de las estadísticas.
+        """
+        report = self.store.get_open_by_channel(channel_id)
+        if not report:
+            return
+        report = self.store.abandon_report(report['id'], notes=f"Sin actividad durante {idle_hours:.0f} horas.")
+        self.bot.router.unwatch_channel(channel_id, self.on_bug_channel_message)
+        await self.bot.notion.run(LANE_REPORTS, notion_utils.update_bug_report, self.bot.notion, report.get('notion_page_id'), report)
+
+    async def on_bug_channel_message(self, message: discord.Message):
+        """
+        Observador del enrutador para los canales de bugs abiertos: registra la primera
+        respuesta de alguien distinto del reportero y deja de observar el canal.
+        """
+        report = self.store.get_open_by_channel(message.channel.id)
+        if not report or report.get('first_response_at'):
+            self.bot.router.unwatch_channel(message.channel.id, self.on_bug_channel_message)
+            return
+        if message.author.id == report['reporter_id']:
+            return
+
+        self.store.update_report(report['id'], first_response_at=utc_now_iso(), first_responder_id=message.author.id)
+        self.analytics.record_first_response(self.store.get_report(report['id']))
+        self.bot.router.unwatch_channel(message.channel.id, self.on_bug_channel_message)
+
+    def build_weekly_digest(self, today: datetime.date) -> discord.Embed:
+        """
+        Construye el resumen de la semana anterior a `today` a partir de los agregados.
+        """
+        last_week = week_key(today - datetime.timedelta(weeks=1))
+        previous_week = week_key(today - datetime.timedelta(weeks=2))
+
+        embed = discord.Embed(title=f"📊 Resumen semanal de bugs ({last_week})", color=discord.Color.orange())
+
+        platforms = self.analytics.platform_counts(last_week)
+        previous_platforms = self.analytics.platform_counts(previous_week)
+        opened = sum(p['opened'] for p in platforms.values())
+        resolved = sum(p['resolved'] for p in platforms.values())
+        embed.add_field(name="Abiertos / Resueltos", value=f"{opened} / {resolved}", inline=False)
+
+        for metric, label in ((METRIC_FIRST_RESPONSE, "Tiempo a la primera respuesta"), (METRIC_RESOLUTION, "Tiempo a la resolución")):
+            weekly = self.analytics.percentiles(metric, weeks=[last_week])
+            overall = self.analytics.percentiles(metric)
+            value = (
+                f"p50 {format_duration(weekly[0.5])} · p90 {format_duration(weekly[0.9])} · p99 {format_duration(weekly[0.99])} "
+                f"(n={weekly['count']})\nHistórico: p50 {format_duration(overall[0.5])} · p90 {format_duration(overall[0.9])}"
+            )
+            embed.add_field(name=label, value=value, inline=False)
+
+        if platforms:
+            lines = []
+            for platform, counts in sorted(platforms.items(), key=lambda item: item[1]['opened'], reverse=True)[:10]:
+                delta = counts['opened'] - previous_platforms.get(platform, {}).get('opened', 0)
+                trend = f"▲ +{delta}" if delta > 0 else (f"▼ {delta}" if delta < 0 else "=")
+                lines.append(f"**{platform.title()}**: {counts['opened']} abiertos ({trend}), {counts['resolved']} resueltos")
+            embed.add_field(name="Plataformas", value="\n".join(lines), inline=False)
+        else:
+            embed.add_field(name="Plataformas", value="Sin bugs esta semana.", inline=False)
+        return embed
+
+    @tasks.loop(time=datetime.time(hour=9, minute=0, tzinfo=pytz.timezone('America/Argentina/Buenos_Aires')))
+    @leader_only
+    @metrics.timed(metrics.KIND_TASK)
+    async def weekly_bug_digest(self):
+        """
+        Publica cada lunes en el canal de bugs el resumen de la semana anterior.
+        """
+        today = datetime.datetime.now(REPORT_TIMEZONE).date()
+        if today.weekday() != 0:
+            return
+
+        bug_channel = self.bot.get_channel(config.BUGS_CHANNEL_ID)
+        if not bug_channel:
+            print(f"Advertencia: No se encontró el canal de bugs con el ID: {config.BUGS_CHANNEL_ID}")
+            return
+        try:
+            await bug_channel.send(embed=self.build_weekly_digest(today))
+        except Exception as e:
+            print(f"❌ Error al enviar el resumen semanal de bugs: {e}")
+
+    @weekly_bug_digest.before_loop
+    async def before_weekly_bug_digest(self):
+        await self.bot.wait_until_ready()
+
 async def setup(bot):
     """
     Función de configuración para añadir el cog de BugInfo al bot.
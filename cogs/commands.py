@@ -4,7 +4,7 @@ import discord
 from discord.ext import commands
 import asyncio # Necesario para el sleep en el comando limpiar
 
-import config # Importa la configuración para acceder a user_conversations
+import config # Importa la configuración
 from utils.helpers import get_help_message # Importa la función de ayuda
 # Importar las vistas aquí. Asumimos que views/main_menu.py existirá.
 # CloseTicketView ya no se importa aquí
@@ -97,10 +97,12 @@ class Commands(commands.Cog):
             await ctx.send("❌ Error: El módulo de gestión de tickets o de información de bugs no está disponible. Contacta a un administrador.")
             return
 
-        # Llamamos a la función para crear el canal de bug
-        channel, message = await ticket_cog.create_bug_channel(ctx.author)
+        # Reutilizamos el canal de bug abierto del usuario o creamos uno nuevo
+        channel, message, created = await ticket_cog.get_or_create_bug_channel(ctx.author)
 
-        if channel:
+        if channel and not created:
+            await ctx.send(f"ℹ️ {message}. Continúa allí tu reporte.")
+        elif channel:
             # Si el canal se creó exitosamente, enviamos la confirmación al canal original
             # y llamamos al flujo de preguntas en el nuevo cog.
             await ctx.send(f"✅ Ingresa al {message} y reporta el problema respondiendo las preguntas.")
@@ -114,8 +116,9 @@ class Commands(commands.Cog):
         """
         Comando para cerrar un canal de bug y enviar un reporte de la solución.
         """
-        # Verificar si el comando se ejecuta en un canal de bugs.
-        if not ctx.channel.name.startswith('bug-'):
+        # Verificar si el comando se ejecuta en un canal de bugs (consulta O(1) al registro de tickets).
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        if not ticket_cog or not ticket_cog.get_bug_ticket(ctx.channel.id):
             await ctx.send("❌ Este comando solo puede ser usado en un canal de bug. Si quieres crear uno, usa `&bug`.")
             return
 
@@ -125,6 +128,49 @@ class Commands(commands.Cog):
             return
 
         await bug_info_cog.start_bug_solved_flow(ctx.channel, ctx.author)
+
+    @commands.group(name='bugs', help='Consultas sobre los reportes de bugs. Uso: `&bugs abiertos`.', invoke_without_command=True)
+    @commands.has_permissions(administrator=True)
+    async def bugs(self, ctx):
+        """
+        Grupo de comandos para consultar los reportes de bugs guardados.
+        """
+        await ctx.send("ℹ️ Uso: `&bugs abiertos` para listar los bugs que siguen sin resolver.")
+
+    # Los chequeos del grupo no se aplican a sus subcomandos: cada uno declara los suyos
+    @bugs.command(name='abiertos', help='Lista los bugs que siguen abiertos.')
+    @commands.has_permissions(administrator=True)
+    async def bugs_abiertos(self, ctx):
+        """
+        Lista los reportes de bugs abiertos a partir del almacén local (sin recorrer canales).
+        """
+        bug_info_cog = self.bot.get_cog('BugInfo')
+        if not bug_info_cog:
+            await ctx.send("❌ Error: El módulo de información de bugs no está disponible. Contacta a un administrador.")
+            return
+
+        open_reports = bug_info_cog.store.list_open()
+        if not open_reports:
+            await ctx.send("✅ No hay bugs abiertos.")
+            return
+
+        lines = [f"**🐞 Bugs abiertos ({len(open_reports)}):**"]
+        for report in open_reports:
+            opened_at = discord.utils.parse_time(report['opened_at'])
+            lines.append(
+                f"`#{report['id']}` <#{report['channel_id']}> · {report['platform'] or 'N/A'} · "
+                f"<@{report['reporter_id']}> · abierto {discord.utils.format_dt(opened_at, 'R')}"
+            )
+
+        # Respetar el límite de 2000 caracteres de Discord
+        message = ""
+        for line in lines:
+            if len(message) + len(line) + 1 > 2000:
+                await ctx.send(message)
+                message = ""
+            message += line + "\n"
+        if message:
+            await ctx.send(message)
     '''
     @commands.command(name='limpiar', help='Elimina un número específico de mensajes o todos los mensajes del canal.')
     @commands.has_permissions(manage_messages=True) # Requiere permiso para gestionar mensajes
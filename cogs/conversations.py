@@ -0,0 +1,63 @@
+# Archivo: cogs/conversations.py
+
+import os
+import discord
+from discord.ext import commands, tasks
+
+import config
+from utils import metrics
+from utils.questionnaire import QuestionnaireEngine
+
+class Conversations(commands.Cog):
+    """
+    Cog que aloja el motor de cuestionarios compartido por todos los flujos
+    conversacionales del bot (reporte de bugs, solución de bugs, "Hablar con un Humano").
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.engine = QuestionnaireEngine(bot, os.path.join(config.DATA_DIR, 'conversations.json'))
+        self.engine.load()
+        # El enrutador central entrega aquí solo los mensajes de pares (canal, autor) con una sesión abierta
+        self.bot.router.register_conversations(self.engine.sessions, self.engine.dispatch)
+        self.expire_sessions.start()
+
+    def cog_unload(self):
+        self.expire_sessions.cancel()
+        self.bot.router.register_conversations(frozenset(), None)
+        self.engine.save()
+
+    async def start(self, channel: discord.abc.Messageable, member: discord.abc.User, name: str, data: dict = None, intro: str = None):
+        """Abre el cuestionario `name` para `member` en `channel`."""
+        return await self.engine.start(channel, member, name, data=data, intro=intro)
+
+    def has_open_questionnaire(self, user_id: int, name: str = None) -> bool:
+        """Indica si el usuario ya tiene un cuestionario abierto."""
+        return self.engine.user_has_session(user_id, name)
+
+    @commands.command(name='enrutador', help='Muestra cuántos mensajes procesó cada ruta del enrutador y su costo medio.')
+    @commands.has_permissions(administrator=True)
+    async def enrutador(self, ctx):
+        """
+        Muestra los contadores por ruta del enrutador central de mensajes.
+        """
+        lines = ["**📨 Enrutador de mensajes:**"]
+        for route, data in self.bot.router.stats().items():
+            lines.append(f"`{route}`: {data['count']} mensajes, {data['avg_us']:.1f} µs de media para decidir la ruta")
+        lines.append(f"Conversaciones abiertas: {len(self.engine.sessions)}")
+        await ctx.send("\n".join(lines))
+
+    @tasks.loop(seconds=5)
+    @metrics.timed(metrics.KIND_TASK)
+    async def expire_sessions(self):
+        """Cierra las sesiones cuyo tiempo de espera se agotó y guarda los cambios pendientes."""
+        await self.engine.expire_sessions()
+
+    @expire_sessions.before_loop
+    async def before_expire_sessions(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    """
+    Función de configuración para añadir el cog de Conversations al bot.
+    """
+    await bot.add_cog(Conversations(bot))
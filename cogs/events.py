@@ -1,9 +1,17 @@
 # Archivo: cogs/events.py
 
+import asyncio
+import datetime
+import os
+import time
+
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import config # Importa la configuración desde el módulo config
+from utils import metrics
 from utils import notion_utils # Importa el módulo de utilidades de Notion
+from utils.activity_spool import ActivitySpool
+from utils.notion_limiter import LANE_ACTIVITY
 
 class Events(commands.Cog):
     """
@@ -15,6 +23,33 @@ class Events(commands.Cog):
             config.COWORKING_CHANNEL_ID,
             config.REUNIONES_CHANNEL_ID,
         }
+        # Registros que no se pudieron enviar a Notion; se reenvían en orden cuando vuelve a responder
+        self.spool = ActivitySpool(os.path.join(config.DATA_DIR, 'activity_spool.jsonl'))
+        self.flush_failures = 0
+        self.flush_retry_at = 0.0
+        self.flush_activity_spool.start()
+        self.bot.lifecycle.on_shutdown(self.drain_spool)
+
+    def cog_unload(self):
+        self.flush_activity_spool.cancel()
+
+    async def drain_spool(self):
+        """
+        Al apagarse, intenta enviar los registros pendientes (los que queden siguen en disco).
+        La tarea periódica se detiene antes; si estaba enviando un lote, se espera a que termine
+        (mientras tanto `drain` devuelve 0 enviados sin fallos).
+        """
+        self.flush_activity_spool.cancel()
+        while self.spool.pending and not self.bot.notion.degraded:
+            sent, ok = await self.bot.notion.run(
+                LANE_ACTIVITY,
+                self.spool.drain,
+                lambda entry: notion_utils.add_activity_log(self.bot.notion, **entry),
+            )
+            if not ok:
+                break
+            if not sent:
+                await asyncio.sleep(0.5)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -26,67 +61,6 @@ class Events(commands.Cog):
         print(f'ID del bot: {self.bot.user.id}')
         print('------')
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        """
-        Se dispara cuando un nuevo miembro se une al servidor.
-        Crea un nuevo canal privado para el miembro y le da la bienvenida.
-        """
-        print(f"[DEBUG] Nuevo miembro detectado: {member} (ID: {member.id})")
-        if member.bot:
-            print("[DEBUG] El miembro es un bot, no se crea canal.")
-            return
-
-        guild = member.guild
-        category_id = config.NUEVO_INGRESO_CATEGORY_ID
-        neuro_team = config.NEURO_TEAM_ROLE_ID
-
-        print(f"[DEBUG] category_id: {category_id}, neuro_team: {neuro_team}")
-
-        if not all([category_id, neuro_team]):
-            print("Advertencia: La categoría de nuevo ingreso, el rol de atención al cliente o el rol de neuro team no están configurados.")
-            return
-
-        category = guild.get_channel(category_id)
-        neuro_team_role = guild.get_role(neuro_team)
-
-        print(f"[DEBUG] category: {category}, neuro_team_role: {neuro_team_role}")
-
-        if not category or not neuro_team_role:
-            print("Advertencia: No se pudo encontrar la categoría o los roles especificados.")
-            return
-
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            member: discord.PermissionOverwrite(read_messages=True),
-            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
-        }
-
-        channel_name = f"{member.name}"
-        try:
-            print(f"[DEBUG] Creando canal: {channel_name} en categoría: {category.name}")
-            new_channel = await guild.create_text_channel(
-                name=channel_name,
-                category=category,
-                overwrites=overwrites
-            )
-            print(f"[DEBUG] Canal creado: {new_channel.name} (ID: {new_channel.id})")
-            welcome_message = (
-
-                f"Holaa {member.mention} ✨ !\n\n"
-                f"Con todo el {neuro_team_role.mention} te damos la bienvenida a tu Chat Personal!🙌 \n"
-
-                "En este canal vas a poder conversar con todos los especialistas de Neurocogniciones y además te podremos dar un seguimiento mucho más personalizado!✅ \n\n"
-                "Estamos para todo por aquí, literalmente cualquier duda, feedback, dificultad o barrera que se te presente, nos lo comunicas por aquí y nosotros estaremos al pendiente.🧐 \n\n"
-                "➡️ Puedes usar el @ para mencionar a cualquier miembro, eso ayuda porque nos llega la notificación de que nos etiquetaron!💕"
-            )
-            await new_channel.send(welcome_message)
-            print("[DEBUG] Mensaje de bienvenida enviado correctamente.")
-        except discord.Forbidden as e:
-            print(f"Error de permisos al crear o enviar mensajes en el canal de bienvenida: {e}")
-        except Exception as e:
-            print(f"Ha ocurrido un error al crear el canal de bienvenida: {e}")
-
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         """
@@ -99,20 +73,54 @@ class Events(commands.Cog):
         # User joins a voice channel
         if before.channel is None and after.channel is not None:
             if after.channel.id in self.tracked_channels:
-                notion_utils.add_activity_log(
-                    id_member=str(member.id),
-                    entrada=True,
-                    canal=after.channel.name
-                )
+                await self.log_activity(member, True, after.channel.name)
 
         # User leaves a voice channel
         if before.channel is not None and after.channel is None:
             if before.channel.id in self.tracked_channels:
-                notion_utils.add_activity_log(
-                    id_member=str(member.id),
-                    entrada=False,
-                    canal=before.channel.name
-                )
+                await self.log_activity(member, False, before.channel.name)
+
+    async def log_activity(self, member, entrada: bool, canal: str):
+        """
+        Registra una entrada o salida en Notion. Si Notion no responde (o ya hay registros
+        pendientes, para no desordenarlos), el registro se guarda en disco con su hora real.
+        """
+        entry = {
+            "id_member": str(member.id),
+            "entrada": entrada,
+            "canal": canal,
+            "fecha_hora": datetime.datetime.now().isoformat(),
+        }
+        if self.spool.pending or self.bot.notion.degraded:
+            self.spool.append(entry)
+            return
+        if not await self.bot.notion.run(LANE_ACTIVITY, notion_utils.add_activity_log, self.bot.notion, **entry):
+            self.spool.append(entry)
+
+    @tasks.loop(seconds=60)
+    @metrics.timed(metrics.KIND_TASK)
+    async def flush_activity_spool(self):
+        """Reenvía los registros pendientes; si Notion sigue sin responder, espera cada vez más."""
+        if not self.spool.pending or time.monotonic() < self.flush_retry_at:
+            return
+        sent, ok = await self.bot.notion.run(
+            LANE_ACTIVITY,
+            self.spool.drain,
+            lambda entry: notion_utils.add_activity_log(self.bot.notion, **entry),
+        )
+        if ok:
+            self.flush_failures = 0
+            if sent:
+                print(f"✅ {sent} registros de actividad pendientes enviados a Notion ({self.spool.pending} restantes).")
+            return
+        self.flush_failures += 1
+        delay = min(config.NOTION_MAX_BACKOFF_SECONDS, 60 * 2 ** (self.flush_failures - 1))
+        self.flush_retry_at = time.monotonic() + delay
+        print(f"Advertencia: Quedan {self.spool.pending} registros de actividad pendientes. Próximo intento en {delay:.0f}s.")
+
+    @flush_activity_spool.before_loop
+    async def before_flush_activity_spool(self):
+        await self.bot.wait_until_ready()
 
 # La función setup es necesaria para que Discord.py cargue el cog
 async def setup(bot):
@@ -2,11 +2,22 @@
 
 import discord
 from discord.ext import commands
-import asyncio
 
-import config # Importa la configuración para acceder a user_conversations y IDs
+from utils.questionnaire import Question, Questionnaire, register_questionnaire
 
-from views.main_menu import CloseTicketView # Importa la vista para cerrar el ticket (aunque ya no se usará directamente para el nuevo canal, se mantiene si hay otros flujos que la usen)
+# --- CUESTIONARIO "HABLAR CON UN HUMANO" ---
+
+HUMAN_CONTACT_QUESTIONNAIRE = register_questionnaire(Questionnaire(
+    name='human_contact',
+    questions=[
+        Question("**1. Describe el problema o dificultad que encontraste. Sé específico y da todos los detalles necesarios para que podamos ayudarte mejor.**"),
+        Question("**2. ¿Qué acciones intentaste para resolverlo?**"),
+        Question("**3. ¿Qué herramienta del programa crees que podría ayudarte a solucionarlo?**"),
+        Question("**4. ¡Muchas gracias por tu información! Mientras te contacta la Client Success Manager, ¿cuál podría ser tu primer paso para empezar a resolver tu problema?**"),
+    ],
+    cog='HumanInteraction',
+    on_complete='finish_human_contact',
+))
 
 
 class HumanInteraction(commands.Cog):
@@ -19,80 +30,45 @@ class HumanInteraction(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    async def start_human_contact_flow(self, channel: discord.abc.Messageable, member: discord.abc.User, selected_human_id: int):
         """
-        Maneja los mensajes para el flujo de conversación "Hablar con un Humano".
-        Este listener se activa para cada mensaje enviado en el servidor.
+        Inicia las preguntas de "Hablar con un Humano" en el canal donde se eligió el contacto.
         """
-        # Ignorar mensajes del propio bot
-        if message.author == self.bot.user:
+        conversations = self.bot.get_cog('Conversations')
+        if not conversations:
+            await channel.send("❌ Error: El módulo de conversaciones no está disponible. Contacta a un administrador.")
             return
 
-        user_id = message.author.id
-
-        # Si el usuario está en una conversación de "Hablar con un Humano" y el estado es mayor a 0 (indicando que las preguntas han comenzado)
-        if user_id in config.user_conversations and config.user_conversations[user_id]['state'] > 0:
-            conversation_state = config.user_conversations[user_id]
-            current_question_number = conversation_state['state']
-            
-            # Almacenar la respuesta actual
-            # Aquí almacenamos la respuesta de la pregunta anterior
-            conversation_state['answers'].append(f"Pregunta {current_question_number}: {message.content}")
-
-            # Definir las preguntas
-            questions = [
-                "1. Describe el problema o dificultad que encontraste. Sé específico y da todos los detalles necesarios para que podamos ayudarte mejor.",
-                "2. ¿Qué acciones intentaste para resolverlo?",
-                "3. ¿Qué herramienta del programa crees que podría ayudarte a solucionarlo?",
-                "4. ¡Muchas gracias por tu información! Mientras te contacta la Client Success Manager, ¿cuál podría ser tu primer paso para empezar a resolver tu problema?"
-            ]
-
-            # Avanzar a la siguiente pregunta o finalizar la conversación
-            if current_question_number < len(questions):
-                conversation_state['state'] += 1
-                await message.channel.send(f"**{questions[conversation_state['state'] - 1]}**")
-            else:
-                # Todas las preguntas respondidas. Publicar las respuestas en el canal actual y etiquetar.
-                config.user_conversations[user_id]['state'] = 0 # Reiniciar estado para el usuario
-                
-                guild = message.guild
-                
-                # Publicar las respuestas en el canal actual
-                answers_message = "**ℹ️ Información:**\n"
-                for i, ans_text in enumerate(conversation_state['answers']):
-                    # Reconstruir las preguntas originales en el mensaje final
-                    # Se usa .split('.', 1)[0] para obtener solo el número de la pregunta
-                    # y .split(':', 1)[1].strip() para obtener la respuesta del usuario.
-                    answers_message += f"**{questions[i].split('.', 1)[0]}.** {ans_text.split(':', 1)[1].strip()}\n"
-                selected_human_id = conversation_state.get('selected_human')
-                '''
-                answers_message += f"\nEstudiante: {message.author.mention}"
-                # Etiquetar a la persona seleccionada
-                if selected_human_id:
-                    answers_message += f"\nConsultor asignado: <@{selected_human_id}>"
-                '''
-                # Enviar el resumen de la conversación
-                await message.channel.send(answers_message)
-
-                # Etiquetar a la persona específica y al rol de atención al cliente (si existe)
-                mention_message = f"\nHola, <@{selected_human_id}>, el caso de {message.author.mention} ya está listo para su revisión, completó todos los pasos!"
-                
-                await message.channel.send(mention_message)
-
-                await message.channel.send(
-                    f"\nGracias, {message.author.mention}, por seguir los pasos detalladamente! Estamos en proceso, muy pronto vas a tener novedades aquí mismo para ayudarte personalizadamente!"
-                )
-
-                # Limpiar el estado de la conversación para el usuario una vez finalizada
-                del config.user_conversations[user_id]
-            
-            # No procesar el mensaje como un comando si está en un flujo de conversación
-            return
+        await conversations.start(
+            channel,
+            member,
+            HUMAN_CONTACT_QUESTIONNAIRE.name,
+            data={'selected_human': selected_human_id},
+            intro="¡Perfecto! Para poder ayudarte mejor, por favor, responde las preguntas:"
+        )
 
-        
-        # ELIMINADO: La llamada a await self.bot.process_commands(message) ha sido eliminada de aquí.
-        # Esto evita que los comandos se procesen dos veces, ya que bot.py ya lo maneja.
+    async def finish_human_contact(self, channel: discord.abc.Messageable, member: discord.abc.User, answers: list, data: dict):
+        """
+        Todas las preguntas respondidas. Publica las respuestas en el canal actual y etiqueta
+        a la persona seleccionada.
+        """
+        answers_message = "**ℹ️ Información:**\n"
+        for i, answer in enumerate(answers):
+            # Se usa el número de la pregunta original para reconstruir el resumen
+            question_number = HUMAN_CONTACT_QUESTIONNAIRE.questions[i].text.strip('*').split('.', 1)[0]
+            answers_message += f"**{question_number}.** {answer.strip()}\n"
+        selected_human_id = data.get('selected_human')
+
+        # Enviar el resumen de la conversación
+        await channel.send(answers_message)
+
+        # Etiquetar a la persona específica
+        mention_message = f"\nHola, <@{selected_human_id}>, el caso de {member.mention} ya está listo para su revisión, completó todos los pasos!"
+        await channel.send(mention_message)
+
+        await channel.send(
+            f"\nGracias, {member.mention}, por seguir los pasos detalladamente! Estamos en proceso, muy pronto vas a tener novedades aquí mismo para ayudarte personalizadamente!"
+        )
 
 
 # La función setup es necesaria para que Discord.py cargue el cog
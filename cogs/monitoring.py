@@ -0,0 +1,94 @@
+# Archivo: cogs/monitoring.py
+
+from discord.ext import commands
+
+import config
+from utils import metrics
+from utils.loop_watchdog import LoopWatchdog
+
+KIND_TITLES = {
+    metrics.KIND_NOTION: "🗄️ Notion",
+    metrics.KIND_DISCORD: "💬 API de Discord",
+    metrics.KIND_INTERACTION: "🖱️ Interacciones",
+    metrics.KIND_LISTENER: "👂 Listeners",
+    metrics.KIND_TASK: "⏲️ Tareas en segundo plano",
+    metrics.KIND_LOOP: "🔄 Retraso del event loop",
+    metrics.KIND_STALL: "🧊 Bloqueos del event loop (por punto de llamada)",
+}
+ROWS_PER_KIND = 6  # Las operaciones más lentas (p95) de cada tipo, para no pasar el límite de 2000 caracteres
+
+
+class Monitoring(commands.Cog):
+    """
+    Cog que publica las métricas del bot (utils/metrics.py): un endpoint local en formato
+    Prometheus, si `METRICS_PORT` está configurado, y el comando `&estado`. También vigila
+    el retraso del event loop (utils/loop_watchdog.py).
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.runner = None
+        self.watchdog = None
+        if config.LOOP_STALL_THRESHOLD_MS > 0:
+            self.watchdog = LoopWatchdog(
+                threshold=config.LOOP_STALL_THRESHOLD_MS / 1000,
+                log_interval=config.LOOP_STALL_LOG_SECONDS,
+            )
+
+    async def cog_load(self):
+        if self.watchdog is not None:
+            self.watchdog.start()
+        if not config.METRICS_PORT:
+            return
+        try:
+            self.runner = await metrics.start_http_server(config.METRICS_PORT, config.METRICS_HOST)
+            print(f"ℹ️ Métricas disponibles en http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"❌ No se pudo abrir el puerto de métricas {config.METRICS_PORT}: {e}")
+
+    async def cog_unload(self):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    @commands.command(name='estado', help='Muestra la latencia (p50/p95/p99) de Notion, Discord, listeners, interacciones y tareas.')
+    @commands.has_permissions(administrator=True)
+    async def estado(self, ctx):
+        """
+        Resume las mediciones de cada tipo de operación: cantidad de llamadas, errores y los
+        percentiles 50, 95 y 99 de las últimas llamadas de las operaciones más lentas.
+        """
+        rows = metrics.REGISTRY.summary()
+        if not rows:
+            await ctx.send("ℹ️ Todavía no hay mediciones.")
+            return
+        lines = ["**📊 Latencias** (ms, últimas llamadas de cada operación):"]
+        leader = getattr(self.bot, 'leader', None)
+        if leader is not None and leader.backend is not None:
+            info = leader.stats()
+            role = f"líder (periodo {info['epoch']})" if info['leader'] else "en espera"
+            lines.append(f"**Instancia** `{info['holder']}`: {role} · {info['elections']} elecciones · {info['errors']} errores de lease")
+        for kind in metrics.KINDS:
+            kind_rows = sorted((r for r in rows if r['kind'] == kind), key=lambda r: -r['p95'])
+            if not kind_rows:
+                continue
+            total = sum(r['count'] for r in kind_rows)
+            errors = sum(r['errors'] for r in kind_rows)
+            lines.append(f"**{KIND_TITLES[kind]}** · {total} llamadas, {errors} errores")
+            for r in kind_rows[:ROWS_PER_KIND]:
+                lines.append(
+                    f"`{r['name'][:48]}`: {r['count']} · p50 {r['p50'] * 1000:.0f} · "
+                    f"p95 {r['p95'] * 1000:.0f} · p99 {r['p99'] * 1000:.0f}"
+                    + (f" · ❌ {r['errors']}" if r['errors'] else "")
+                )
+            if len(kind_rows) > ROWS_PER_KIND:
+                lines.append(f"… y {len(kind_rows) - ROWS_PER_KIND} más")
+        await ctx.send("\n".join(lines)[:2000])
+
+# La función setup es necesaria para que Discord.py cargue el cog
+async def setup(bot):
+    """
+    Función de configuración para añadir el cog de Monitoring al bot.
+    """
+    await bot.add_cog(Monitoring(bot))
@@ -0,0 +1,249 @@
+# Archivo: cogs/onboarding.py
+
+import asyncio
+import datetime
+import json
+import os
+import random
+
+import discord
+from discord.ext import commands, tasks
+
+import config
+from utils.ticket_registry import KIND_ONBOARDING, ticket_marker
+
+
+def build_welcome_message(member: discord.Member, neuro_team_role: discord.Role) -> str:
+    """Mensaje de bienvenida que se publica en el chat personal de cada nuevo miembro."""
+    return (
+
+        f"Holaa {member.mention} ✨ !\n\n"
+        f"Con todo el {neuro_team_role.mention} te damos la bienvenida a tu Chat Personal!🙌 \n"
+
+        "En este canal vas a poder conversar con todos los especialistas de Neurocogniciones y además te podremos dar un seguimiento mucho más personalizado!✅ \n\n"
+        "Estamos para todo por aquí, literalmente cualquier duda, feedback, dificultad o barrera que se te presente, nos lo comunicas por aquí y nosotros estaremos al pendiente.🧐 \n\n"
+        "➡️ Puedes usar el @ para mencionar a cualquier miembro, eso ayuda porque nos llega la notificación de que nos etiquetaron!💕"
+    )
+
+
+class OnboardingJob:
+    """Trabajo pendiente de bienvenida de un miembro. Recuerda qué pasos ya se completaron entre reintentos."""
+    def __init__(self, member: discord.Member):
+        self.member = member
+        self.attempts = 0
+        self.channel = None
+        self.welcomed = False
+
+
+class Onboarding(commands.Cog):
+    """
+    Cog que crea el chat personal de cada nuevo miembro a través de una cola de trabajo.
+
+    Cuando entra una cohorte completa, `on_member_join` solo encola al miembro; un número
+    fijo de workers (`ONBOARDING_WORKERS`) crea los canales respetando los límites de
+    Discord, reintenta con espera exponencial y nunca crea dos canales para el mismo miembro.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.queue = asyncio.Queue()
+        self.pending = set()  # IDs de miembros encolados o en proceso
+        self.workers = []
+        self.completed = 0
+        self.failed = 0
+        # Última vez que el bot estuvo conectado antes de este arranque: `&onboarding backfill`
+        # solo encola a quienes entraron desde entonces (mientras el bot estaba apagado)
+        self.state_path = os.path.join(config.DATA_DIR, 'onboarding.json')
+        self.offline_since = self._load_last_seen()
+        # Al apagarse, se espera a que los workers terminen las bienvenidas encoladas
+        self.bot.lifecycle.on_shutdown(self.queue.join)
+
+    async def cog_load(self):
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(config.ONBOARDING_WORKERS)]
+        self.record_last_seen.start()
+
+    async def cog_unload(self):
+        self.record_last_seen.cancel()
+        for worker in self.workers:
+            worker.cancel()
+
+    def _load_last_seen(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return datetime.datetime.fromisoformat(json.load(f)['last_seen'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Advertencia: No se pudo leer la última conexión del bot ({self.state_path}): {e}")
+            return None
+
+    @tasks.loop(minutes=5)
+    async def record_last_seen(self):
+        """Guarda periódicamente la hora actual como la última en que el bot estuvo conectado."""
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({'last_seen': discord.utils.utcnow().isoformat()}, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            print(f"Advertencia: No se pudo guardar la última conexión del bot: {e}")
+
+    @record_last_seen.before_loop
+    async def before_record_last_seen(self):
+        await self.bot.wait_until_ready()
+
+    def _registry(self):
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        return ticket_cog.registry if ticket_cog else None
+
+    def has_welcome_channel(self, member: discord.Member) -> bool:
+        registry = self._registry()
+        return bool(registry and registry.open_for_member(member.id, KIND_ONBOARDING))
+
+    def enqueue(self, member: discord.Member) -> bool:
+        """
+        Encola la bienvenida de un miembro si no tiene ya su canal ni está en la cola.
+
+        Returns:
+            bool: True si se encoló.
+        """
+        if member.bot or member.id in self.pending or self.has_welcome_channel(member):
+            return False
+        self.pending.add(member.id)
+        self.queue.put_nowait(OnboardingJob(member))
+        return True
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        """
+        Se dispara cuando un nuevo miembro se une al servidor.
+        Encola la creación de su canal privado de bienvenida.
+        """
+        if self.enqueue(member):
+            print(f"ℹ️ Nuevo miembro en cola de bienvenida: {member} (ID: {member.id}). Pendientes: {self.queue.qsize()}")
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, job: OnboardingJob):
+        while True:
+            try:
+                await self._onboard(job)
+                self.completed += 1
+                break
+            except discord.Forbidden as e:
+                # Un error de permisos no se arregla reintentando
+                print(f"Error de permisos al crear o enviar mensajes en el canal de bienvenida de {job.member}: {e}")
+                self.failed += 1
+                break
+            except Exception as e:
+                job.attempts += 1
+                if job.attempts >= config.ONBOARDING_MAX_ATTEMPTS:
+                    print(f"❌ No se pudo crear el canal de bienvenida de {job.member} tras {job.attempts} intentos: {e}")
+                    self.failed += 1
+                    break
+                delay = min(60.0, 2 ** job.attempts) + random.uniform(0, 1)
+                print(f"Advertencia: Falló la bienvenida de {job.member} (intento {job.attempts}): {e}. Reintentando en {delay:.1f}s.")
+                await asyncio.sleep(delay)
+        self.pending.discard(job.member.id)
+
+    async def _onboard(self, job: OnboardingJob):
+        """Crea (si hace falta) el canal del miembro y envía la bienvenida. Es seguro reintentarlo."""
+        member = job.member
+        guild = member.guild
+        category_id = config.NUEVO_INGRESO_CATEGORY_ID
+        neuro_team = config.NEURO_TEAM_ROLE_ID
+
+        if not all([category_id, neuro_team]):
+            print("Advertencia: La categoría de nuevo ingreso o el rol de neuro team no están configurados.")
+            return
+
+        category = guild.get_channel(category_id)
+        neuro_team_role = guild.get_role(neuro_team)
+        ticket_cog = self.bot.get_cog('TicketManagement')
+
+        if not category or not neuro_team_role or not ticket_cog:
+            print("Advertencia: No se pudo encontrar la categoría, el rol de neuro team o el módulo de tickets.")
+            return
+
+        if job.channel is None:
+            existing = ticket_cog.registry.open_for_member(member.id, KIND_ONBOARDING)
+            job.channel = guild.get_channel(existing[0].channel_id) if existing else None
+
+        if job.channel is None:
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                member: discord.PermissionOverwrite(read_messages=True),
+                guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            }
+            job.channel = await ticket_cog.claim_channel(category, f"{member.name}", overwrites, ticket_marker(KIND_ONBOARDING, member.id))
+            ticket_cog.registry.add(job.channel.id, member.id, KIND_ONBOARDING, job.channel.category_id)
+
+        if not job.welcomed:
+            await job.channel.send(build_welcome_message(member, neuro_team_role))
+            job.welcomed = True
+
+    @commands.group(name='onboarding', help='Gestión de la cola de bienvenida. Uso: `&onboarding backfill` o `&onboarding estado`.', invoke_without_command=True)
+    @commands.has_permissions(administrator=True)
+    async def onboarding(self, ctx):
+        await ctx.send("ℹ️ Uso: `&onboarding backfill [horas]` para crear los canales de quienes entraron con el bot apagado o `&onboarding estado` para ver la cola.")
+
+    # Los chequeos del grupo no se aplican a sus subcomandos: cada uno declara los suyos
+    @onboarding.command(name='backfill', help='Crea los canales de bienvenida de quienes entraron con el bot apagado. Uso: `&onboarding backfill [horas]`.')
+    @commands.has_permissions(administrator=True)
+    async def onboarding_backfill(self, ctx, horas: float = None):
+        """
+        Encola la bienvenida de los miembros sin canal personal que entraron mientras el bot
+        estaba apagado (desde su última conexión), o en las últimas `horas` si se indican.
+        Nunca incluye bots, administradores ni miembros con un rol del equipo (`STAFF_ROLE_IDS`).
+        """
+        if horas is not None:
+            since = discord.utils.utcnow() - datetime.timedelta(hours=horas)
+        elif self.offline_since is not None:
+            since = self.offline_since
+        else:
+            await ctx.send("❌ No hay registro de la última conexión del bot. Indica el periodo: `&onboarding backfill <horas>`.")
+            return
+
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        category = ctx.guild.get_channel(config.NUEVO_INGRESO_CATEGORY_ID) if config.NUEVO_INGRESO_CATEGORY_ID else None
+        if not ticket_cog or not isinstance(category, discord.CategoryChannel):
+            await ctx.send("❌ Error: Falta la categoría de nuevo ingreso o el módulo de tickets.")
+            return
+
+        # Asegurar que el registro refleja los canales reales (incluidos los desbordes y el
+        # archivo) antes de decidir quién falta
+        ticket_cog.reconcile_registry(ctx.guild)
+
+        staff_roles = set(config.STAFF_ROLE_IDS)
+        queued = 0
+        async for member in ctx.guild.fetch_members(limit=None):
+            if member.joined_at is None or member.joined_at < since:
+                continue
+            if member.guild_permissions.administrator or any(role.id in staff_roles for role in member.roles):
+                continue
+            if self.enqueue(member):
+                queued += 1
+        await ctx.send(
+            f"✅ Se encolaron {queued} miembros sin canal de bienvenida que entraron desde {discord.utils.format_dt(since, 'f')}. "
+            "Usa `&onboarding estado` para seguir el progreso."
+        )
+
+    @onboarding.command(name='estado', help='Muestra el estado de la cola de bienvenida.')
+    @commands.has_permissions(administrator=True)
+    async def onboarding_estado(self, ctx):
+        await ctx.send(
+            f"**👋 Cola de bienvenida:** {self.queue.qsize()} en cola, {len(self.pending)} pendientes, "
+            f"{self.completed} completados, {self.failed} fallidos ({len(self.workers)} workers)."
+        )
+
+async def setup(bot):
+    """
+    Función de configuración para añadir el cog de Onboarding al bot.
+    """
+    await bot.add_cog(Onboarding(bot))
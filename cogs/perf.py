@@ -0,0 +1,171 @@
+# Archivo: cogs/perf.py
+
+import asyncio
+import datetime
+import gzip
+import io
+import os
+
+import discord
+from discord.ext import commands
+
+import config
+from utils import metrics
+from utils.event_trace import TraceRecorder, dumps_trace
+from utils.profiler import PROJECT_ROOT, MemoryTracker, SamplingProfiler, collapse, top_functions
+
+CPU_MAX_SECONDS = 120
+MEM_MAX_SECONDS = 600
+TRACE_MAX_SECONDS = 3600
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_line(trace) -> str:
+    frame = trace[0]
+    path = frame.filename
+    if path.startswith(PROJECT_ROOT + os.sep):
+        path = os.path.relpath(path, PROJECT_ROOT)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    return f"{path}:{frame.lineno}"
+
+
+class Perf(commands.Cog):
+    """
+    Cog con herramientas para mirar dentro del bot en producción (solo para el dueño del bot).
+    Nada de esto corre mientras no se usa: el perfilador de CPU existe solo mientras dura
+    `&perf cpu`, el rastreo de memoria solo mientras dura `&perf mem` y los eventos solo se
+    graban mientras dura `&perf grabar`.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.profiler = SamplingProfiler()
+        self.memory = MemoryTracker()
+        self.recorder = TraceRecorder(bot, named_channels={
+            config.COWORKING_CHANNEL_ID: 'coworking',
+            config.REUNIONES_CHANNEL_ID: 'reuniones',
+        })
+
+    def cog_unload(self):
+        self.memory.stop()
+        if self.recorder.recording:
+            self.recorder.stop()
+
+    async def cog_check(self, ctx):
+        # Se aplica a todos los comandos del cog, incluidos los subcomandos (los chequeos de un
+        # grupo con invoke_without_command no se ejecutan antes de sus subcomandos)
+        return await self.bot.is_owner(ctx.author)
+
+    @commands.group(name='perf', help='Perfilado en producción. Uso: `&perf cpu 30`, `&perf mem 60`, `&perf listeners` o `&perf grabar 300`.', invoke_without_command=True)
+    async def perf(self, ctx):
+        await ctx.send(
+            "ℹ️ Uso: `&perf cpu <segundos>` (perfil de CPU como flamegraph), `&perf mem <segundos>` (memoria "
+            "asignada durante ese tiempo), `&perf listeners` (tiempo de los listeners por cog) o "
+            "`&perf grabar <segundos>` (graba los eventos para reproducirlos sin conexión)."
+        )
+
+    @perf.command(name='cpu', help='Perfila la CPU por muestreo durante N segundos y devuelve un flamegraph colapsado.')
+    async def perf_cpu(self, ctx, seconds: int = 30):
+        """
+        Muestrea las pilas de todos los hilos durante `seconds` segundos y adjunta el resultado
+        en formato colapsado (se abre con speedscope.app o flamegraph.pl).
+        """
+        seconds = max(1, min(CPU_MAX_SECONDS, seconds))
+        if self.profiler.busy:
+            await ctx.send("❌ Ya hay un perfil de CPU en curso.")
+            return
+        await ctx.send(f"ℹ️ Perfilando la CPU durante {seconds} s...")
+        stacks, samples = await asyncio.to_thread(self.profiler.run, seconds)
+        name = f"perf-cpu-{datetime.datetime.now():%Y%m%d-%H%M%S}.folded"
+        lines = [f"✅ {samples} muestras cada {self.profiler.interval * 1000:.0f} ms. Funciones con más muestras propias:"]
+        for function, count in top_functions(stacks):
+            lines.append(f"`{function[:80]}`: {count / samples:.0%}")
+        data = io.BytesIO(collapse(stacks).encode("utf-8"))
+        await ctx.send("\n".join(lines), file=discord.File(data, filename=name))
+
+    @perf.command(name='mem', help='Rastrea la memoria durante N segundos y muestra las líneas que más asignaron.')
+    async def perf_mem(self, ctx, seconds: int = 60):
+        """
+        Activa tracemalloc durante `seconds` segundos, compara una instantánea del principio con
+        otra del final y lo vuelve a apagar: fuera de la ventana el rastreo no cuesta nada.
+        """
+        seconds = max(1, min(MEM_MAX_SECONDS, seconds))
+        if self.memory.busy:
+            await ctx.send("❌ Ya hay un rastreo de memoria en curso.")
+            return
+        await ctx.send(f"ℹ️ Rastreando la memoria durante {seconds} s...")
+        result = await asyncio.to_thread(self.memory.run, seconds)
+        lines = [f"**🧠 Memoria asignada en la ventana y todavía viva:** {format_bytes(result['current'])} (máximo {format_bytes(result['peak'])})."]
+        lines.append("**Líneas con más memoria:**")
+        for stat in result['top']:
+            lines.append(f"`{format_line(stat.traceback)}`: {format_bytes(stat.size)} en {stat.count} bloques")
+        lines.append("**Cambios entre el principio y el final:**")
+        for stat in result['diff']:
+            lines.append(f"`{format_line(stat.traceback)}`: {'+' if stat.size_diff >= 0 else ''}{format_bytes(stat.size_diff)} ({stat.count_diff:+d} bloques)")
+        await ctx.send("\n".join(lines)[:2000])
+
+    @perf.command(name='listeners', help='Muestra el tiempo de los listeners agrupado por cog.')
+    async def perf_listeners(self, ctx):
+        """Usa las mediciones de cada listener (utils/metrics.py) y las agrupa por el cog que lo define."""
+        owners = {}
+        for cog_name, cog in self.bot.cogs.items():
+            for _, method in cog.get_listeners():
+                owners[method.__qualname__] = cog_name
+        groups = {}
+        for row in metrics.REGISTRY.summary():
+            if row['kind'] == metrics.KIND_LISTENER:
+                groups.setdefault(owners.get(row['name'], 'bot'), []).append(row)
+        if not groups:
+            await ctx.send("ℹ️ Todavía no se ejecutó ningún listener.")
+            return
+
+        def total(rows):
+            return sum(r['avg'] * r['count'] for r in rows)
+
+        lines = ["**👂 Listeners por cog** (tiempo total, ms por llamada):"]
+        for cog_name, rows in sorted(groups.items(), key=lambda item: -total(item[1])):
+            lines.append(f"**{cog_name}** · {sum(r['count'] for r in rows)} llamadas · {total(rows):.2f} s en total")
+            for r in sorted(rows, key=lambda r: -r['avg'] * r['count']):
+                lines.append(
+                    f"`{r['name'].rsplit('.', 1)[-1]}`: {r['count']} · media {r['avg'] * 1000:.1f} · "
+                    f"p95 {r['p95'] * 1000:.1f} · p99 {r['p99'] * 1000:.1f}"
+                    + (f" · ❌ {r['errors']}" if r['errors'] else "")
+                )
+        await ctx.send("\n".join(lines)[:2000])
+
+    @perf.command(name='grabar', help='Graba N segundos de eventos (anonimizados) para reproducirlos con benchmarks/event_replay.py.')
+    async def perf_grabar(self, ctx, seconds: int = 300):
+        """
+        Graba los eventos de voz, ingresos, mensajes y clics en botones durante `seconds`
+        segundos y adjunta la grabación, sin IDs ni textos reales (ver utils/event_trace.py).
+        """
+        seconds = max(1, min(TRACE_MAX_SECONDS, seconds))
+        if self.recorder.recording:
+            await ctx.send("❌ Ya hay una grabación en curso.")
+            return
+        await ctx.send(f"ℹ️ Grabando eventos durante {seconds} s...")
+        self.recorder.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            events = self.recorder.stop()
+        data = gzip.compress(dumps_trace(events, seconds=seconds, dropped=self.recorder.dropped).encode("utf-8"))
+        name = f"trace-{datetime.datetime.now():%Y%m%d-%H%M%S}.jsonl.gz"
+        message = f"✅ {len(events)} eventos grabados. Para reproducirlos: `python -m benchmarks.event_replay --trace {name}`"
+        if self.recorder.dropped:
+            message += f"\nAdvertencia: Se descartaron {self.recorder.dropped} eventos por superar el máximo por grabación."
+        await ctx.send(message, file=discord.File(io.BytesIO(data), filename=name))
+
+# La función setup es necesaria para que Discord.py cargue el cog
+async def setup(bot):
+    """
+    Función de configuración para añadir el cog de Perf al bot.
+    """
+    await bot.add_cog(Perf(bot))
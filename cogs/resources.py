@@ -2,7 +2,7 @@
 
 import discord
 from discord.ext import commands
-from database.db_manager import DBManager # Importa el gestor de la base de datos
+from utils.notion_limiter import LANES
 
 class Resources(commands.Cog):
     """
@@ -12,13 +12,56 @@ class Resources(commands.Cog):
     """
     def __init__(self, bot):
         self.bot = bot
-        self.db_manager = DBManager() # Instancia el gestor de la base de datos
+        self.db_manager = bot.db_manager # Gestor de la base de datos compartido (ver bot.py)
 
     # El comando '&recurso' ha sido eliminado ya que la interacción
     # para la búsqueda de recursos ahora se gestiona completamente a través
     # de las vistas (botones) definidas en views/main_menu.py.
     # Si en el futuro se necesita un comando directo, se puede añadir aquí.
 
+    @commands.command(name='notion', help='Muestra la reutilización de conexiones y la espera por carril de las peticiones a Notion.')
+    @commands.has_permissions(administrator=True)
+    async def notion(self, ctx):
+        """
+        Muestra las estadísticas de conexiones del cliente de Notion compartido, las consultas
+        agrupadas, la caché de consultas y el tiempo de espera en el limitador de cada carril.
+        """
+        stats = self.bot.notion.stats()
+        lines = [
+            f"**🔌 Notion:** {stats['requests']} peticiones, {stats['connections']} conexiones abiertas, "
+            f"{stats['tls_handshakes']} handshakes TLS · {stats['reuse_ratio']:.0%} de las peticiones reutilizaron una conexión.",
+        ]
+        breaker = self.bot.notion.breaker.stats()
+        lines.append(
+            f"**🚦 Circuito:** {breaker['state']} · {breaker['failures']} fallos seguidos · "
+            f"abierto {breaker['times_opened']} veces · {breaker['rejected']} peticiones rechazadas sin enviarse."
+        )
+        flights = self.db_manager.queries.stats()
+        lines.append(
+            f"**🔁 Consultas agrupadas:** {flights['coalesced']} de {flights['executed'] + flights['coalesced']} "
+            f"consultas idénticas reutilizaron una en curso ({flights['coalescing_ratio']:.0%} de llamadas ahorradas)."
+        )
+        cache = self.db_manager.cache.stats()
+        lines.append(
+            f"**🗂️ Caché de consultas:** {cache['entries']} guardadas · {cache['hits']} aciertos, "
+            f"{cache['stale_hits']} servidas vencidas, {cache['misses']} fallos ({cache['hit_ratio']:.0%} de aciertos) · "
+            f"{cache['refreshes']} actualizadas en segundo plano, {cache['evictions']} descartadas, {cache['invalidations']} invalidaciones."
+        )
+        slots = self.bot.notion.slots.stats()
+        lines.append(
+            f"**🧵 Hilos:** {slots['busy']} de {slots['size']} ocupados ({slots['reserved']} reservados para `interactive`) · "
+            f"{slots['waiting']} llamadas esperando un hilo."
+        )
+        lines.append("**⏱️ Espera en la cola por carril:**")
+        lanes = self.bot.notion.limiter.stats()
+        for lane in LANES:
+            data = lanes[lane]
+            lines.append(
+                f"`{lane}`: {data['requests']} peticiones · media {data['avg_wait'] * 1000:.0f} ms · "
+                f"p95 {data['p95_wait'] * 1000:.0f} ms · máx {data['max_wait'] * 1000:.0f} ms · {data['throttled']} respuestas 429"
+            )
+        await ctx.send("\n".join(lines))
+
 # La función setup es necesaria para que Discord.py cargue el cog
 async def setup(bot):
     """
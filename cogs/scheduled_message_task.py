@@ -3,9 +3,13 @@
 import discord, discord.errors
 from discord.ext import commands, tasks
 import datetime
+import heapq
+import time
 import pytz
-from database.db_manager import DBManager
-from utils import notion_utils
+from utils import metrics, notion_utils
+from utils.leader_election import leader_only
+from utils.members import get_or_fetch_member
+from utils.notion_limiter import LANE_SCHEDULER, LANE_REPORTS
 import config
 from collections import defaultdict
 
@@ -16,8 +20,20 @@ class ScheduledMessageTask(commands.Cog):
     """
     def __init__(self, bot):
         self.bot = bot
-        self.db_manager = DBManager()
+        self.db_manager = bot.db_manager
         self.timezone = pytz.timezone('UTC')
+        # Si Notion no responde, la consulta se reintenta con esperas cada vez más largas
+        self.failures = 0
+        self.retry_at = 0.0
+        # Mensajes pendientes de la última consulta, ordenados por fecha: (timestamp, page_id, mensaje).
+        # Entre consultas completas (cada SCHEDULER_REFRESH_SECONDS) solo se consulta Notion si
+        # alguno ya debe enviarse. Se guarda en la instantánea de arranque.
+        self.upcoming = []
+        self.next_refresh = 0.0
+        self.bot.lifecycle.register('scheduler', self.snapshot, self.restore)
+        # Con varias instancias, solo la líder envía mensajes y reportes (ver utils/leader_election.py)
+        if getattr(bot, 'leader', None) is not None:
+            bot.leader.on_change(self.on_leader_change)
         self.send_scheduled_messages.start()
         self.daily_activity_report.start()
 
@@ -25,23 +41,74 @@ class ScheduledMessageTask(commands.Cog):
         self.send_scheduled_messages.cancel()
         self.daily_activity_report.cancel()
 
+    def on_leader_change(self, is_leader: bool):
+        """
+        Al pasar a ser líder, los mensajes conocidos pueden estar desactualizados (los envió la
+        líder anterior): se fuerza una consulta completa a Notion en la próxima pasada, que se
+        ejecuta enseguida en lugar de esperar al siguiente minuto.
+        """
+        if not is_leader:
+            return
+        self.next_refresh = 0.0
+        if self.send_scheduled_messages.is_running():
+            self.send_scheduled_messages.restart()
+
+    def _is_leader(self) -> bool:
+        leader = getattr(self.bot, 'leader', None)
+        return leader is None or leader.is_leader
+
+    def snapshot(self) -> list:
+        return [msg for _, _, msg in sorted(self.upcoming, key=lambda item: item[:2])]
+
+    def restore(self, messages: list):
+        self._set_upcoming(messages)
+        self.next_refresh = time.monotonic() + config.SCHEDULER_REFRESH_SECONDS
+        print(f"ℹ️ {len(self.upcoming)} mensajes programados restaurados de la instantánea.")
+
+    def _set_upcoming(self, messages: list):
+        heap = [(datetime.datetime.fromisoformat(msg['fecha']).timestamp(), msg['page_id'], msg) for msg in messages]
+        heapq.heapify(heap)
+        self.upcoming = heap
+
     @tasks.loop(seconds=60)  # Revisa cada 60 segundos
+    @leader_only
+    @metrics.timed(metrics.KIND_TASK)
     async def send_scheduled_messages(self):
         """
         Tarea principal que se ejecuta en bucle para buscar y enviar mensajes.
         """
         #print("\nBuscando mensajes programados...")
+        if time.monotonic() < self.retry_at:
+            return
         now_utc = datetime.datetime.now(self.timezone)
+        # Los mensajes se confirman siempre contra Notion antes de enviarse (evita duplicados)
+        due = bool(self.upcoming) and self.upcoming[0][0] <= now_utc.timestamp()
+        if not due and time.monotonic() < self.next_refresh:
+            return
         
         try:
-            messages_to_send = self.db_manager.get_scheduled_messages()
+            messages_to_send = await self.bot.notion.run(LANE_SCHEDULER, self.db_manager.get_scheduled_messages)
+            if messages_to_send is None:
+                self.failures += 1
+                delay = min(config.NOTION_MAX_BACKOFF_SECONDS, 60 * 2 ** (self.failures - 1))
+                self.retry_at = time.monotonic() + delay
+                print(f"Advertencia: No se pudieron consultar los mensajes programados ({self.failures} fallos seguidos). Próximo intento en {delay:.0f}s.")
+                return
+            self.failures = 0
+            self.next_refresh = time.monotonic() + config.SCHEDULER_REFRESH_SECONDS
+            upcoming = []
             if not messages_to_send:
+                self._set_upcoming(upcoming)
                 #print("No se encontraron mensajes pendientes.")
                 return
 
             #print(f"\nSe encontraron {len(messages_to_send)} mensajes activos y pendientes.")
 
             for msg in messages_to_send:
+                if not self._is_leader():
+                    # Se perdió el lease a mitad de la pasada: la nueva líder envía el resto
+                    print("Advertencia: Esta instancia dejó de ser la líder; se interrumpe el envío de mensajes programados.")
+                    return
                 try:
                     scheduled_time_aware = datetime.datetime.fromisoformat(msg['fecha'])
 
@@ -60,41 +127,50 @@ class ScheduledMessageTask(commands.Cog):
                                 if frecuencia == "diario":
                                     new_date = scheduled_time_aware + datetime.timedelta(days=1)
                                     #print(f"    - Frecuencia: Diario. Reprogramando para {new_date.strftime('%Y-%m-%d')}")
-                                    self.db_manager.reschedule_message(page_id, new_date)
+                                    await self.bot.notion.run(LANE_SCHEDULER, self.db_manager.reschedule_message, page_id, new_date)
+                                    upcoming.append({**msg, 'fecha': new_date.isoformat()})
 
                                 elif frecuencia == "semanal":
                                     new_date = scheduled_time_aware + datetime.timedelta(weeks=1)
                                     #print(f"    - Frecuencia: Semanal. Reprogramando para {new_date.strftime('%Y-%m-%d')}")
-                                    self.db_manager.reschedule_message(page_id, new_date)
+                                    await self.bot.notion.run(LANE_SCHEDULER, self.db_manager.reschedule_message, page_id, new_date)
+                                    upcoming.append({**msg, 'fecha': new_date.isoformat()})
 
                                 else: # "unico" o cualquier otro valor
                                     #print("    - Frecuencia: Único. Marcando como enviado.")
-                                    self.db_manager.mark_message_as_sent(page_id)
+                                    await self.bot.notion.run(LANE_SCHEDULER, self.db_manager.mark_message_as_sent, page_id)
 
                             except discord.errors.Forbidden:
                                 #print(f"    ❌ Error de permisos: No se pudo enviar el mensaje al canal '{channel.name}' (ID: {msg['canal_id']}).")
                                 #print("    - El bot no tiene los permisos necesarios en este canal.")
                                 #print("    - Marcando como enviado para no reintentar.")
-                                self.db_manager.mark_message_as_sent(msg['page_id'])
+                                await self.bot.notion.run(LANE_SCHEDULER, self.db_manager.mark_message_as_sent, msg['page_id'])
                         
                         else:
                             #print(f"    ❌ Error: No se encontró el canal con ID {msg['canal_id']}.")
                             #print("    - Marcando como enviado para no reintentar.")
-                            self.db_manager.mark_message_as_sent(msg['page_id'])
+                            await self.bot.notion.run(LANE_SCHEDULER, self.db_manager.mark_message_as_sent, msg['page_id'])
+
+                    else:
+                        upcoming.append(msg)
 
                 except Exception as e:
                     print(f"❌ Error procesando un mensaje individual (Page ID: {msg.get('page_id', 'N/A')}): {e}")
 
+            self._set_upcoming(upcoming)
+
         except Exception as e:
             print(f"❌ Error general en la tarea de envío de mensajes: {e}")
 
     @tasks.loop(time=datetime.time(hour=22, minute=0, tzinfo=pytz.timezone('America/Argentina/Buenos_Aires')))
+    @leader_only
+    @metrics.timed(metrics.KIND_TASK)
     async def daily_activity_report(self):
         """
         Genera y envía un reporte diario de actividad en los canales de voz.
         """
         print("Generando reporte diario de actividad...")
-        logs = notion_utils.get_activity_logs_for_today()
+        logs = await self.bot.notion.run(LANE_REPORTS, notion_utils.get_activity_logs_for_today, self.bot.notion)
         if not logs:
             print("No hay actividad para reportar hoy.")
             return
@@ -142,11 +218,15 @@ class ScheduledMessageTask(commands.Cog):
 
         embed = discord.Embed(title="Reporte de Actividad Diario", color=discord.Color.blue())
         for user_id, channels in user_time.items():
-            try:
-                member = await self.bot.fetch_user(int(user_id))
+            # El bot no guarda todos los miembros en caché: se piden solo los que aparecen en el reporte
+            member = await get_or_fetch_member(report_channel.guild, int(user_id))
+            if member is not None:
                 user_name = member.display_name
-            except discord.NotFound:
-                user_name = f"Usuario: <@{user_id}>"
+            else:
+                try:
+                    user_name = (await self.bot.fetch_user(int(user_id))).display_name
+                except discord.NotFound:
+                    user_name = f"Usuario: <@{user_id}>"
             
             report_lines = []
             for channel, total_time in channels.items():
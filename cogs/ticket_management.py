@@ -1,16 +1,258 @@
 # Archivo: cogs/ticket_management.py
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
+import os
+import weakref
 import config
+from utils.attachment_relay import close_files
+from utils.category_manager import CategoryManager
+from utils.channel_pool import ChannelPool
+from utils.leader_election import leader_only
+from utils.ticket_registry import TicketRegistry, KIND_BUG, KIND_ONBOARDING, ticket_marker
+from utils import metrics, transcripts
 
 class TicketManagement(commands.Cog):
     """
     Cog que maneja la creación y cierre de canales privados para reportes de bugs.
+    Mantiene un registro de los tickets abiertos (canal -> ticket, miembro -> tickets)
+    para que los comandos no tengan que buscar canales por nombre, una reserva de
+    canales ocultos por categoría para que abrir un canal privado sea inmediato, y un
+    gestor de categorías que crea categorías de desborde al llegar al límite de Discord
+    y archiva los canales de nuevo ingreso sin actividad.
     """
     def __init__(self, bot):
         self.bot = bot
+        self.registry = TicketRegistry(os.path.join(config.DATA_DIR, 'bot.db'))
+        self.registry.load()
+        # {member_id: asyncio.Lock} para evitar canales duplicados. Referencias débiles: el candado
+        # desaparece en cuanto nadie lo está usando ni esperando, así el diccionario no crece sin límite
+        self._member_locks = weakref.WeakValueDictionary()
+        self.categories = CategoryManager(os.path.join(config.DATA_DIR, 'bot.db'))
+        self.categories.load()
+
+        # Una reserva de canales por cada categoría donde se crean canales privados
+        self.pools = {}
+        if config.CHANNEL_POOL_SIZE > 0:
+            for category_id in (config.GENERAL_CATEGORY_ID, config.NUEVO_INGRESO_CATEGORY_ID):
+                if category_id:
+                    self.pools[category_id] = ChannelPool(category_id, config.CHANNEL_POOL_SIZE)
+        self.refill_pools.change_interval(seconds=config.CHANNEL_POOL_REFILL_SECONDS)
+        self.refill_pools.start()
+        self.maintain_categories.start()
+
+    def cog_unload(self):
+        self.refill_pools.cancel()
+        self.maintain_categories.cancel()
+        self.registry.close()
+        self.categories.close()
+
+    def ticket_groups(self):
+        """Categorías base de tickets y el tipo de ticket que contiene cada una."""
+        return [
+            (category_id, kind)
+            for category_id, kind in ((config.GENERAL_CATEGORY_ID, KIND_BUG), (config.NUEVO_INGRESO_CATEGORY_ID, KIND_ONBOARDING))
+            if category_id
+        ]
+
+    def reconcile_registry(self, guild: discord.Guild):
+        """
+        Reconcilia el registro de tickets con todas las categorías de cada grupo (base,
+        desbordes y archivo), en una sola pasada por categoría.
+        """
+        for base_id, kind in self.ticket_groups():
+            category_ids = self.categories.active_ids(base_id) + self.categories.archive_ids(base_id)
+            categories = self.categories.categories(guild, category_ids)
+            if not categories:
+                continue
+            added, removed = self.registry.rebuild_from_categories(categories, kind)
+            print(f"ℹ️ Registro de tickets ({kind}): {added} recuperados, {removed} descartados.")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Cuenta los canales de las categorías gestionadas y reconcilia el registro de tickets
+        con las categorías de bugs y de nuevo ingreso (una sola pasada por categoría).
+        """
+        guild = self.bot.get_guild(config.SERVER_ID) if config.SERVER_ID else None
+        if not guild:
+            return
+        self.categories.sync(guild, [base_id for base_id, _ in self.ticket_groups()])
+        for pool in self.pools.values():
+            for pool_category in self.categories.categories(guild, self.categories.active_ids(pool.category_id)):
+                pool.adopt(pool_category)
+
+        self.reconcile_registry(guild)
+        print(f"ℹ️ Registro de tickets: {len(self.registry.by_channel)} abiertos.")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        self.categories.channel_created(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        """Mantiene los contadores de las categorías y el registro al mover un canal de categoría."""
+        if getattr(before, 'category_id', None) != getattr(after, 'category_id', None):
+            self.categories.channel_moved(before, after)
+            self.registry.move(after.id, after.category_id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        """Quita del registro (y de las reservas) los canales eliminados (por el bot o a mano)."""
+        self.categories.channel_deleted(channel)
+        self.registry.remove(channel.id)
+        for pool in self.pools.values():
+            pool.discard(channel.id)
+
+    async def claim_channel(self, category: discord.CategoryChannel, name: str, overwrites: dict, topic: str):
+        """
+        Devuelve un canal privado listo en el grupo de `category`: uno de la reserva (renombrado
+        y con los permisos indicados) o, si no hay reserva, uno creado en el momento en la
+        primera categoría del grupo con espacio (la base o una de desborde). `topic` lleva la
+        marca del ticket (`ticket_marker`) con la que se reconoce el canal al reiniciar.
+        """
+        async def create():
+            async with self.categories.slot(category.guild, category.id) as target:
+                return await target.create_text_channel(name=name, overwrites=overwrites, topic=topic)
+
+        pool = self.pools.get(category.id)
+        if pool:
+            return await pool.claim(category, name, overwrites, topic=topic, create=create)
+        return await create()
+
+    @tasks.loop(seconds=15)
+    @leader_only
+    @metrics.timed(metrics.KIND_TASK)
+    async def refill_pools(self):
+        """
+        Repone las reservas de canales. Crea como máximo un canal por iteración (para la
+        reserva con más faltantes), de modo que la reposición no compite por los límites
+        de Discord con la creación de canales bajo demanda.
+        """
+        guild = self.bot.get_guild(config.SERVER_ID) if config.SERVER_ID else None
+        if not guild:
+            return
+        pools = [pool for pool in self.pools.values() if pool.missing]
+        if not pools:
+            return
+        pool = max(pools, key=lambda p: p.missing)
+        if not isinstance(guild.get_channel(pool.category_id), discord.CategoryChannel):
+            return
+        try:
+            async with self.categories.slot(guild, pool.category_id) as category:
+                await pool.refill_one(category)
+        except discord.Forbidden:
+            print(f"Error: No tengo permisos para crear canales de reserva en la categoría {pool.category_id}.")
+        except Exception as e:
+            print(f"Error al reponer la reserva de canales de {pool.category_id}: {e}")
+
+    @refill_pools.before_loop
+    async def before_refill_pools(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(hours=1)
+    @leader_only
+    @metrics.timed(metrics.KIND_TASK)
+    async def maintain_categories(self):
+        """
+        Archiva los canales de nuevo ingreso sin actividad desde hace `CATEGORY_ARCHIVE_DAYS`
+        días, devuelve a su categoría los archivados que volvieron a tener mensajes y cierra
+        (con transcript) los que llevan `CATEGORY_ARCHIVE_DELETE_DAYS` días sin actividad. Solo
+        se tocan los tickets del registro, nunca los canales creados a mano en esas categorías.
+        Cada paso procesa como máximo `CATEGORY_MAINTENANCE_BATCH` canales, con una pausa entre
+        cada uno.
+        """
+        base_id = config.NUEVO_INGRESO_CATEGORY_ID
+        guild = self.bot.get_guild(config.SERVER_ID) if config.SERVER_ID else None
+        if not guild or not base_id or config.CATEGORY_ARCHIVE_DAYS <= 0:
+            return
+        batch = config.CATEGORY_MAINTENANCE_BATCH
+        is_ticket = lambda channel: self.registry.get(channel.id, KIND_ONBOARDING) is not None
+        try:
+            restored = await self.categories.restore_active(guild, base_id, config.CATEGORY_ARCHIVE_DAYS, batch, is_ticket)
+            archived = await self.categories.archive_inactive(guild, base_id, config.CATEGORY_ARCHIVE_DAYS, batch, is_ticket)
+            deleted = 0
+            if config.CATEGORY_ARCHIVE_DELETE_DAYS > 0:
+                expired = self.categories.expired_archived(guild, base_id, config.CATEGORY_ARCHIVE_DELETE_DAYS, is_ticket)
+                for channel in expired[:batch]:
+                    if await self.close_ticket_channel(channel):
+                        deleted += 1
+                    await asyncio.sleep(2.0)
+            if restored or archived or deleted:
+                print(f"ℹ️ Mantenimiento de categorías: {archived} archivados, {restored} restaurados, {deleted} eliminados.")
+        except discord.Forbidden:
+            print("Error: No tengo permisos para mover o eliminar canales de nuevo ingreso.")
+        except Exception as e:
+            print(f"Error en el mantenimiento de categorías: {e}")
+
+    @maintain_categories.before_loop
+    async def before_maintain_categories(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command(name='categorias', help='Muestra la ocupación de las categorías de tickets, sus desbordes y su archivo.')
+    @commands.has_permissions(administrator=True)
+    async def categorias(self, ctx):
+        lines = ["**📁 Categorías de tickets:**"]
+        for base_id, kind in self.ticket_groups():
+            stats = self.categories.stats(base_id)
+            active = ", ".join(f"<#{cid}> {count}/{stats['limit']}" for cid, count in stats['active'])
+            archive = ", ".join(f"<#{cid}> {count}/{stats['limit']}" for cid, count in stats['archive']) or "ninguno"
+            lines.append(f"**{kind}:** {active} · archivo: {archive}")
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name='reserva', help='Muestra el estado de las reservas de canales y la latencia de asignación.')
+    @commands.has_permissions(administrator=True)
+    async def reserva(self, ctx):
+        """
+        Muestra, por categoría, los canales disponibles y la latencia de asignación con y sin reserva.
+        """
+        if not self.pools:
+            await ctx.send("ℹ️ La reserva de canales está desactivada (`CHANNEL_POOL_SIZE=0`).")
+            return
+
+        def fmt(seconds):
+            return f"{seconds * 1000:.0f} ms" if seconds is not None else "N/A"
+
+        lines = ["**🗂️ Reserva de canales:**"]
+        for category_id, pool in self.pools.items():
+            stats = pool.stats()
+            lines.append(
+                f"<#{category_id}>: {stats['available']}/{stats['size']} disponibles · "
+                f"con reserva {stats['hits']} (p50 {fmt(stats['hit_p50'])}, p95 {fmt(stats['hit_p95'])}) · "
+                f"sin reserva {stats['misses']} (p50 {fmt(stats['miss_p50'])}, p95 {fmt(stats['miss_p95'])})"
+            )
+        await ctx.send("\n".join(lines))
+
+    def get_bug_ticket(self, channel_id: int):
+        """Devuelve el ticket de bug asociado al canal, o None si no es un canal de bug."""
+        return self.registry.get(channel_id, KIND_BUG)
+
+    def get_open_bug_channel(self, member: discord.Member):
+        """Devuelve el canal de bug abierto del miembro, si tiene uno."""
+        for ticket in self.registry.open_for_member(member.id, KIND_BUG):
+            channel = member.guild.get_channel(ticket.channel_id)
+            if channel:
+                return channel
+            self.registry.remove(ticket.channel_id)
+        return None
+
+    async def get_or_create_bug_channel(self, member: discord.Member):
+        """
+        Devuelve el canal de bug abierto del miembro o crea uno nuevo.
+
+        Returns:
+            tuple: (canal o None, mensaje, True si el canal se acaba de crear)
+        """
+        lock = self._member_locks.get(member.id)
+        if lock is None:
+            lock = self._member_locks[member.id] = asyncio.Lock()
+        async with lock:
+            existing = self.get_open_bug_channel(member)
+            if existing:
+                return existing, f"Ya tienes un canal de bug abierto: {existing.mention}", False
+            channel, message = await self.create_bug_channel(member)
+            return channel, message, channel is not None
 
     async def create_bug_channel(self, member: discord.Member):
         """
@@ -43,10 +285,8 @@ class TicketManagement(commands.Cog):
             }
 
             channel_name = f"bug-{member.name.lower().replace(' ', '-')}"
-            new_channel = await category.create_text_channel(
-                name=channel_name,
-                overwrites=overwrites
-            )
+            new_channel = await self.claim_channel(category, channel_name, overwrites, ticket_marker(KIND_BUG, member.id))
+            self.registry.add(new_channel.id, member.id, KIND_BUG, new_channel.category_id)
 
             return new_channel, f"Canal de bug creado: {new_channel.mention}"
 
@@ -56,17 +296,88 @@ class TicketManagement(commands.Cog):
             print(f"Error al crear el canal de bug: {e}")
             return None, f"Error inesperado al crear el canal de bug: `{e}`"
 
-    async def close_bug_channel(self, channel: discord.TextChannel):
+    async def export_transcript(self, channel: discord.TextChannel):
         """
-        Cierra un canal de bug.
+        Guarda la conversación del canal en `DATA_DIR/transcripts`.
+
+        Returns:
+            str: La ruta del transcript, o None si no se pudo exportar.
         """
+        path = transcripts.transcript_path(os.path.join(config.DATA_DIR, 'transcripts'), channel)
+        try:
+            count = await transcripts.export_transcript(channel, path)
+        except Exception as e:
+            print(f"Error al exportar el transcript del canal {channel.name}: {e}")
+            return None
+        print(f"ℹ️ Transcript de #{channel.name}: {count} mensajes guardados en {path}.")
+        return path
+
+    def transcript_file(self, path: str):
+        """El transcript listo para adjuntarlo a un mensaje, o None si supera `ATTACHMENT_MAX_BYTES`."""
+        if os.path.getsize(path) > config.ATTACHMENT_MAX_BYTES:
+            return None
+        return discord.File(path, filename=f"transcript-{os.path.basename(path)}")
+
+    async def publish_transcript(self, channel: discord.TextChannel, path: str):
+        """
+        Publica el transcript de un ticket cerrado en `TRANSCRIPTS_CHANNEL_ID` (si está configurado).
+
+        Returns:
+            str: El enlace al mensaje con el archivo publicado o, si no se pudo subir, la ruta local.
+        """
+        destination = self.bot.get_channel(config.TRANSCRIPTS_CHANNEL_ID) if config.TRANSCRIPTS_CHANNEL_ID else None
+        if destination is None:
+            return path
+        file = self.transcript_file(path)
+        try:
+            if file is None:
+                await destination.send(f"📄 Transcript de #{channel.name} (demasiado grande para adjuntarlo): `{path}`")
+                return path
+            message = await destination.send(f"📄 Transcript de #{channel.name}:", file=file)
+            return message.jump_url if message.attachments else path
+        except Exception as e:
+            print(f"Error al publicar el transcript de {channel.name}: {e}")
+            return path
+        finally:
+            if file is not None:
+                close_files([file])
+
+    async def close_ticket_channel(self, channel: discord.TextChannel, transcript_path: str = None) -> bool:
+        """
+        Cierra un canal de ticket guardando antes su conversación.
+
+        Si quien cierra ya exportó el transcript (por ejemplo, para adjuntarlo al reporte de
+        solución) lo indica con `transcript_path`; si no, se exporta y se publica aquí. Si la
+        exportación falla el canal no se elimina, para no perder la conversación.
+
+        Returns:
+            bool: True si el canal se eliminó.
+        """
+        if transcript_path is None:
+            transcript_path = await self.export_transcript(channel)
+            if transcript_path is None:
+                try:
+                    await channel.send("❌ No se pudo guardar la conversación de este canal, así que no se eliminará. Avisa a un administrador.")
+                except Exception:
+                    pass
+                return False
+            await self.publish_transcript(channel, transcript_path)
+
         try:
             await channel.delete()
+            self.registry.remove(channel.id)
+            return True
         except discord.Forbidden:
             print(f"Error: No tengo permisos para eliminar el canal {channel.name}.")
         except Exception as e:
             print(f"Error inesperado al intentar cerrar el canal: {e}")
+        return False
 
+    async def close_bug_channel(self, channel: discord.TextChannel, transcript_path: str = None) -> bool:
+        """
+        Cierra un canal de bug (ver `close_ticket_channel`).
+        """
+        return await self.close_ticket_channel(channel, transcript_path)
 
 async def setup(bot):
     """
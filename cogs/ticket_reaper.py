@@ -0,0 +1,222 @@
+# Archivo: cogs/ticket_reaper.py
+
+import asyncio
+import datetime
+import json
+import os
+import time
+
+import discord
+from discord.ext import commands, tasks
+
+import config
+from utils import metrics
+from utils.leader_election import leader_only
+from utils.ticket_registry import KIND_BUG
+
+# Pausa entre cada aviso o cierre de una misma pasada, para no agotar los límites de Discord
+REAPER_PAUSE_SECONDS = 2.0
+
+
+class TicketReaper(commands.Cog):
+    """
+    Cog que cierra los tickets de bug abandonados.
+
+    La última actividad de cada ticket abierto se actualiza con los mensajes que llegan al
+    canal (a través del enrutador central, sin leer historiales) y se guarda en disco en
+    cada pasada. Tras `TICKET_IDLE_WARN_HOURS` horas sin mensajes se avisa en el canal; tras
+    `TICKET_IDLE_CLOSE_HOURS` horas se exporta la conversación y se cierra el canal. Cada
+    pasada procesa como máximo `TICKET_REAPER_BATCH` canales.
+
+    Con varias instancias, todas siguen la actividad (`track_tickets`) y solo la líder avisa
+    y cierra (`reap_idle_tickets`): si la líder cambia, la nueva ya conoce la última
+    actividad de cada canal.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage_path = os.path.join(config.DATA_DIR, 'ticket_activity.json')
+        self.activity = {}  # {channel_id: última actividad (timestamp)}
+        self.warned = set()  # Canales que ya recibieron el aviso desde su última actividad
+        self._dirty = False
+        self.closed = 0
+        self.load()
+        self.track_tickets.start()
+        self.reap_idle_tickets.start()
+
+    def cog_unload(self):
+        self.track_tickets.cancel()
+        self.reap_idle_tickets.cancel()
+        for channel_id in self.activity:
+            self.bot.router.unwatch_channel(channel_id, self.on_ticket_message)
+        self.save()
+
+    # --- PERSISTENCIA ---
+
+    def load(self):
+        if not os.path.exists(self.storage_path):
+            return
+        try:
+            with open(self.storage_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            for channel_id, entry in raw.items():
+                self.activity[int(channel_id)] = entry["last_activity"]
+                if entry.get("warned"):
+                    self.warned.add(int(channel_id))
+        except Exception as e:
+            print(f"❌ Error al cargar la actividad de los tickets: {e}")
+
+    def save(self):
+        """Guarda la actividad de los tickets de forma atómica (solo si cambió)."""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.storage_path) or ".", exist_ok=True)
+            tmp_path = f"{self.storage_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    str(channel_id): {"last_activity": last, "warned": channel_id in self.warned}
+                    for channel_id, last in self.activity.items()
+                }, f)
+            os.replace(tmp_path, self.storage_path)
+            self._dirty = False
+        except Exception as e:
+            print(f"❌ Error al guardar la actividad de los tickets: {e}")
+
+    # --- SEGUIMIENTO DE ACTIVIDAD ---
+
+    def sync_tickets(self):
+        """
+        Empieza a seguir los tickets de bug nuevos del registro (su actividad inicial es la
+        fecha de creación) y olvida los que ya se cerraron.
+        """
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        if not ticket_cog:
+            return
+        open_tickets = {
+            channel_id: ticket for channel_id, ticket in ticket_cog.registry.by_channel.items()
+            if ticket.kind == KIND_BUG
+        }
+        for channel_id, ticket in open_tickets.items():
+            if channel_id not in self.activity:
+                self.activity[channel_id] = datetime.datetime.fromisoformat(ticket.created_at).timestamp()
+                self._dirty = True
+            self.bot.router.watch_channel(channel_id, self.on_ticket_message)
+        for channel_id in [cid for cid in self.activity if cid not in open_tickets]:
+            self.forget(channel_id)
+
+    def forget(self, channel_id: int):
+        self.activity.pop(channel_id, None)
+        self.warned.discard(channel_id)
+        self.bot.router.unwatch_channel(channel_id, self.on_ticket_message)
+        self._dirty = True
+
+    async def on_ticket_message(self, message: discord.Message):
+        """Observador del enrutador: cualquier mensaje (no de bots) reinicia el contador del ticket."""
+        self.activity[message.channel.id] = time.time()
+        self.warned.discard(message.channel.id)
+        self._dirty = True
+
+    # --- AVISOS Y CIERRES ---
+
+    async def warn(self, channel: discord.TextChannel, idle_hours: float):
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        ticket = ticket_cog.registry.get(channel.id) if ticket_cog else None
+        mention = f"<@{ticket.member_id}> " if ticket else ""
+        remaining = max(0.0, config.TICKET_IDLE_CLOSE_HOURS - idle_hours)
+        await channel.send(
+            f"⏰ {mention}Este canal no tiene actividad desde hace {idle_hours:.0f} horas. "
+            f"Si nadie responde, se guardará la conversación y se cerrará automáticamente en {remaining:.0f} horas."
+        )
+        self.warned.add(channel.id)
+        self._dirty = True
+
+    async def close(self, channel: discord.TextChannel, idle_hours: float):
+        ticket_cog = self.bot.get_cog('TicketManagement')
+        if not ticket_cog:
+            return
+        # `close_bug_channel` exporta el transcript antes de eliminar el canal
+        if await ticket_cog.close_bug_channel(channel):
+            bug_cog = self.bot.get_cog('BugInfo')
+            if bug_cog:
+                await bug_cog.abandon_bug_report(channel.id, idle_hours)
+            self.forget(channel.id)
+            self.closed += 1
+            print(f"ℹ️ Ticket #{channel.name} cerrado tras {idle_hours:.0f} horas sin actividad.")
+
+    @tasks.loop(minutes=1)
+    @metrics.timed(metrics.KIND_TASK)
+    async def track_tickets(self):
+        """Sigue los tickets nuevos del registro y guarda la actividad (en todas las instancias)."""
+        self.sync_tickets()
+        self.save()
+
+    @track_tickets.before_loop
+    async def before_track_tickets(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=10)
+    @leader_only
+    @metrics.timed(metrics.KIND_TASK)
+    async def reap_idle_tickets(self):
+        """Avisa o cierra, en un lote limitado, los tickets que superaron los umbrales de inactividad."""
+        self.sync_tickets()
+        guild = self.bot.get_guild(config.SERVER_ID) if config.SERVER_ID else None
+        if not guild or config.TICKET_IDLE_CLOSE_HOURS <= 0:
+            self.save()
+            return
+
+        now = time.time()
+        warn_after = config.TICKET_IDLE_WARN_HOURS * 3600
+        close_after = config.TICKET_IDLE_CLOSE_HOURS * 3600
+        # Los más antiguos primero
+        idle = sorted((last, channel_id) for channel_id, last in self.activity.items() if now - last >= min(warn_after, close_after))
+
+        budget = config.TICKET_REAPER_BATCH
+        for last, channel_id in idle:
+            if budget <= 0:
+                break
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                self.forget(channel_id)
+                continue
+            idle_hours = (now - last) / 3600
+            try:
+                if now - last >= close_after:
+                    await self.close(channel, idle_hours)
+                elif channel_id not in self.warned:
+                    await self.warn(channel, idle_hours)
+                else:
+                    continue
+            except discord.Forbidden:
+                print(f"Error: No tengo permisos para avisar o cerrar el canal {channel.name}.")
+            except Exception as e:
+                print(f"Error al procesar el ticket inactivo {channel.name}: {e}")
+            budget -= 1
+            await asyncio.sleep(REAPER_PAUSE_SECONDS)
+        self.save()
+
+    @reap_idle_tickets.before_loop
+    async def before_reap_idle_tickets(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command(name='inactivos', help='Muestra los tickets de bug con más tiempo sin actividad.')
+    @commands.has_permissions(administrator=True)
+    async def inactivos(self, ctx):
+        self.sync_tickets()
+        now = time.time()
+        idle = sorted(self.activity.items(), key=lambda item: item[1])[:10]
+        if not idle:
+            await ctx.send("✅ No hay tickets de bug abiertos.")
+            return
+        lines = [f"**⏳ Tickets con más tiempo sin actividad** ({self.closed} cerrados automáticamente desde el inicio):"]
+        for channel_id, last in idle:
+            flag = " · avisado" if channel_id in self.warned else ""
+            lines.append(f"<#{channel_id}>: {(now - last) / 3600:.1f} horas{flag}")
+        await ctx.send("\n".join(lines))
+
+
+async def setup(bot):
+    """
+    Función de configuración para añadir el cog de TicketReaper al bot.
+    """
+    await bot.add_cog(TicketReaper(bot))
@@ -63,6 +63,45 @@ OPERECIONES_ROLES_ID = int(os.getenv('OPERECIONES_ROLES_ID')) if os.getenv('OPER
 # ID de la categoría general del servidor, donde se pueden crear canales generales.
 GENERAL_CATEGORY_ID = int(os.getenv('GENERAL_CATEGORY_ID')) if os.getenv('GENERAL_CATEGORY_ID') else None
 
+# Token de la integración de Notion.
+NOTION_TOKEN = os.getenv('NOTION_TOKEN')
+# URL (opcional) de otra API de Notion, por ejemplo el servidor falso de benchmarks/fake_notion.py
+# para probar el bot sin credenciales reales. Por defecto, https://api.notion.com.
+NOTION_BASE_URL = os.getenv('NOTION_BASE_URL')
+
+# Conexiones HTTP simultáneas hacia Notion y segundos que una conexión ociosa se mantiene abierta
+# para reutilizarla en la siguiente petición.
+NOTION_MAX_CONNECTIONS = int(os.getenv('NOTION_MAX_CONNECTIONS', '4'))
+NOTION_KEEPALIVE_SECONDS = float(os.getenv('NOTION_KEEPALIVE_SECONDS', '30'))
+
+# Límite de peticiones a Notion compartido por todo el bot (Notion permite unas 3 por segundo por
+# integración), ráfaga máxima y reintentos ante una respuesta 429.
+NOTION_RATE_PER_SECOND = float(os.getenv('NOTION_RATE_PER_SECOND', '3'))
+NOTION_BURST = int(os.getenv('NOTION_BURST', '3'))
+NOTION_MAX_RETRIES = int(os.getenv('NOTION_MAX_RETRIES', '3'))
+# Hilos propios para las llamadas a Notion (no usan los del executor por defecto de asyncio) y
+# cuántos de ellos quedan reservados para los menús y flujos interactivos.
+NOTION_WORKERS = int(os.getenv('NOTION_WORKERS', '8'))
+NOTION_INTERACTIVE_WORKERS = int(os.getenv('NOTION_INTERACTIVE_WORKERS', '2'))
+
+# Caídas de Notion: segundos máximos de espera por petición, fallos seguidos que abren el circuito
+# (las peticiones fallan al instante en lugar de esperar) y segundos hasta volver a probar.
+NOTION_TIMEOUT_SECONDS = float(os.getenv('NOTION_TIMEOUT_SECONDS', '15'))
+NOTION_BREAKER_FAILURES = int(os.getenv('NOTION_BREAKER_FAILURES', '5'))
+NOTION_BREAKER_RESET_SECONDS = float(os.getenv('NOTION_BREAKER_RESET_SECONDS', '30'))
+# Espera máxima entre reintentos de las tareas de fondo (mensajes programados, registro de
+# actividad pendiente) mientras Notion no responde. La espera se duplica con cada fallo.
+NOTION_MAX_BACKOFF_SECONDS = float(os.getenv('NOTION_MAX_BACKOFF_SECONDS', '900'))
+
+# Caché de consultas a la base de recursos: segundos que vale un resultado de `get_resources`,
+# segundos que valen las listas de dificultades/categorías/subcategorías, segundos extra en los
+# que un resultado vencido se sigue mostrando mientras se actualiza en segundo plano y cantidad
+# máxima de consultas guardadas.
+NOTION_CACHE_RESOURCES_TTL = float(os.getenv('NOTION_CACHE_RESOURCES_TTL', '300'))
+NOTION_CACHE_CATALOG_TTL = float(os.getenv('NOTION_CACHE_CATALOG_TTL', '1800'))
+NOTION_CACHE_STALE_SECONDS = float(os.getenv('NOTION_CACHE_STALE_SECONDS', '3600'))
+NOTION_CACHE_MAX_ENTRIES = int(os.getenv('NOTION_CACHE_MAX_ENTRIES', '256'))
+
 # ID de la base de datos de Notion para los mensajes programados.
 NOTION_DATABASE_MENSAJES_ID = os.getenv('NOTION_DATABASE_MENSAJES_ID')
 
@@ -75,12 +114,87 @@ REUNIONES_CHANNEL_ID = int(os.getenv('REUNIONES_CHANNEL_ID')) if os.getenv('REUN
 NOTION_DATABASE_ACTIVIDAD_ID = os.getenv('NOTION_DATABASE_ACTIVIDAD_ID')
 
 
-# Diccionario para almacenar el estado de las conversaciones de "Hablar con un Humano"
-# Formato: {user_id: {'state': int, 'answers': [], 'channel_id': None, 'selected_human': None}}
-# state: 0 = no en conversación, 1 = esperando respuesta a Pregunta 1, etc.
-# Este diccionario se mantendrá aquí por simplicidad, pero en una aplicación más grande
-# podría considerarse moverlo a una base de datos o un sistema de caché.
-user_conversations = {}
+# ID (opcional) de la base de datos de Notion donde se replican los reportes de bugs.
+NOTION_DATABASE_BUGS_ID = os.getenv('NOTION_DATABASE_BUGS_ID')
+
+# Límite de tamaño (en bytes) de los adjuntos que se descargan y se vuelven a subir al canal de bugs,
+# y cantidad máxima de descargas simultáneas. Los adjuntos más grandes se publican como enlace.
+ATTACHMENT_MAX_BYTES = int(os.getenv('ATTACHMENT_MAX_BYTES', str(8 * 1024 * 1024)))
+ATTACHMENT_MAX_CONCURRENCY = int(os.getenv('ATTACHMENT_MAX_CONCURRENCY', '2'))
+
+# Canales de reserva: cantidad de canales ocultos que se mantienen creados de antemano en cada
+# categoría de tickets (0 = desactivado) y segundos entre cada canal de reposición.
+CHANNEL_POOL_SIZE = int(os.getenv('CHANNEL_POOL_SIZE', '3'))
+CHANNEL_POOL_REFILL_SECONDS = float(os.getenv('CHANNEL_POOL_REFILL_SECONDS', '15'))
+
+# Cola de bienvenida: cantidad de workers que crean canales en paralelo (ajustado a los límites
+# de creación de canales de Discord) e intentos máximos por miembro antes de darse por vencido.
+ONBOARDING_WORKERS = int(os.getenv('ONBOARDING_WORKERS', '2'))
+ONBOARDING_MAX_ATTEMPTS = int(os.getenv('ONBOARDING_MAX_ATTEMPTS', '5'))
+# Roles del equipo: `&onboarding backfill` nunca crea canales de bienvenida para quienes los tienen
+STAFF_ROLE_IDS = [role_id for role_id in (NEURO_TEAM_ROLE_ID, OPERECIONES_ROLES_ID, SOPORTE_TECNICO_ROLE_ID, ATENCION_AL_CLIENTE_ROLE_ID) if role_id]
+
+# Archivo de canales de nuevo ingreso: días sin actividad para mover un canal a la categoría de
+# archivo (0 = desactivado), días sin actividad para eliminarlo guardando antes su transcript
+# (0 = nunca, el valor por defecto) y cantidad máxima de canales que se mueven o eliminan en cada
+# pasada (una por hora). Solo se archivan y eliminan los canales de bienvenida creados por el bot.
+CATEGORY_ARCHIVE_DAYS = int(os.getenv('CATEGORY_ARCHIVE_DAYS', '30'))
+CATEGORY_ARCHIVE_DELETE_DAYS = int(os.getenv('CATEGORY_ARCHIVE_DELETE_DAYS', '0'))
+CATEGORY_MAINTENANCE_BATCH = int(os.getenv('CATEGORY_MAINTENANCE_BATCH', '10'))
+
+# ID (opcional) del canal donde se publican los transcripts de los tickets cerrados. Los transcripts
+# se guardan siempre en DATA_DIR/transcripts; los de bugs se adjuntan además al reporte de solución.
+TRANSCRIPTS_CHANNEL_ID = int(os.getenv('TRANSCRIPTS_CHANNEL_ID')) if os.getenv('TRANSCRIPTS_CHANNEL_ID') else None
+
+# Cierre automático de tickets inactivos: horas sin mensajes para avisar en el canal, horas sin
+# mensajes para exportar la conversación y cerrarlo (0 = desactivado) y cantidad máxima de canales
+# que se avisan o cierran en cada pasada.
+TICKET_IDLE_WARN_HOURS = float(os.getenv('TICKET_IDLE_WARN_HOURS', '24'))
+TICKET_IDLE_CLOSE_HOURS = float(os.getenv('TICKET_IDLE_CLOSE_HOURS', '72'))
+TICKET_REAPER_BATCH = int(os.getenv('TICKET_REAPER_BATCH', '5'))
+
+# Mensajes programados: segundos entre consultas completas a Notion (entre medio solo se consulta
+# cuando un mensaje ya conocido debe enviarse, así que uno nuevo puede tardar hasta este tiempo).
+# Por defecto 60, la misma demora máxima que tenía un mensaje nuevo antes de espaciar las consultas.
+SCHEDULER_REFRESH_SECONDS = float(os.getenv('SCHEDULER_REFRESH_SECONDS', '60'))
+
+# Apagado (SIGTERM): segundos máximos para vaciar las colas pendientes antes de guardar la
+# instantánea de arranque (caché de Notion y mensajes programados) y desconectar el bot.
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '20'))
+
+# Perfil de caché del gateway de Discord: 'full' (descarga todos los miembros al conectarse),
+# 'balanced' (sin descarga inicial, caché de mensajes reducida) o 'minimal' (sin caché de miembros
+# ni de mensajes). GATEWAY_MAX_MESSAGES (opcional) reemplaza el tamaño de la caché de mensajes del
+# perfil; 0 la desactiva.
+GATEWAY_PROFILE = os.getenv('GATEWAY_PROFILE', 'balanced')
+GATEWAY_MAX_MESSAGES = int(os.getenv('GATEWAY_MAX_MESSAGES')) if os.getenv('GATEWAY_MAX_MESSAGES') else None
+
+# Métricas: puerto (opcional) donde se publican en formato Prometheus (GET /metrics) las latencias
+# de Notion, Discord, listeners, interacciones y tareas. Solo escucha en METRICS_HOST (la máquina
+# local por defecto). Sin puerto, las métricas se consultan únicamente con `&estado`.
+METRICS_PORT = int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# Vigilancia del event loop: milisegundos de retraso a partir de los cuales se considera que el loop
+# está bloqueado y se captura la pila del punto de bloqueo (0 = desactivada), y segundos mínimos
+# entre dos avisos del mismo punto de llamada.
+LOOP_STALL_THRESHOLD_MS = float(os.getenv('LOOP_STALL_THRESHOLD_MS', '200'))
+LOOP_STALL_LOG_SECONDS = float(os.getenv('LOOP_STALL_LOG_SECONDS', '60'))
+
+# Directorio donde el bot guarda su estado local (conversaciones abiertas, reportes de bugs, etc.).
+# Ejemplo en .env: DATA_DIR=/var/lib/neurobot
+DATA_DIR = os.getenv('DATA_DIR', 'data')
+
+# Elección de líder para correr dos instancias a la vez (despliegues sin corte): solo la instancia
+# que tiene el lease envía los mensajes programados y los reportes y ejecuta el mantenimiento de
+# canales. LEADER_BACKEND es 'sqlite', 'file' o 'none' (sin elección: la instancia siempre es
+# líder); LEADER_LEASE_PATH tiene que ser el mismo archivo para todas las instancias. Si la líder
+# muere, otra toma el lease cuando vence (LEADER_LEASE_SECONDS), revisándolo cada
+# LEADER_RENEW_SECONDS.
+LEADER_BACKEND = os.getenv('LEADER_BACKEND', 'sqlite')
+LEADER_LEASE_PATH = os.getenv('LEADER_LEASE_PATH') or os.path.join(DATA_DIR, 'leader.db')
+LEADER_LEASE_SECONDS = float(os.getenv('LEADER_LEASE_SECONDS', '10'))
+LEADER_RENEW_SECONDS = float(os.getenv('LEADER_RENEW_SECONDS', '3'))
 
 # Verificar que las variables de entorno esenciales estén cargadas
 def validate_env_variables():
@@ -128,6 +242,3 @@ def validate_env_variables():
         print("¡ADVERTENCIA! 'REUNIONES_CHANNEL_ID' no está definido. El seguimiento de actividad en reuniones no funcionará.")
     if NOTION_DATABASE_ACTIVIDAD_ID is None:
         print("¡ADVERTENCIA! 'NOTION_DATABASE_ACTIVIDAD_ID' no está definido. El registro de actividad en Notion no funcionará.")
-
-# Llama a la función de validación al cargar el módulo
-validate_env_variables()
\ No newline at end of file
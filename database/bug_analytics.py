@@ -0,0 +1,179 @@
+# Archivo: database/bug_analytics.py
+# Métricas del ciclo de vida de los bugs, mantenidas de forma incremental en el almacén local.
+
+import bisect
+import datetime
+import unicodedata
+
+import pytz
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bug_latency_histogram (
+    metric TEXT NOT NULL,
+    week TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, week, bucket)
+);
+CREATE TABLE IF NOT EXISTS bug_platform_counts (
+    platform TEXT NOT NULL,
+    week TEXT NOT NULL,
+    opened INTEGER NOT NULL DEFAULT 0,
+    resolved INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (platform, week)
+);
+"""
+
+METRIC_FIRST_RESPONSE = 'first_response'
+METRIC_RESOLUTION = 'resolution'
+
+# Límites superiores (en segundos) de los buckets del histograma de latencias.
+# El último bucket (índice len(BUCKET_BOUNDS)) acumula todo lo que supera una semana.
+BUCKET_BOUNDS = [
+    60, 5 * 60, 15 * 60, 30 * 60,
+    3600, 2 * 3600, 4 * 3600, 8 * 3600, 16 * 3600,
+    86400, 2 * 86400, 4 * 86400, 7 * 86400,
+]
+
+
+# Las semanas se cortan en hora de Argentina, igual que el resumen semanal que las consulta
+REPORT_TIMEZONE = pytz.timezone('America/Argentina/Buenos_Aires')
+
+
+def week_key(moment: datetime.date) -> str:
+    """
+    Clave ISO de la semana (por ejemplo '2025-W07') de una fecha. Los instantes con zona
+    horaria (los del almacén están en UTC) se pasan antes a hora de Argentina: un bug
+    abierto el domingo a las 22:00 ART cuenta en esa semana y no en la siguiente.
+    """
+    if isinstance(moment, datetime.datetime) and moment.tzinfo is not None:
+        moment = moment.astimezone(REPORT_TIMEZONE)
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def normalize_platform(platform: str) -> str:
+    """Agrupa variantes del mismo nombre ('ManyChat ', 'manychat') bajo una sola clave."""
+    if not platform or not platform.strip():
+        return "sin especificar"
+    normalized = unicodedata.normalize('NFKD', platform).encode('ascii', 'ignore').decode('utf-8')
+    return " ".join(normalized.lower().split())
+
+
+def format_duration(seconds) -> str:
+    """Formatea una duración en segundos como '2d 3h', '4h 12m' o '8m'."""
+    if seconds is None:
+        return "N/A"
+    seconds = int(seconds)
+    days, remainder = divmod(seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, _ = divmod(remainder, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+class BugAnalytics:
+    """
+    Mantiene agregados del ciclo de vida de los bugs que se actualizan en cada evento
+    (apertura, primera respuesta y resolución), sin volver a recorrer el historial:
+
+    - histogramas semanales de tiempo a la primera respuesta y tiempo a la resolución,
+      de los que se estiman los percentiles;
+    - conteos semanales de bugs abiertos y resueltos por plataforma.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.store.connect().executescript(SCHEMA)
+
+    @property
+    def conn(self):
+        return self.store.connect()
+
+    # --- EVENTOS ---
+
+    def _increment_platform(self, platform: str, week: str, column: str):
+        self.conn.execute(
+            f"INSERT INTO bug_platform_counts (platform, week, {column}) VALUES (?, ?, 1) "
+            f"ON CONFLICT(platform, week) DO UPDATE SET {column} = {column} + 1",
+            (normalize_platform(platform), week)
+        )
+        self.conn.commit()
+
+    def _record_latency(self, metric: str, week: str, seconds: float):
+        bucket = bisect.bisect_left(BUCKET_BOUNDS, max(seconds, 0))
+        self.conn.execute(
+            "INSERT INTO bug_latency_histogram (metric, week, bucket, count) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT(metric, week, bucket) DO UPDATE SET count = count + 1",
+            (metric, week, bucket)
+        )
+        self.conn.commit()
+
+    def record_opened(self, report: dict):
+        opened_at = datetime.datetime.fromisoformat(report['opened_at'])
+        self._increment_platform(report.get('platform'), week_key(opened_at), 'opened')
+
+    def record_first_response(self, report: dict):
+        opened_at = datetime.datetime.fromisoformat(report['opened_at'])
+        responded_at = datetime.datetime.fromisoformat(report['first_response_at'])
+        self._record_latency(METRIC_FIRST_RESPONSE, week_key(responded_at), (responded_at - opened_at).total_seconds())
+
+    def record_resolved(self, report: dict):
+        opened_at = datetime.datetime.fromisoformat(report['opened_at'])
+        resolved_at = datetime.datetime.fromisoformat(report['resolved_at'])
+        week = week_key(resolved_at)
+        self._record_latency(METRIC_RESOLUTION, week, (resolved_at - opened_at).total_seconds())
+        self._increment_platform(report.get('platform'), week, 'resolved')
+
+    # --- CONSULTAS ---
+
+    def percentiles(self, metric: str, weeks: list = None, quantiles=(0.5, 0.9, 0.99)) -> dict:
+        """
+        Estima percentiles de una métrica de latencia a partir de su histograma.
+
+        Args:
+            metric (str): METRIC_FIRST_RESPONSE o METRIC_RESOLUTION.
+            weeks (list, opcional): Semanas a incluir. None = todo el historial.
+
+        Returns:
+            dict: {'count': int, 0.5: segundos, 0.9: segundos, ...}. Los percentiles son None si no hay datos.
+        """
+        query = "SELECT bucket, SUM(count) AS total FROM bug_latency_histogram WHERE metric = ?"
+        params = [metric]
+        if weeks is not None:
+            query += f" AND week IN ({', '.join('?' for _ in weeks)})"
+            params.extend(weeks)
+        query += " GROUP BY bucket"
+        counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        for row in self.conn.execute(query, params):
+            counts[row['bucket']] = row['total']
+
+        total = sum(counts)
+        result = {'count': total}
+        for quantile in quantiles:
+            result[quantile] = self._quantile_from_buckets(counts, total, quantile) if total else None
+        return result
+
+    @staticmethod
+    def _quantile_from_buckets(counts: list, total: int, quantile: float) -> float:
+        """Interpola linealmente dentro del bucket donde cae el percentil."""
+        target = quantile * total
+        cumulative = 0
+        for bucket, count in enumerate(counts):
+            if count and cumulative + count >= target:
+                lower = BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0
+                if bucket >= len(BUCKET_BOUNDS):
+                    return lower  # Bucket abierto: solo se conoce el mínimo
+                upper = BUCKET_BOUNDS[bucket]
+                return lower + (upper - lower) * ((target - cumulative) / count)
+            cumulative += count
+        return BUCKET_BOUNDS[-1]
+
+    def platform_counts(self, week: str) -> dict:
+        """{plataforma: {'opened': int, 'resolved': int}} para una semana."""
+        rows = self.conn.execute(
+            "SELECT platform, opened, resolved FROM bug_platform_counts WHERE week = ?", (week,)
+        ).fetchall()
+        return {row['platform']: {'opened': row['opened'], 'resolved': row['resolved']} for row in rows}
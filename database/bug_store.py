@@ -0,0 +1,158 @@
+# Archivo: database/bug_store.py
+# Almacén local (SQLite) de los reportes de bugs, indexado por el canal privado de cada bug.
+
+import json
+import datetime
+
+from utils.local_db import open_connection
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bug_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id INTEGER NOT NULL,
+    reporter_id INTEGER NOT NULL,
+    platform TEXT,
+    description TEXT,
+    details TEXT,
+    report_message_id INTEGER,
+    status TEXT NOT NULL DEFAULT 'abierto',
+    opened_at TEXT NOT NULL,
+    resolved_at TEXT,
+    resolver_id INTEGER,
+    solution TEXT,
+    solution_details TEXT,
+    notes TEXT,
+    notion_page_id TEXT,
+    first_response_at TEXT,
+    first_responder_id INTEGER,
+    attachments TEXT,
+    transcript TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bug_reports_channel ON bug_reports (channel_id);
+CREATE INDEX IF NOT EXISTS idx_bug_reports_status ON bug_reports (status);
+"""
+
+# Columnas añadidas después de la primera versión de la tabla: {columna: tipo}.
+# Se agregan con ALTER TABLE a las bases de datos ya existentes.
+ADDED_COLUMNS = {
+    "first_response_at": "TEXT",
+    "first_responder_id": "INTEGER",
+    "attachments": "TEXT",
+    "transcript": "TEXT",
+}
+
+STATUS_OPEN = 'abierto'
+STATUS_RESOLVED = 'resuelto'
+STATUS_ABANDONED = 'abandonado'  # Cerrado automáticamente por inactividad
+
+
+def utc_now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class BugStore:
+    """
+    Guarda los campos de cada reporte de bug (plataforma, descripción, reportero, canal,
+    fechas y solución) para que resolver un bug o listar los abiertos sea una consulta
+    local, sin leer mensajes ni embeds de Discord.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = None
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = open_connection(self.db_path)
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+            self.conn.commit()
+        return self.conn
+
+    def _migrate(self):
+        """Añade a la tabla las columnas nuevas que falten."""
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(bug_reports)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE bug_reports ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def open_report(self, channel_id: int, reporter_id: int, platform: str, description: str, details: str, attachments: list = None) -> dict:
+        """Registra un nuevo reporte abierto y lo devuelve como diccionario."""
+        conn = self.connect()
+        cursor = conn.execute(
+            "INSERT INTO bug_reports (channel_id, reporter_id, platform, description, details, attachments, status, opened_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (channel_id, reporter_id, platform, description, details, json.dumps(attachments or []), STATUS_OPEN, utc_now_iso())
+        )
+        conn.commit()
+        return self.get_report(cursor.lastrowid)
+
+    @staticmethod
+    def _row_to_report(row):
+        if row is None:
+            return None
+        report = dict(row)
+        report['attachments'] = json.loads(report['attachments']) if report.get('attachments') else []
+        return report
+
+    def get_report(self, report_id: int):
+        row = self.connect().execute("SELECT * FROM bug_reports WHERE id = ?", (report_id,)).fetchone()
+        return self._row_to_report(row)
+
+    def get_open_by_channel(self, channel_id: int):
+        """Devuelve el reporte abierto más reciente del canal, o None."""
+        row = self.connect().execute(
+            "SELECT * FROM bug_reports WHERE channel_id = ? AND status = ? ORDER BY id DESC LIMIT 1",
+            (channel_id, STATUS_OPEN)
+        ).fetchone()
+        return self._row_to_report(row)
+
+    def list_open(self) -> list:
+        rows = self.connect().execute(
+            "SELECT * FROM bug_reports WHERE status = ? ORDER BY opened_at", (STATUS_OPEN,)
+        ).fetchall()
+        return [self._row_to_report(row) for row in rows]
+
+    def list_awaiting_first_response(self) -> list:
+        """Reportes abiertos en los que nadie del equipo respondió todavía."""
+        rows = self.connect().execute(
+            "SELECT * FROM bug_reports WHERE status = ? AND first_response_at IS NULL", (STATUS_OPEN,)
+        ).fetchall()
+        return [self._row_to_report(row) for row in rows]
+
+    def update_report(self, report_id: int, **fields):
+        """Actualiza columnas sueltas de un reporte (por ejemplo `report_message_id` o `notion_page_id`)."""
+        if not fields:
+            return
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        conn = self.connect()
+        conn.execute(f"UPDATE bug_reports SET {assignments} WHERE id = ?", (*fields.values(), report_id))
+        conn.commit()
+
+    def resolve_report(self, report_id: int, resolver_id: int, solution: str, solution_details: str, notes: str) -> dict:
+        """Marca el reporte como resuelto con la solución documentada."""
+        self.update_report(
+            report_id,
+            status=STATUS_RESOLVED,
+            resolved_at=utc_now_iso(),
+            resolver_id=resolver_id,
+            solution=solution,
+            solution_details=solution_details,
+            notes=notes,
+        )
+        return self.get_report(report_id)
+
+    def abandon_report(self, report_id: int, notes: str) -> dict:
+        """Marca el reporte como abandonado (su canal se cerró por inactividad)."""
+        self.update_report(
+            report_id,
+            status=STATUS_ABANDONED,
+            resolved_at=utc_now_iso(),
+            solution="Cerrado automáticamente por inactividad",
+            notes=notes,
+        )
+        return self.get_report(report_id)
@@ -1,20 +1,35 @@
 import os
 from dotenv import load_dotenv
-from notion_client import Client
-from notion_client.helpers import collect_paginated_api
 import unicodedata
 import datetime
+import json
+import time
+
+from utils.query_cache import QueryCache
+from utils.single_flight import SingleFlight
 
 load_dotenv()
 
 class DBManager:
-    def __init__(self):
-        self.notion_token = os.getenv('NOTION_TOKEN')
+    def __init__(self, notion_service, resources_ttl: float = 300, catalog_ttl: float = 1800,
+                 stale_ttl: float = 3600, cache_entries: int = 256):
+        # Cliente de Notion compartido (utils.notion_service.NotionService), inyectado desde bot.py
+        self.notion_service = notion_service
         self.notion_database_id = os.getenv('NOTION_DATABASE_ID')
         self.notion_database_mensajes_id = os.getenv('NOTION_DATABASE_MENSAJES_ID')
         self.notion = None
+        # Las consultas idénticas que coinciden en el tiempo comparten una sola petición
+        self.queries = SingleFlight()
+        # Resultados de las consultas a la base de recursos (cambian poco de un día a otro):
+        # `resources_ttl` para get_resources, `catalog_ttl` para las listas de dificultades,
+        # categorías y subcategorías. Vencidos, se siguen sirviendo `stale_ttl` segundos más
+        # mientras se actualizan en segundo plano.
+        self.cache = QueryCache(cache_entries)
+        self.resources_ttl = resources_ttl
+        self.catalog_ttl = catalog_ttl
+        self.stale_ttl = stale_ttl
 
-        if not self.notion_token:
+        if not self.notion_service.configured:
             print("¡ADVERTENCIA! La variable de entorno de Notion 'NOTION_TOKEN' no está configurada.")
         if not self.notion_database_id:
             print("¡ADVERTENCIA! La variable de entorno de Notion 'NOTION_DATABASE_ID' (para recursos) no está configurada.")
@@ -30,16 +45,61 @@ class DBManager:
     def connect(self):
         if self.notion is None:
             try:
-                self.notion = Client(auth=self.notion_token)
-                print("Cliente de Notion inicializado exitosamente.")
+                self.notion = self.notion_service.client
             except Exception as e:
                 print(f"Error al inicializar el cliente de Notion: {e}")
                 self.notion = None
         return self.notion
 
     def close(self):
+        # El cliente es compartido: solo se suelta la referencia, las conexiones las cierra bot.py
         self.notion = None
-        print("Cliente de Notion 'cerrado' (desreferenciado).")
+
+    def _query_database(self, database_id: str, query_filter: dict = None, ttl: float = 0):
+        """
+        Devuelve todas las páginas de `database_id` que cumplen `query_filter`.
+
+        Si ya hay en curso una consulta a la misma base con el mismo filtro (por ejemplo, varios
+        estudiantes eligiendo la misma dificultad a la vez), se espera a esa y se comparte su
+        resultado en lugar de repetirla. Con `ttl` > 0 el resultado se guarda en la caché
+        durante esos segundos y, si Notion no responde, se devuelve el último resultado
+        guardado aunque esté vencido. Las páginas devueltas no deben modificarse.
+        """
+        key = (database_id, json.dumps(query_filter or {}, sort_keys=True, ensure_ascii=False))
+        try:
+            return self.cache.get_or_load(key, self._loader(key), ttl, self.stale_ttl)
+        except Exception as e:
+            cached = self.cache.peek(key) if ttl > 0 else None
+            if cached is None:
+                raise
+            print(f"Advertencia: Notion no responde ({e}). Se usa el último resultado guardado.")
+            return cached
+
+    def _loader(self, key):
+        """La consulta a Notion de una clave de la caché, pasando por las consultas agrupadas."""
+        from notion_client.helpers import collect_paginated_api
+        database_id, filter_json = key
+        query_filter = json.loads(filter_json)
+        kwargs = {"database_id": database_id}
+        if query_filter:
+            kwargs["filter"] = query_filter
+        return lambda: self.queries.do(key, collect_paginated_api, self.notion.databases.query, **kwargs)
+
+    def prewarm(self):
+        """
+        Deja lista la caché al arrancar: vuelve a consultar las consultas restauradas de la
+        instantánea o, si no hay ninguna, la lista de dificultades (el primer paso del menú de
+        recursos). Se ejecuta en segundo plano; mientras tanto se sirven los datos restaurados.
+        """
+        if not self.connect() or not self.notion_database_id:
+            return
+        start = time.perf_counter()
+        keys = self.cache.keys()
+        if not keys:
+            self.get_distinct_difficulties()
+        for key in keys:
+            self.cache.refresh(key, self._loader(key))
+        print(f"ℹ️ Caché de Notion revalidada ({len(keys) or 1} consultas) en {time.perf_counter() - start:.1f}s.")
 
     def get_scheduled_messages(self):
         if not self.notion:
@@ -67,11 +127,7 @@ class DBManager:
                 ]
             }
             #print(f"Debug: Ejecutando consulta en la base de datos de mensajes con filtro: {query_filter}")
-            pages = collect_paginated_api(
-                self.notion.databases.query,
-                database_id=self.notion_database_mensajes_id,
-                filter=query_filter
-            )
+            pages = self._query_database(self.notion_database_mensajes_id, query_filter)
             #print(f"Debug: Se recibieron {len(pages)} páginas de la consulta.")
 
             messages = []
@@ -120,7 +176,7 @@ class DBManager:
             return messages
         except Exception as e:
             print(f"Error al obtener mensajes programados de Notion: {e}")
-            return []
+            return None  # Distinto de una lista vacía: la tarea programada espera antes de reintentar
 
     def mark_message_as_sent(self, page_id: str):
         if not self.notion:
@@ -181,6 +237,8 @@ class DBManager:
                 parent={"database_id": self.notion_database_id},
                 properties=properties
             )
+            # El catálogo cambió: las consultas guardadas de la base de recursos ya no sirven
+            self.cache.invalidate((self.notion_database_id,))
             print(f"Recurso '{resource_name}' insertado en Notion.")
             return True
         except Exception as e:
@@ -219,11 +277,7 @@ class DBManager:
                 query_filter["and"] = filter_conditions
         resources = []
         try:
-            pages = collect_paginated_api(
-                self.notion.databases.query,
-                database_id=self.notion_database_id,
-                filter=query_filter
-            )
+            pages = self._query_database(self.notion_database_id, query_filter, ttl=self.resources_ttl)
             for page in pages:
                 props = page["properties"]
                 resource = {
@@ -246,10 +300,7 @@ class DBManager:
             return []
         difficulties = set()
         try:
-            pages = collect_paginated_api(
-                self.notion.databases.query,
-                database_id=self.notion_database_id
-            )
+            pages = self._query_database(self.notion_database_id, ttl=self.catalog_ttl)
             for page in pages:
                 difficulty = page["properties"].get("difficulty", {}).get("select", {}).get("name")
                 if difficulty:
@@ -274,11 +325,7 @@ class DBManager:
         if filter_conditions:
             query_filter["and"] = filter_conditions
         try:
-            pages = collect_paginated_api(
-                self.notion.databases.query,
-                database_id=self.notion_database_id,
-                filter=query_filter
-            )
+            pages = self._query_database(self.notion_database_id, query_filter, ttl=self.catalog_ttl)
             for page in pages:
                 category = page["properties"].get("category", {}).get("select", {}).get("name")
                 if category:
@@ -314,11 +361,7 @@ class DBManager:
             query_filter["and"] = filter_conditions
             print(f"Condiciones de filtro aplicadas: {query_filter}")
         try:
-            pages = collect_paginated_api(
-                self.notion.databases.query,
-                database_id=self.notion_database_id,
-                filter=query_filter
-            )
+            pages = self._query_database(self.notion_database_id, query_filter, ttl=self.catalog_ttl)
             for page in pages:
                 subcategory = page["properties"].get("subcategory", {}).get("select", {}).get("name")
                 if subcategory:
@@ -0,0 +1,96 @@
+# Archivo: utils/activity_spool.py
+# Registros de actividad pendientes de enviar a Notion, guardados en disco mientras Notion no responde.
+
+import json
+import os
+import threading
+
+
+class ActivitySpool:
+    """
+    Cola de registros de actividad en un archivo JSONL (un registro por línea).
+
+    Los registros se agregan al final del archivo en cuanto ocurren, así que no se pierden
+    aunque el bot se reinicie. `drain` los envía en orden y quita del archivo solo los que se
+    enviaron. Es seguro usarlo desde varios hilos: `drain` se ejecuta fuera del event loop
+    y no bloquea a quien agrega registros mientras envía, y dos `drain` nunca envían a la vez
+    (el segundo vuelve sin hacer nada).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = []
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+            if self.entries:
+                print(f"ℹ️ {len(self.entries)} registros de actividad pendientes de enviar a Notion.")
+        except Exception as e:
+            print(f"❌ Error al cargar los registros de actividad pendientes: {e}")
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    def append(self, entry: dict):
+        with self._lock:
+            self.entries.append(entry)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False))
+                    f.write("\n")
+            except Exception as e:
+                print(f"❌ Error al guardar un registro de actividad pendiente: {e}")
+
+    def _rewrite(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def drain(self, send, limit: int = 50):
+        """
+        Envía hasta `limit` registros con `send(entry)` (que devuelve True si se envió) y se
+        detiene en el primero que falla. Si ya hay otro envío en curso no hace nada (si no, los
+        dos enviarían los mismos registros y borrarían de más al terminar).
+
+        Returns:
+            tuple: (registros enviados, True si no hubo fallos).
+        """
+        if not self._drain_lock.acquire(blocking=False):
+            return 0, True
+        try:
+            return self._drain(send, limit)
+        finally:
+            self._drain_lock.release()
+
+    def _drain(self, send, limit: int):
+        with self._lock:
+            batch = list(self.entries[:limit])
+        sent = 0
+        ok = True
+        for entry in batch:
+            if not send(entry):
+                ok = False
+                break
+            sent += 1
+        if sent:
+            with self._lock:
+                # Los registros agregados mientras se enviaba quedan al final
+                del self.entries[:sent]
+                try:
+                    self._rewrite()
+                except Exception as e:
+                    print(f"❌ Error al actualizar los registros de actividad pendientes: {e}")
+        return sent, ok
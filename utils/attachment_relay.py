@@ -0,0 +1,118 @@
+# Archivo: utils/attachment_relay.py
+# Reenvío de adjuntos (capturas de pantalla, videos, etc.) desde los cuestionarios a los reportes.
+
+import asyncio
+import re
+import tempfile
+
+import aiohttp
+import discord
+
+# Tamaño de los bloques leídos de la CDN y umbral a partir del cual el archivo temporal
+# pasa de memoria a disco. La memoria por descarga queda acotada por SPOOL_MAX_BYTES.
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_BYTES = 1024 * 1024
+
+
+def attachment_metadata(attachment: discord.Attachment) -> dict:
+    """Datos serializables de un adjunto (se guardan en la sesión del cuestionario)."""
+    return {
+        "url": attachment.url,
+        "filename": attachment.filename,
+        "size": attachment.size,
+        "content_type": attachment.content_type,
+    }
+
+
+def is_image(meta: dict) -> bool:
+    return (meta.get("content_type") or "").startswith("image/")
+
+
+def close_files(files: list):
+    """
+    Cierra los archivos de `discord.File`. discord.py no cierra los que recibe ya abiertos (como
+    los temporales de `AttachmentRelay.download`), así que hay que hacerlo aunque el envío falle.
+    """
+    for file in files:
+        file.close()
+        file.fp.close()
+
+
+class AttachmentRelay:
+    """
+    Prepara los adjuntos de un cuestionario para publicarlos en otro canal.
+
+    - Cada adjunto se descarga en streaming a un archivo temporal y se vuelve a subir junto al
+      reporte, siempre que no supere `max_bytes`; si lo supera, se publica solo el enlace. Las
+      URLs de la CDN de Discord caducan, así que no sirven para mostrar una imagen a largo plazo.
+    - La primera imagen subida se muestra en el embed como `attachment://<nombre>`.
+    - Un semáforo limita cuántas descargas hay en curso al mismo tiempo.
+    """
+    def __init__(self, max_bytes: int, max_concurrency: int):
+        self.max_bytes = max_bytes
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = None
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120))
+        return self.session
+
+    async def download(self, meta: dict):
+        """
+        Descarga un adjunto en bloques a un archivo temporal.
+
+        Returns:
+            discord.File: El archivo listo para subir, o None si supera el límite o falla la descarga.
+        """
+        if meta.get("size") and meta["size"] > self.max_bytes:
+            return None
+
+        async with self.semaphore:
+            spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+            try:
+                async with self._get_session().get(meta["url"]) as response:
+                    response.raise_for_status()
+                    written = 0
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > self.max_bytes:
+                            spool.close()
+                            return None
+                        spool.write(chunk)
+                spool.seek(0)
+                return discord.File(spool, filename=meta["filename"])
+            except Exception as e:
+                spool.close()
+                print(f"Error al descargar el adjunto '{meta.get('filename')}': {e}")
+                return None
+
+    async def prepare(self, attachments: list):
+        """
+        Decide cómo publicar cada adjunto.
+
+        Returns:
+            tuple: (image_url, files, links) donde `image_url` es la referencia
+            `attachment://<nombre>` a la primera imagen subida (para el embed), `files` son los
+            `discord.File` a subir y `links` los adjuntos que se publican solo como enlace
+            (demasiado grandes o cuya descarga falló). Quien llama cierra `files` con `close_files`.
+        """
+        image_url = None
+        files = []
+        links = []
+        results = await asyncio.gather(*(self.download(meta) for meta in attachments))
+        for index, (meta, file) in enumerate(zip(attachments, results)):
+            if file is None:
+                links.append(meta)
+                continue
+            if image_url is None and is_image(meta):
+                # Discord solo admite ciertos caracteres en el nombre que se referencia desde el embed
+                file.filename = f"{index}-{re.sub(r'[^A-Za-z0-9._-]', '_', meta['filename'])}"
+                image_url = f"attachment://{file.filename}"
+            files.append(file)
+        return image_url, files, links
@@ -0,0 +1,268 @@
+# Archivo: utils/category_manager.py
+# Capacidad de las categorías de tickets: categorías de desborde y archivo de canales inactivos.
+
+import asyncio
+import contextlib
+import datetime
+
+import discord
+
+from utils.channel_pool import POOL_PREFIX
+from utils.local_db import open_connection
+
+# Discord no permite más de 50 canales por categoría
+CATEGORY_CHANNEL_LIMIT = 50
+
+ROLE_OVERFLOW = 'overflow'
+ROLE_ARCHIVE = 'archive'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS managed_categories (
+    category_id INTEGER PRIMARY KEY,
+    base_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def last_activity(channel: discord.abc.GuildChannel) -> datetime.datetime:
+    """
+    Fecha de la última actividad de un canal, deducida del ID de su último mensaje (los IDs
+    de Discord contienen la fecha). No consulta el historial.
+    """
+    last_message_id = getattr(channel, 'last_message_id', None)
+    if last_message_id:
+        return discord.utils.snowflake_time(last_message_id)
+    return channel.created_at
+
+
+class CategoryManager:
+    """
+    Lleva en memoria la cantidad de canales de cada categoría gestionada y decide dónde
+    crear los canales nuevos.
+
+    Cada categoría base (por ejemplo, la de nuevo ingreso) forma un grupo con sus
+    categorías de desborde, que se crean a demanda cuando todas las del grupo están llenas,
+    y sus categorías de archivo, donde se mueven los canales sin actividad. Las categorías
+    creadas por el bot se guardan en SQLite para reconocerlas tras un reinicio.
+
+    Los contadores se actualizan con los eventos de creación, borrado y movimiento de
+    canales, así que elegir una categoría no recorre ningún canal.
+    """
+    def __init__(self, db_path: str, limit: int = CATEGORY_CHANNEL_LIMIT):
+        self.db_path = db_path
+        self.limit = limit
+        self.conn = None
+        self.counts = {}    # {category_id: canales en la categoría}
+        self.pending = {}   # {category_id: creaciones en curso}
+        self.base_of = {}   # {category_id: base_id} para todas las categorías gestionadas
+        self.overflow = {}  # {base_id: [category_id, ...]} en orden de creación
+        self.archive = {}   # {base_id: [category_id, ...]} en orden de creación
+        self._locks = {}    # {base_id: asyncio.Lock} para no crear dos categorías a la vez
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = open_connection(self.db_path)
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def load(self):
+        """Carga las categorías de desborde y de archivo creadas anteriormente."""
+        self.overflow.clear()
+        self.archive.clear()
+        for row in self.connect().execute("SELECT * FROM managed_categories ORDER BY rowid"):
+            group = self.overflow if row['role'] == ROLE_OVERFLOW else self.archive
+            group.setdefault(row['base_id'], []).append(row['category_id'])
+            self.base_of[row['category_id']] = row['base_id']
+
+    def _remember(self, category_id: int, base_id: int, role: str):
+        group = self.overflow if role == ROLE_OVERFLOW else self.archive
+        group.setdefault(base_id, []).append(category_id)
+        self.base_of[category_id] = base_id
+        conn = self.connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO managed_categories (category_id, base_id, role, created_at) VALUES (?, ?, ?, ?)",
+            (category_id, base_id, role, datetime.datetime.now(datetime.timezone.utc).isoformat())
+        )
+        conn.commit()
+
+    def _forget(self, category_id: int):
+        base_id = self.base_of.pop(category_id, None)
+        self.counts.pop(category_id, None)
+        self.pending.pop(category_id, None)
+        for group in (self.overflow, self.archive):
+            if category_id in group.get(base_id, ()):
+                group[base_id].remove(category_id)
+        conn = self.connect()
+        conn.execute("DELETE FROM managed_categories WHERE category_id = ?", (category_id,))
+        conn.commit()
+
+    # --- SINCRONIZACIÓN CON EL SERVIDOR ---
+
+    def sync(self, guild: discord.Guild, base_ids):
+        """
+        Cuenta (una sola vez, al iniciar) los canales de cada categoría gestionada y olvida
+        las categorías del bot que ya no existen.
+        """
+        for base_id in base_ids:
+            if base_id:
+                self.base_of[base_id] = base_id
+        for category_id in list(self.base_of):
+            category = guild.get_channel(category_id)
+            if not isinstance(category, discord.CategoryChannel):
+                if self.base_of[category_id] != category_id:
+                    self._forget(category_id)
+                continue
+            self.counts[category_id] = len(category.channels)
+
+    def channel_created(self, channel: discord.abc.GuildChannel):
+        category_id = getattr(channel, 'category_id', None)
+        if category_id in self.base_of:
+            self.counts[category_id] = self.counts.get(category_id, 0) + 1
+
+    def channel_deleted(self, channel: discord.abc.GuildChannel):
+        if isinstance(channel, discord.CategoryChannel):
+            if channel.id in self.base_of and self.base_of[channel.id] != channel.id:
+                self._forget(channel.id)
+            return
+        category_id = getattr(channel, 'category_id', None)
+        if category_id in self.base_of:
+            self.counts[category_id] = max(0, self.counts.get(category_id, 0) - 1)
+
+    def channel_moved(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if getattr(before, 'category_id', None) != getattr(after, 'category_id', None):
+            self.channel_deleted(before)
+            self.channel_created(after)
+
+    # --- CONSULTAS ---
+
+    def has_room(self, category_id: int) -> bool:
+        return self.counts.get(category_id, 0) + self.pending.get(category_id, 0) < self.limit
+
+    def active_ids(self, base_id: int) -> list:
+        """La categoría base y sus desbordes, en orden de preferencia."""
+        return [base_id] + self.overflow.get(base_id, [])
+
+    def archive_ids(self, base_id: int) -> list:
+        return list(self.archive.get(base_id, []))
+
+    def categories(self, guild: discord.Guild, category_ids) -> list:
+        return [c for c in map(guild.get_channel, category_ids) if isinstance(c, discord.CategoryChannel)]
+
+    def stats(self, base_id: int) -> dict:
+        return {
+            'active': [(cid, self.counts.get(cid, 0)) for cid in self.active_ids(base_id)],
+            'archive': [(cid, self.counts.get(cid, 0)) for cid in self.archive_ids(base_id)],
+            'limit': self.limit,
+        }
+
+    # --- ELECCIÓN DE CATEGORÍA ---
+
+    async def _create_category(self, guild: discord.Guild, base: discord.CategoryChannel, role: str):
+        if role == ROLE_OVERFLOW:
+            name = f"{base.name} {len(self.overflow.get(base.id, [])) + 2}"
+        else:
+            name = f"{base.name} · archivo {len(self.archive.get(base.id, [])) + 1}"
+        category = await guild.create_category(name, overwrites=base.overwrites)
+        self._remember(category.id, base.id, role)
+        self.counts[category.id] = 0
+        print(f"ℹ️ Categoría '{category.name}' creada ({role}): no quedaba espacio en las categorías de '{base.name}'.")
+        return category
+
+    async def _pick(self, guild: discord.Guild, base_id: int, role: str):
+        candidate_ids = self.active_ids(base_id) if role == ROLE_OVERFLOW else self.archive_ids(base_id)
+        for category in self.categories(guild, candidate_ids):
+            if self.has_room(category.id):
+                return category
+
+        lock = self._locks.setdefault(base_id, asyncio.Lock())
+        async with lock:
+            # Otra tarea pudo haber creado la categoría mientras esperábamos el lock
+            candidate_ids = self.active_ids(base_id) if role == ROLE_OVERFLOW else self.archive_ids(base_id)
+            for category in self.categories(guild, candidate_ids):
+                if self.has_room(category.id):
+                    return category
+            base = guild.get_channel(base_id)
+            if not isinstance(base, discord.CategoryChannel):
+                raise ValueError(f"La categoría base {base_id} no existe.")
+            return await self._create_category(guild, base, role)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, guild: discord.Guild, base_id: int, role: str = ROLE_OVERFLOW):
+        """
+        Reserva un lugar en una categoría del grupo con espacio (creando una de desborde o de
+        archivo si hace falta) mientras se crea o se mueve un canal hacia ella.
+
+        Uso:
+            async with manager.slot(guild, base_id) as category:
+                await category.create_text_channel(...)
+        """
+        category = await self._pick(guild, base_id, role)
+        self.pending[category.id] = self.pending.get(category.id, 0) + 1
+        try:
+            yield category
+        finally:
+            self.pending[category.id] = max(0, self.pending.get(category.id, 0) - 1)
+
+    # --- ARCHIVO ---
+
+    async def archive_inactive(self, guild: discord.Guild, base_id: int, days: int, batch_size: int, is_ticket, pause: float = 2.0) -> int:
+        """
+        Mueve a las categorías de archivo hasta `batch_size` canales sin actividad desde hace
+        `days` días. Solo se archivan los canales para los que `is_ticket(canal)` es verdadero
+        (los tickets registrados): los canales de reserva y los creados a mano no se tocan.
+
+        Returns:
+            int: Cantidad de canales archivados.
+        """
+        cutoff = discord.utils.utcnow() - datetime.timedelta(days=days)
+        inactive = [
+            channel
+            for category in self.categories(guild, self.active_ids(base_id))
+            for channel in category.text_channels
+            if not channel.name.startswith(POOL_PREFIX) and is_ticket(channel) and last_activity(channel) < cutoff
+        ]
+        moved = 0
+        for channel in inactive[:batch_size]:
+            async with self.slot(guild, base_id, ROLE_ARCHIVE) as archive:
+                await channel.edit(category=archive)
+            moved += 1
+            await asyncio.sleep(pause)
+        return moved
+
+    async def restore_active(self, guild: discord.Guild, base_id: int, days: int, batch_size: int, is_ticket, pause: float = 2.0) -> int:
+        """Devuelve a las categorías activas los tickets archivados que volvieron a tener mensajes."""
+        cutoff = discord.utils.utcnow() - datetime.timedelta(days=days)
+        revived = [
+            channel
+            for category in self.categories(guild, self.archive_ids(base_id))
+            for channel in category.text_channels
+            if is_ticket(channel) and last_activity(channel) >= cutoff
+        ]
+        restored = 0
+        for channel in revived[:batch_size]:
+            async with self.slot(guild, base_id) as category:
+                await channel.edit(category=category)
+            restored += 1
+            await asyncio.sleep(pause)
+        return restored
+
+    def expired_archived(self, guild: discord.Guild, base_id: int, days: int, is_ticket) -> list:
+        """
+        Tickets archivados sin actividad desde hace `days` días. No los elimina: quien llama los
+        cierra guardando antes su conversación (`TicketManagement.close_ticket_channel`).
+        """
+        cutoff = discord.utils.utcnow() - datetime.timedelta(days=days)
+        return [
+            channel
+            for category in self.categories(guild, self.archive_ids(base_id))
+            for channel in category.text_channels
+            if is_ticket(channel) and last_activity(channel) < cutoff
+        ]
@@ -0,0 +1,108 @@
+# Archivo: utils/channel_pool.py
+# Reserva de canales privados creados de antemano para que abrir un ticket sea inmediato.
+
+import collections
+import time
+
+import discord
+
+from utils.metrics import percentile
+
+# Prefijo de los canales de reserva. Solo el bot puede verlos hasta que se asignan.
+POOL_PREFIX = 'reserva-'
+
+
+def hidden_overwrites(guild: discord.Guild) -> dict:
+    """Permisos de un canal de reserva: invisible para todos menos para el bot."""
+    return {
+        guild.default_role: discord.PermissionOverwrite(read_messages=False),
+        guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True),
+    }
+
+
+class ChannelPool:
+    """
+    Reserva de canales ocultos de una categoría.
+
+    Crear un canal con permisos es la llamada más lenta y con más límites de Discord. Con la
+    reserva, asignar un ticket es solo editar un canal ya existente (nombre + permisos) en
+    una única llamada; la reposición se hace en segundo plano.
+    """
+    def __init__(self, category_id: int, size: int):
+        self.category_id = category_id
+        self.size = size
+        self.available = collections.deque()  # IDs de canales de reserva listos
+        self.hits = 0
+        self.misses = 0
+        # Últimas latencias de asignación (segundos), separadas según hubo canal en reserva o no
+        self.hit_latencies = collections.deque(maxlen=500)
+        self.miss_latencies = collections.deque(maxlen=500)
+
+    @property
+    def missing(self) -> int:
+        return max(0, self.size - len(self.available))
+
+    def adopt(self, category: discord.CategoryChannel):
+        """Recupera (en una sola pasada) los canales de reserva que ya existían en la categoría."""
+        known = set(self.available)
+        for channel in category.text_channels:
+            if channel.name.startswith(POOL_PREFIX) and channel.id not in known:
+                self.available.append(channel.id)
+
+    def discard(self, channel_id: int):
+        """Olvida un canal de reserva (por ejemplo, si fue eliminado a mano)."""
+        try:
+            self.available.remove(channel_id)
+        except ValueError:
+            pass
+
+    async def refill_one(self, category: discord.CategoryChannel):
+        """Crea un canal de reserva oculto. Devuelve el canal o None si la reserva está llena."""
+        if not self.missing:
+            return None
+        channel = await category.create_text_channel(
+            name=f"{POOL_PREFIX}{int(time.time() * 1000) % 1_000_000}",
+            overwrites=hidden_overwrites(category.guild)
+        )
+        self.available.append(channel.id)
+        return channel
+
+    async def claim(self, category: discord.CategoryChannel, name: str, overwrites: dict, topic: str = None, create=None):
+        """
+        Asigna un canal de la reserva (renombrándolo y aplicando los permisos y el topic) o, si
+        la reserva está vacía, crea uno nuevo como antes.
+
+        Args:
+            create (callable, opcional): Corrutina sin argumentos que crea el canal cuando la
+                reserva está vacía. Por defecto se crea en `category`.
+        """
+        start = time.perf_counter()
+        guild = category.guild
+        while self.available:
+            channel = guild.get_channel(self.available.popleft())
+            if channel is None:
+                continue  # Fue eliminado mientras estaba en la reserva
+            await channel.edit(name=name, overwrites=overwrites, topic=topic)
+            self.hits += 1
+            self.hit_latencies.append(time.perf_counter() - start)
+            return channel
+
+        if create is not None:
+            channel = await create()
+        else:
+            channel = await category.create_text_channel(name=name, overwrites=overwrites, topic=topic)
+        self.misses += 1
+        self.miss_latencies.append(time.perf_counter() - start)
+        return channel
+
+    def stats(self) -> dict:
+        return {
+            'available': len(self.available),
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_p50': percentile(self.hit_latencies, 0.5, None),
+            'hit_p95': percentile(self.hit_latencies, 0.95, None),
+            'miss_p50': percentile(self.miss_latencies, 0.5, None),
+            'miss_p95': percentile(self.miss_latencies, 0.95, None),
+        }
@@ -0,0 +1,110 @@
+# Archivo: utils/circuit_breaker.py
+# Corta las peticiones a Notion mientras la API no responde, en lugar de esperar cada timeout.
+
+import threading
+import time
+
+import httpx
+
+STATE_CLOSED = 'cerrado'        # Notion responde: las peticiones pasan
+STATE_OPEN = 'abierto'          # Notion no responde: las peticiones fallan al instante
+STATE_HALF_OPEN = 'semiabierto'  # Pasó la espera: una sola petición de prueba decide
+
+
+class CircuitOpenError(Exception):
+    """Se lanza en lugar de hacer la petición mientras el circuito está abierto."""
+
+
+class CircuitBreaker:
+    """
+    Tras `failure_threshold` fallos seguidos (errores de red, timeouts o respuestas 5xx) el
+    circuito se abre y las peticiones fallan al instante durante `reset_timeout` segundos.
+    Después deja pasar una única petición de prueba: si funciona, el circuito se cierra; si
+    falla, vuelve a abrirse otros `reset_timeout` segundos.
+
+    Es seguro usarlo desde varios hilos.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Indica si una petición puede hacerse ahora (y, en semiabierto, la reserva como prueba)."""
+        with self._lock:
+            if self.state == STATE_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = STATE_HALF_OPEN
+                self._probing = False
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                print("✅ Notion vuelve a responder: circuito cerrado.")
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != STATE_OPEN:
+                    self.times_opened += 1
+                    print(f"❌ Notion no responde ({self.failures} fallos seguidos): circuito abierto durante {self.reset_timeout:.0f}s.")
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    @property
+    def is_closed(self) -> bool:
+        with self._lock:
+            return self.state == STATE_CLOSED
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+class CircuitBreakerTransport(httpx.BaseTransport):
+    """
+    Transporte de httpx que consulta al circuito antes de cada petición y le informa el
+    resultado. Va por fuera del limitador: con el circuito abierto ni siquiera se espera turno.
+    """
+    def __init__(self, breaker: CircuitBreaker, transport: httpx.BaseTransport):
+        self.breaker = breaker
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError("Notion no responde; la petición se canceló sin enviarse (circuito abierto).")
+        try:
+            response = self.transport.handle_request(request)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def close(self):
+        self.transport.close()
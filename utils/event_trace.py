@@ -0,0 +1,167 @@
+# Archivo: utils/event_trace.py
+# Grabación anonimizada de los eventos del gateway (voz, ingresos, mensajes y clics en botones)
+# para reproducirlos después sin conexión a Discord (ver benchmarks/event_replay.py).
+#
+# Formato: JSON Lines (comprimido con gzip si el archivo termina en .gz). La primera línea es la
+# cabecera ({"version": 1, ...}) y cada una de las siguientes un evento con `t` (segundos desde el
+# inicio de la grabación) y `type`:
+#   {"t": 0.5, "type": "voice", "member": "u1", "before": null, "after": "coworking"}
+#   {"t": 0.9, "type": "join", "member": "u2"}
+#   {"t": 1.2, "type": "message", "channel": "c1", "author": "u1", "content": "&iniciar"}
+#   {"t": 3.4, "type": "interaction", "channel": "c1", "user": "u1", "custom_id": "request_resource"}
+#
+# En la grabación no queda ningún ID real ni texto escrito por los usuarios: los IDs se reemplazan
+# por referencias secuenciales (la tabla de equivalencias solo existe en memoria mientras se graba)
+# y el contenido de los mensajes por 'x' del mismo largo, salvo el nombre del comando si el mensaje
+# empieza con el prefijo del bot.
+
+import gzip
+import json
+import time
+
+TRACE_VERSION = 1
+EVENT_VOICE = 'voice'
+EVENT_JOIN = 'join'
+EVENT_MESSAGE = 'message'
+EVENT_INTERACTION = 'interaction'
+EVENT_TYPES = (EVENT_VOICE, EVENT_JOIN, EVENT_MESSAGE, EVENT_INTERACTION)
+MAX_TRACE_EVENTS = 200_000  # Tope de eventos por grabación, para no crecer sin límite en memoria
+
+
+class Anonymizer:
+    """
+    Reemplaza los IDs de Discord por referencias secuenciales ('u1', 'c1', ...). Los canales
+    con nombre conocido (por ejemplo los de voz rastreados) se guardan con ese nombre para poder
+    reproducirlos contra los canales equivalentes de la configuración.
+    """
+    def __init__(self, named_channels: dict = None):
+        self.named_channels = {k: v for k, v in (named_channels or {}).items() if k}
+        self._refs = {}  # {(prefijo, id): referencia}
+        self._counts = {}  # {prefijo: referencias asignadas}
+
+    def _ref(self, prefix: str, object_id: int) -> str:
+        key = (prefix, object_id)
+        ref = self._refs.get(key)
+        if ref is None:
+            self._counts[prefix] = self._counts.get(prefix, 0) + 1
+            ref = self._refs[key] = f"{prefix}{self._counts[prefix]}"
+        return ref
+
+    def user(self, user_id: int) -> str:
+        return self._ref('u', user_id)
+
+    def channel(self, channel) -> str:
+        if channel is None:
+            return None
+        return self.named_channels.get(channel.id) or self._ref('c', channel.id)
+
+    @staticmethod
+    def content(text: str, prefix: str) -> str:
+        """Conserva el comando (`&iniciar`) y reemplaza el resto por 'x' del mismo largo."""
+        if prefix and text.startswith(prefix):
+            command, _, rest = text.partition(' ')
+            return command + (' ' + 'x' * len(rest) if rest else '')
+        return 'x' * len(text)
+
+
+class TraceRecorder:
+    """
+    Graba los eventos de un bot en marcha agregando listeners mientras dura la grabación
+    (`start`/`stop`). Solo guarda eventos de usuarios (no de bots) y, en las interacciones, solo
+    los clics en componentes.
+    """
+    def __init__(self, bot, named_channels: dict = None, max_events: int = MAX_TRACE_EVENTS):
+        self.bot = bot
+        self.anonymizer = Anonymizer(named_channels)
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self.started = None
+        self._listeners = (
+            (self.on_voice_state_update, 'on_voice_state_update'),
+            (self.on_member_join, 'on_member_join'),
+            (self.on_message, 'on_message'),
+            (self.on_interaction, 'on_interaction'),
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.started is not None
+
+    def start(self):
+        self.events = []
+        self.dropped = 0
+        self.started = time.monotonic()
+        for func, name in self._listeners:
+            self.bot.add_listener(func, name)
+
+    def stop(self) -> list:
+        """Deja de grabar. Returns: la lista de eventos grabados."""
+        for func, name in self._listeners:
+            self.bot.remove_listener(func, name)
+        self.started = None
+        return self.events
+
+    def _add(self, event_type: str, **fields):
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        self.events.append({'t': round(time.monotonic() - self.started, 3), 'type': event_type, **fields})
+
+    async def on_voice_state_update(self, member, before, after):
+        if member.bot or before.channel == after.channel:
+            return
+        a = self.anonymizer
+        self._add(EVENT_VOICE, member=a.user(member.id), before=a.channel(before.channel), after=a.channel(after.channel))
+
+    async def on_member_join(self, member):
+        if not member.bot:
+            self._add(EVENT_JOIN, member=self.anonymizer.user(member.id))
+
+    async def on_message(self, message):
+        if message.author.bot or message.guild is None:
+            return
+        prefix = self.bot.command_prefix if isinstance(self.bot.command_prefix, str) else None
+        a = self.anonymizer
+        self._add(EVENT_MESSAGE, channel=a.channel(message.channel), author=a.user(message.author.id),
+                  content=a.content(message.content, prefix))
+
+    async def on_interaction(self, interaction):
+        custom_id = (interaction.data or {}).get('custom_id')
+        if custom_id is None or interaction.user.bot or interaction.guild is None:
+            return
+        a = self.anonymizer
+        self._add(EVENT_INTERACTION, channel=a.channel(interaction.channel), user=a.user(interaction.user.id), custom_id=custom_id)
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def dumps_trace(events: list, **header) -> str:
+    """Serializa una grabación (cabecera y eventos) como JSON Lines."""
+    lines = [json.dumps({'version': TRACE_VERSION, 'events': len(events), **header}, ensure_ascii=False)]
+    lines.extend(json.dumps(event, ensure_ascii=False) for event in events)
+    return "\n".join(lines) + "\n"
+
+
+def write_trace(path: str, events: list, **header):
+    with _open(path, 'w') as f:
+        f.write(dumps_trace(events, **header))
+
+
+def read_trace(path: str) -> tuple:
+    """
+    Lee una grabación.
+
+    Returns:
+        tuple: (cabecera, lista de eventos ordenados por `t`).
+    """
+    with _open(path, 'r') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get('version') != TRACE_VERSION:
+        raise ValueError(f"'{path}' no es una grabación de eventos (versión {TRACE_VERSION}).")
+    events = [event for event in lines[1:] if event.get('type') in EVENT_TYPES]
+    return lines[0], sorted(events, key=lambda event: event['t'])
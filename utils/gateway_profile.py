@@ -0,0 +1,53 @@
+# Archivo: utils/gateway_profile.py
+# Perfiles de caché del gateway de Discord: cuántos miembros y mensajes guarda el bot en memoria.
+
+import discord
+
+# El bot solo necesita miembros para la bienvenida (llegan con el evento) y para algunas
+# búsquedas puntuales, que se resuelven con `utils.members.get_or_fetch_member`.
+PROFILES = {
+    # Comportamiento por defecto de discord.py: descarga todos los miembros al conectarse
+    'full': {
+        'chunk_guilds_at_startup': True,
+        'member_cache': 'intents',
+        'max_messages': 1000,
+    },
+    # Sin descarga inicial: se guardan los miembros que aparecen en eventos (entradas, voz)
+    'balanced': {
+        'chunk_guilds_at_startup': False,
+        'member_cache': 'intents',
+        'max_messages': 200,
+    },
+    # Sin caché de miembros ni de mensajes: todo se pide a la API cuando hace falta
+    'minimal': {
+        'chunk_guilds_at_startup': False,
+        'member_cache': 'none',
+        'max_messages': None,
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+
+
+def gateway_options(profile: str, intents: discord.Intents, max_messages: int = None) -> dict:
+    """
+    Argumentos para `commands.Bot` según el perfil. `max_messages` (si se indica) reemplaza
+    el tamaño de la caché de mensajes del perfil; 0 la desactiva.
+
+    Returns:
+        dict: `chunk_guilds_at_startup`, `member_cache_flags` y `max_messages`.
+    """
+    if profile not in PROFILES:
+        print(f"Advertencia: Perfil de gateway '{profile}' desconocido. Se usa '{DEFAULT_PROFILE}'.")
+        profile = DEFAULT_PROFILE
+    options = PROFILES[profile]
+    if options['member_cache'] == 'none':
+        member_cache_flags = discord.MemberCacheFlags.none()
+    else:
+        member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+    if max_messages is None:
+        max_messages = options['max_messages']
+    return {
+        'chunk_guilds_at_startup': options['chunk_guilds_at_startup'],
+        'member_cache_flags': member_cache_flags,
+        'max_messages': max_messages or None,
+    }
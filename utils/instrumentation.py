@@ -0,0 +1,63 @@
+# Archivo: utils/instrumentation.py
+# Mide los listeners, las interacciones de las vistas y las peticiones a Discord (ver utils/metrics.py).
+
+import functools
+
+import discord
+from discord.ext import commands
+
+from utils import metrics
+
+
+def listener_name(coro) -> str:
+    """Nombre estable de un listener: 'Cog.metodo' para los de un cog, 'funcion' para el resto."""
+    return getattr(coro, '__qualname__', None) or getattr(coro, '__name__', repr(coro))
+
+
+def instrument_http(http):
+    """
+    Mide cada petición de `http` (el `HTTPClient` del bot) con el tipo `discord`, agrupadas por
+    método y ruta sin IDs. Se puede volver a llamar después de reemplazar `http.request` (por
+    ejemplo, por el transporte falso de benchmarks/fake_discord.py).
+    """
+    request = http.request
+
+    @functools.wraps(request)
+    async def timed_request(route, **kwargs):
+        with metrics.timer(metrics.KIND_DISCORD, f"{route.method} {route.path}"):
+            return await request(route, **kwargs)
+    http.request = timed_request
+
+
+class InstrumentedBot(commands.Bot):
+    """
+    `commands.Bot` que mide cada ejecución de un listener (tipo `listener`) y cada petición a la
+    API HTTP de Discord (ver `instrument_http`).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        instrument_http(self.http)
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        # discord.py atrapa las excepciones de los listeners dentro de `_run_event`, así que se
+        # mide la corrutina en sí para poder contar también los errores.
+        name = listener_name(coro)
+
+        async def timed(*args, **kwargs):
+            with metrics.timer(metrics.KIND_LISTENER, name):
+                await coro(*args, **kwargs)
+        await super()._run_event(timed, event_name, *args, **kwargs)
+
+
+class InstrumentedView(discord.ui.View):
+    """
+    Vista que mide cada interacción (comprobaciones y callback del botón o menú) con el nombre
+    de la clase de la vista. Los errores que discord.py pasa a `on_error` se cuentan aparte.
+    """
+    async def _scheduled_task(self, item, interaction):
+        with metrics.timer(metrics.KIND_INTERACTION, type(self).__name__):
+            await super()._scheduled_task(item, interaction)
+
+    async def on_error(self, interaction, error, item):
+        metrics.REGISTRY.count_error(metrics.KIND_INTERACTION, type(self).__name__)
+        await super().on_error(interaction, error, item)
@@ -0,0 +1,331 @@
+# Archivo: utils/leader_election.py
+# Elección de líder por arrendamiento (lease) entre varias instancias del bot, para que durante un
+# despliegue sin corte (dos instancias a la vez) los trabajos programados se ejecuten una sola vez.
+
+import asyncio
+import functools
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo está disponible el backend de SQLite
+    fcntl = None
+
+# Segundos que la instancia deja de considerarse líder antes de que venza su lease, por si los
+# relojes de las máquinas que comparten el lease no están perfectamente sincronizados.
+CLOCK_MARGIN = 0.5
+
+
+class LeaseBackend:
+    """
+    Almacenamiento compartido del lease. Para usar otro (Redis, una base de datos remota, etc.)
+    basta con implementar `_read` y `_write` dentro de una transacción exclusiva (`_transaction`),
+    o directamente `acquire`, `release` y `current`.
+
+    Un lease es {'holder': str, 'expires_at': float (hora UNIX), 'epoch': int}. `epoch` aumenta
+    cada vez que el lease cambia de dueño, así que identifica cada periodo de liderazgo.
+    """
+    def acquire(self, holder: str, ttl: float):
+        """
+        Toma o renueva el lease si está libre, vencido o ya es de `holder`.
+
+        Returns:
+            int: el `epoch` del lease si `holder` es el líder, o None si lo tiene otra instancia.
+        """
+        now = time.time()
+        with self._transaction():
+            lease = self._read()
+            if lease is None:
+                lease = {'holder': holder, 'expires_at': now + ttl, 'epoch': 1}
+            elif lease['holder'] == holder:
+                lease['expires_at'] = now + ttl
+            elif lease['expires_at'] <= now:
+                lease = {'holder': holder, 'expires_at': now + ttl, 'epoch': lease['epoch'] + 1}
+            else:
+                return None
+            self._write(lease)
+            return lease['epoch']
+
+    def release(self, holder: str):
+        """Libera el lease (si todavía es de `holder`) para que otra instancia lo tome sin esperar a que venza."""
+        with self._transaction():
+            lease = self._read()
+            if lease is not None and lease['holder'] == holder:
+                lease['expires_at'] = 0.0
+                self._write(lease)
+
+    def current(self):
+        """Returns: el lease actual (dict) o None si nunca se tomó."""
+        with self._transaction():
+            return self._read()
+
+    def close(self):
+        pass
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+    """
+    Lease en una tabla de SQLite. La transacción `BEGIN IMMEDIATE` bloquea la base para escritura,
+    así que dos procesos no pueden tomar el lease a la vez. Sirve para instancias en la misma
+    máquina (o con un disco compartido que respete los bloqueos de SQLite).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            epoch INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path: str, name: str = 'leader'):
+        self.path = path
+        self.name = name
+        self.conn = None
+        self._lock = threading.Lock()  # Se usa desde los hilos de `asyncio.to_thread`
+
+    def connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            self.conn.executescript(self.SCHEMA)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    class _Transaction:
+        def __init__(self, backend):
+            self.backend = backend
+
+        def __enter__(self):
+            self.backend._lock.acquire()
+            try:
+                self.backend.connect().execute("BEGIN IMMEDIATE")
+            except Exception:
+                self.backend._lock.release()
+                raise
+
+        def __exit__(self, exc_type, exc, tb):
+            try:
+                self.backend.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            finally:
+                self.backend._lock.release()
+
+    def _transaction(self):
+        return self._Transaction(self)
+
+    def _read(self):
+        row = self.conn.execute("SELECT holder, expires_at, epoch FROM leases WHERE name = ?", (self.name,)).fetchone()
+        return {'holder': row[0], 'expires_at': row[1], 'epoch': row[2]} if row else None
+
+    def _write(self, lease: dict):
+        self.conn.execute(
+            "INSERT INTO leases (name, holder, expires_at, epoch) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at, epoch = excluded.epoch",
+            (self.name, lease['holder'], lease['expires_at'], lease['epoch']),
+        )
+
+
+class FileLeaseBackend(LeaseBackend):
+    """
+    Lease en un archivo JSON, leído y reescrito con un bloqueo exclusivo (`flock`) sobre el mismo
+    archivo. No necesita SQLite, pero solo funciona en Linux y macOS.
+    """
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise RuntimeError("El backend de lease en archivo necesita fcntl (Linux o macOS). Usa LEADER_BACKEND=sqlite.")
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    class _Transaction:
+        def __init__(self, backend):
+            self.backend = backend
+
+        def __enter__(self):
+            self.backend._lock.acquire()
+            try:
+                os.makedirs(os.path.dirname(self.backend.path) or ".", exist_ok=True)
+                self.backend._file = open(self.backend.path, "a+", encoding="utf-8")
+                fcntl.flock(self.backend._file.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                self.__exit__(None, None, None)
+                raise
+
+        def __exit__(self, exc_type, exc, tb):
+            try:
+                if self.backend._file is not None:
+                    self.backend._file.close()  # Cerrar el archivo libera el flock
+                    self.backend._file = None
+            finally:
+                self.backend._lock.release()
+
+    def _transaction(self):
+        return self._Transaction(self)
+
+    def _read(self):
+        self._file.seek(0)
+        content = self._file.read()
+        if not content.strip():
+            return None
+        try:
+            return json.loads(content)
+        except ValueError:
+            return None  # Archivo truncado por un corte: se trata como libre
+
+    def _write(self, lease: dict):
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(lease))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+BACKENDS = {
+    'sqlite': SQLiteLeaseBackend,
+    'file': FileLeaseBackend,
+}
+
+
+def build_backend(kind: str, path: str):
+    """
+    Crea el backend de lease configurado ('sqlite', 'file' o 'none').
+
+    Returns:
+        LeaseBackend o None si la elección está desactivada (la instancia siempre es líder).
+    """
+    if not kind or kind == 'none':
+        return None
+    if kind not in BACKENDS:
+        raise ValueError(f"Backend de lease desconocido: '{kind}'. Opciones: {', '.join(BACKENDS)} o none.")
+    return BACKENDS[kind](path)
+
+
+def default_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElection:
+    """
+    Mantiene el lease de líder de esta instancia: lo intenta tomar o renovar cada
+    `renew_interval` segundos y lo libera al apagarse. Si el líder muere sin liberarlo, otra
+    instancia lo toma cuando vence (a lo sumo `ttl + renew_interval` segundos después).
+
+    `is_leader` solo es verdadero mientras el último lease conseguido siga vigente según el reloj
+    local: si la renovación se atrasa (el event loop bloqueado o el backend sin responder), la
+    instancia deja de ejecutar trabajos antes de que otra pueda tomar el lease.
+    """
+    def __init__(self, backend: LeaseBackend, holder: str = None, ttl: float = 10.0, renew_interval: float = 3.0):
+        if backend is not None and renew_interval >= ttl:
+            raise ValueError("El intervalo de renovación del lease tiene que ser menor que su duración.")
+        self.backend = backend
+        self.holder = holder or default_holder()
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.epoch = None
+        self.elections = 0  # Veces que esta instancia pasó a ser líder
+        self.errors = 0
+        self._valid_until = 0.0
+        self._task = None
+        self._callbacks = []
+
+    @property
+    def is_leader(self) -> bool:
+        if self.backend is None:
+            return True
+        return self.epoch is not None and time.monotonic() < self._valid_until
+
+    def on_change(self, callback):
+        """Registra una función que recibe `True` al pasar a ser líder y `False` al dejar de serlo."""
+        self._callbacks.append(callback)
+
+    def _notify(self, was_leader: bool):
+        is_leader = self.is_leader
+        if is_leader == was_leader:
+            return
+        if is_leader:
+            self.elections += 1
+            print(f"✅ Esta instancia ({self.holder}) es la líder (periodo {self.epoch}): ejecuta los trabajos programados.")
+        else:
+            print(f"ℹ️ Esta instancia ({self.holder}) ya no es la líder: los trabajos programados quedan en pausa.")
+        for callback in self._callbacks:
+            try:
+                callback(is_leader)
+            except Exception as e:
+                print(f"❌ Error en un aviso de cambio de líder: {e}")
+
+    async def renew(self):
+        """Intenta tomar o renovar el lease una vez."""
+        if self.backend is None:
+            return
+        was_leader = self.is_leader
+        started = time.monotonic()
+        try:
+            epoch = await asyncio.to_thread(self.backend.acquire, self.holder, self.ttl)
+        except Exception as e:
+            # Se conserva el lease que ya se tenía hasta que venza según el reloj local
+            self.errors += 1
+            print(f"Advertencia: No se pudo renovar el lease de líder: {e}")
+        else:
+            if epoch is not None:
+                self._valid_until = started + self.ttl - CLOCK_MARGIN
+            self.epoch = epoch
+        self._notify(was_leader)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            await self.renew()
+
+    async def start(self):
+        """Primer intento inmediato (para saber el rol antes de conectarse) y renovación en segundo plano."""
+        if self.backend is None or self._task is not None:
+            return
+        await self.renew()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Deja de renovar y libera el lease, para que otra instancia lo tome enseguida."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.backend is None or self.epoch is None:
+            return
+        was_leader = self.is_leader
+        self.epoch = None
+        try:
+            await asyncio.to_thread(self.backend.release, self.holder)
+        except Exception as e:
+            print(f"Advertencia: No se pudo liberar el lease de líder: {e}")
+        self._notify(was_leader)
+
+    def stats(self) -> dict:
+        return {
+            'holder': self.holder,
+            'leader': self.is_leader,
+            'epoch': self.epoch,
+            'elections': self.elections,
+            'errors': self.errors,
+        }
+
+
+def leader_only(func):
+    """
+    Para los métodos de un cog (tareas de `tasks.loop`): la iteración solo se ejecuta si la
+    instancia es la líder (`bot.leader`). Sin elección configurada, se ejecuta siempre.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        leader = getattr(self.bot, 'leader', None)
+        if leader is not None and not leader.is_leader:
+            return
+        return await func(self, *args, **kwargs)
+    return wrapper
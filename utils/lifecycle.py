@@ -0,0 +1,115 @@
+# Archivo: utils/lifecycle.py
+# Apagado ordenado (SIGTERM) y arranque en caliente a partir de una instantánea local.
+
+import asyncio
+import gzip
+import json
+import os
+import signal
+import time
+
+
+class Lifecycle:
+    """
+    Coordina el apagado y el arranque del bot.
+
+    - Al apagarse (SIGTERM o cierre normal) ejecuta las funciones de vaciado registradas con
+      `on_shutdown` (colas pendientes), con un tiempo máximo total, y guarda una instantánea
+      con el estado de las partes registradas con `register` en un JSON comprimido.
+    - Al arrancar, `load` lee la instantánea antes de conectarse a Discord; cada parte recibe
+      su estado en cuanto se registra, así que los cogs lo tienen antes de `on_ready`.
+    """
+    def __init__(self, bot, path: str, drain_timeout: float = 20.0):
+        self.bot = bot
+        self.path = path
+        self.drain_timeout = drain_timeout
+        self.parts = {}  # {nombre: función que devuelve su estado (serializable a JSON)}
+        self.drainers = []
+        self.snapshot = {}
+        self.saved = False
+        self._shutting_down = False
+
+    # --- ARRANQUE ---
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            start = time.perf_counter()
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                self.snapshot = json.load(f)
+            print(f"ℹ️ Instantánea de arranque cargada ({', '.join(self.snapshot) or 'vacía'}) en {(time.perf_counter() - start) * 1000:.0f} ms.")
+        except Exception as e:
+            print(f"❌ Error al cargar la instantánea de arranque: {e}")
+            self.snapshot = {}
+
+    def register(self, name: str, snapshot, restore):
+        """
+        Registra una parte del estado: `snapshot()` devuelve su estado para guardarlo y
+        `restore(estado)` lo recibe si la instantánea cargada lo tiene.
+        """
+        self.parts[name] = snapshot
+        state = self.snapshot.pop(name, None)
+        if state is not None:
+            try:
+                restore(state)
+            except Exception as e:
+                print(f"❌ Error al restaurar '{name}' desde la instantánea: {e}")
+
+    def on_shutdown(self, drain):
+        """Registra una corrutina sin argumentos que vacía una cola pendiente al apagarse."""
+        self.drainers.append(drain)
+
+    # --- APAGADO ---
+
+    def install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.terminate()))
+        except (NotImplementedError, RuntimeError):
+            # Windows no permite manejadores de señales en el event loop
+            pass
+
+    async def terminate(self):
+        """Apagado por SIGTERM: vacía las colas, guarda la instantánea y desconecta el bot."""
+        if self._shutting_down:
+            return
+        self._shutting_down = True
+        print("ℹ️ SIGTERM recibido: vaciando colas y guardando el estado antes de apagar...")
+        await self.drain()
+        self.save()
+        await self.bot.close()
+
+    async def drain(self):
+        if not self.drainers:
+            return
+        done, pending = await asyncio.wait(
+            [asyncio.create_task(drain()) for drain in self.drainers],
+            timeout=self.drain_timeout,
+        )
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if task.exception():
+                print(f"❌ Error al vaciar una cola durante el apagado: {task.exception()}")
+        if pending:
+            print(f"Advertencia: {len(pending)} colas no terminaron de vaciarse en {self.drain_timeout:.0f}s.")
+
+    def save(self):
+        """Guarda la instantánea de forma atómica."""
+        state = {}
+        for name, snapshot in self.parts.items():
+            try:
+                state[name] = snapshot()
+            except Exception as e:
+                print(f"❌ Error al generar la instantánea de '{name}': {e}")
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self.saved = True
+            print(f"✅ Instantánea de arranque guardada ({os.path.getsize(self.path) / 1024:.0f} KiB).")
+        except Exception as e:
+            print(f"❌ Error al guardar la instantánea de arranque: {e}")
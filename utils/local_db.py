@@ -0,0 +1,22 @@
+# Archivo: utils/local_db.py
+# Apertura de las conexiones a la base SQLite local (`DATA_DIR/bot.db`).
+
+import os
+import sqlite3
+
+# Segundos que una conexión espera a que otra suelte el bloqueo de escritura antes de fallar
+# con "database is locked".
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+def open_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Abre una conexión a la base local. Varios almacenes (registro de tickets, categorías y
+    reportes de bugs) tienen su propia conexión al mismo archivo, así que todas usan el modo
+    WAL (las lecturas no bloquean a las escrituras) y esperan al bloqueo en lugar de fallar.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
@@ -0,0 +1,133 @@
+# Archivo: utils/loop_watchdog.py
+# Mide continuamente el retraso del event loop y, cuando se bloquea, captura dónde está bloqueado.
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+
+from utils import metrics
+
+# Raíz del repositorio: los frames de estos archivos son los que identifican el punto de bloqueo
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_LINES = 12  # Frames que se muestran en el aviso (los más internos)
+
+
+class LoopWatchdog:
+    """
+    Vigila el event loop con dos partes:
+
+    - Un latido en el loop que se duerme `interval` segundos y mide cuánto tarde se despierta
+      (el retraso del loop). Cada medición se guarda en las métricas (`loop` / `lag`).
+    - Un hilo aparte que comprueba el último latido. Si el loop lleva más de `threshold`
+      segundos sin latir, está bloqueado en ese momento: el hilo captura la pila del hilo del
+      loop (`sys._current_frames`), que apunta a la llamada culpable.
+
+    Cuando el loop se recupera, el bloqueo se cuenta por punto de llamada (métricas `stall`) y
+    se muestra su pila, como mucho una vez cada `log_interval` segundos por punto de llamada.
+    """
+    def __init__(self, threshold: float = 0.2, interval: float = 0.1, log_interval: float = 60.0):
+        self.threshold = threshold
+        self.interval = interval
+        self.log_interval = log_interval
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._last_beat = time.monotonic()
+        self._captured = None  # (punto de llamada, pila) del bloqueo en curso
+        self._last_logged = {}  # {punto de llamada: momento del último aviso}
+        self._suppressed = {}   # {punto de llamada: bloqueos sin aviso desde el último}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._task = None
+        self._loop_thread_id = None
+
+    def start(self):
+        """Se llama desde el event loop que se quiere vigilar."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._thread = None
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            with self._lock:
+                self._last_beat = time.monotonic()
+                captured, self._captured = self._captured, None
+            metrics.observe(metrics.KIND_LOOP, 'lag', lag)
+            if lag >= self.threshold:
+                self._record_stall(lag, captured)
+
+    def _watch(self):
+        # Se revisa dos veces por umbral para capturar la pila mientras el loop sigue bloqueado
+        while not self._stop.wait(self.threshold / 2):
+            with self._lock:
+                blocked = time.monotonic() - self._last_beat - self.interval
+                if blocked < self.threshold or self._captured is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            del frame
+            with self._lock:
+                self._captured = (call_site(stack), stack)
+
+    def _record_stall(self, lag: float, captured):
+        # Si el bloqueo duró menos que la revisión del hilo, no hay pila para mostrar
+        site, stack = captured if captured else ("desconocido", None)
+        self.stalls += 1
+        self.max_lag = max(self.max_lag, lag)
+        metrics.observe(metrics.KIND_STALL, site, lag)
+
+        now = time.monotonic()
+        if now - self._last_logged.get(site, float('-inf')) < self.log_interval:
+            self._suppressed[site] = self._suppressed.get(site, 0) + 1
+            return
+        self._last_logged[site] = now
+        suppressed = self._suppressed.pop(site, 0)
+        extra = f" ({suppressed} bloqueos más en el mismo punto desde el último aviso)" if suppressed else ""
+        print(f"Advertencia: El event loop estuvo bloqueado {lag * 1000:.0f} ms en {site}{extra}.")
+        if stack:
+            print("".join(traceback.format_list(stack[-STACK_LINES:])).rstrip())
+
+    def stats(self) -> dict:
+        return {'stalls': self.stalls, 'max_lag': self.max_lag}
+
+
+def call_site(stack) -> str:
+    """
+    Punto de llamada de una pila: el frame más interno del proyecto y, si la pila sigue en una
+    biblioteca, la función de la biblioteca (p. ej. 'views/main_menu.py:240 _add_category_buttons
+    → collect_paginated_api').
+    """
+    own = None
+    for entry in reversed(stack):
+        path = os.path.abspath(entry.filename)
+        if path.startswith(PROJECT_ROOT + os.sep) and "site-packages" not in path and path != os.path.abspath(__file__):
+            own = entry
+            break
+    inner = stack[-1]
+    if own is None:
+        return f"{os.path.basename(inner.filename)}:{inner.lineno} {inner.name}"
+    site = f"{os.path.relpath(own.filename, PROJECT_ROOT)}:{own.lineno} {own.name}"
+    if inner is not own:
+        site += f" → {inner.name}"
+    return site
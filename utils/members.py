@@ -0,0 +1,20 @@
+# Archivo: utils/members.py
+# Búsqueda de miembros bajo demanda (el bot no descarga todos los miembros al conectarse).
+
+import discord
+
+
+async def get_or_fetch_member(guild: discord.Guild, member_id: int):
+    """
+    Devuelve el miembro desde la caché si está y, si no, lo pide a la API.
+
+    Returns:
+        discord.Member | None: None si ya no está en el servidor.
+    """
+    member = guild.get_member(member_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(member_id)
+    except discord.NotFound:
+        return None
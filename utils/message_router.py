@@ -0,0 +1,122 @@
+# Archivo: utils/message_router.py
+# Enrutador central de mensajes: decide con una sola consulta O(1) qué hacer con cada mensaje.
+
+import time
+
+ROUTE_CONVERSATION = 'conversation'
+ROUTE_COMMAND = 'command'
+ROUTE_IGNORED = 'ignored'
+ROUTES = (ROUTE_CONVERSATION, ROUTE_COMMAND, ROUTE_IGNORED)
+
+
+class MessageRouter:
+    """
+    Reemplaza el `on_message` por defecto del bot. Cada mensaje se envía a:
+
+    - el procesador de comandos, si empieza con el prefijo del bot (aunque su autor tenga un
+      cuestionario abierto en ese canal);
+    - el motor de cuestionarios, si el par (canal, autor) tiene un cuestionario abierto;
+    - ningún lado, en cualquier otro caso (la inmensa mayoría de los mensajes).
+
+    Además, los cogs pueden "observar" canales concretos (por ejemplo, los canales de bugs
+    abiertos): los observadores se buscan por ID de canal, así que un mensaje en un canal
+    no observado no cuesta nada extra.
+
+    Lleva un contador y el tiempo acumulado por ruta de la decisión de enrutado (sin contar lo
+    que tardan los manejadores) para poder medir el costo del listener.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        # Contenedor con los pares (channel_id, user_id) activos. Cualquier objeto que
+        # soporte `in` en O(1) (un set o las claves de un dict).
+        self._active_pairs = frozenset()
+        self._conversation_handler = None
+        self._watchers = {}  # {channel_id: [corrutinas que reciben el mensaje]}
+        self.counters = {route: 0 for route in ROUTES}
+        self.elapsed_ns = {route: 0 for route in ROUTES}
+
+    def register_conversations(self, active_pairs, handler):
+        """
+        Registra el motor de cuestionarios.
+
+        Args:
+            active_pairs: Contenedor de pares (channel_id, user_id) con un cuestionario abierto.
+            handler: Corrutina que recibe el `discord.Message` y lo procesa como respuesta.
+        """
+        self._active_pairs = active_pairs
+        self._conversation_handler = handler
+
+    def watch_channel(self, channel_id: int, callback):
+        """Registra una corrutina que recibirá cada mensaje (no de bots) del canal."""
+        callbacks = self._watchers.setdefault(channel_id, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def unwatch_channel(self, channel_id: int, callback):
+        """Deja de observar un canal."""
+        callbacks = self._watchers.get(channel_id)
+        if not callbacks:
+            return
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            del self._watchers[channel_id]
+
+    async def _notify_watchers(self, message):
+        for callback in list(self._watchers.get(message.channel.id, ())):
+            try:
+                await callback(message)
+            except Exception as e:
+                print(f"❌ Error en un observador del canal {message.channel.id}: {e}")
+
+    def _prefixes(self):
+        prefix = self.bot.command_prefix
+        if isinstance(prefix, str):
+            return prefix
+        if isinstance(prefix, (list, tuple)):
+            return tuple(prefix)
+        return None  # Prefijo dinámico: no se puede filtrar de antemano
+
+    def classify(self, message) -> str:
+        """Devuelve la ruta que corresponde al mensaje sin hacer ningún trabajo adicional."""
+        if message.author.bot:
+            return ROUTE_IGNORED
+        prefixes = self._prefixes()
+        # Un comando escrito durante un cuestionario se ejecuta como comando, no como respuesta
+        if prefixes is not None and message.content.startswith(prefixes):
+            return ROUTE_COMMAND
+        if self._conversation_handler and (message.channel.id, message.author.id) in self._active_pairs:
+            return ROUTE_CONVERSATION
+        if prefixes is None:
+            return ROUTE_COMMAND
+        return ROUTE_IGNORED
+
+    async def route(self, message):
+        """Procesa un mensaje entrante según su ruta."""
+        # Solo se mide la decisión (clasificar y buscar observadores), no el trabajo de los
+        # manejadores: un comando lento no debe hacer parecer caro al enrutador
+        start = time.perf_counter_ns()
+        route = self.classify(message)
+        watched = not message.author.bot and message.channel.id in self._watchers
+        self.counters[route] += 1
+        self.elapsed_ns[route] += time.perf_counter_ns() - start
+
+        if watched:
+            await self._notify_watchers(message)
+        if route == ROUTE_CONVERSATION:
+            await self._conversation_handler(message)
+        elif route == ROUTE_COMMAND:
+            await self.bot.process_commands(message)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: {ruta: {'count': int, 'avg_us': float}} con el tiempo medio de decisión por mensaje.
+        """
+        return {
+            route: {
+                'count': self.counters[route],
+                'avg_us': (self.elapsed_ns[route] / self.counters[route] / 1000) if self.counters[route] else 0.0,
+            }
+            for route in ROUTES
+        }
@@ -0,0 +1,212 @@
+# Archivo: utils/metrics.py
+# Contadores e histogramas de latencia de todo el bot, con exportación en formato Prometheus.
+
+import bisect
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Tipos de operación que se miden
+KIND_NOTION = 'notion'            # Llamadas a DBManager / notion_utils (NotionService.run)
+KIND_DISCORD = 'discord'          # Peticiones a la API HTTP de Discord
+KIND_INTERACTION = 'interaction'  # Botones y menús de las vistas
+KIND_LISTENER = 'listener'        # Listeners de eventos (on_message, on_voice_state_update, ...)
+KIND_TASK = 'task'                # Cada iteración de una tarea en segundo plano (tasks.loop)
+KIND_LOOP = 'loop'                # Retraso del event loop (utils/loop_watchdog.py)
+KIND_STALL = 'stall'              # Bloqueos del event loop, por punto de llamada
+KINDS = (KIND_NOTION, KIND_DISCORD, KIND_INTERACTION, KIND_LISTENER, KIND_TASK, KIND_LOOP, KIND_STALL)
+
+# Límites superiores (en segundos) de los buckets del histograma
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SAMPLES = 512  # Muestras recientes por serie para calcular p50/p95/p99
+
+
+def percentile(samples, quantile: float, default=0.0):
+    """
+    Percentil por rango más cercano (nearest-rank) de una colección de muestras, o `default`
+    si está vacía. Es el único cálculo de percentiles del bot: lo usan las métricas, las
+    reservas de canales, el limitador de Notion y los benchmarks.
+    """
+    if not samples:
+        return default
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(quantile * len(ordered)) - 1))]
+
+
+class Histogram:
+    """
+    Histograma de latencias de una operación. Los buckets acumulados se exportan a Prometheus;
+    las últimas `RECENT_SAMPLES` muestras sirven para calcular percentiles exactos en `&estado`.
+    """
+    __slots__ = ('counts', 'sum', 'count', 'errors', 'recent')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # El último bucket es +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        return percentile(self.recent, q)
+
+
+class MetricsRegistry:
+    """
+    Guarda un histograma y un contador de errores por par (tipo, nombre). Se puede usar desde
+    varios hilos (las llamadas a Notion terminan en hilos de `asyncio.to_thread`).
+    """
+    def __init__(self):
+        self._series = {}  # {(tipo, nombre): Histogram}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _get(self, kind: str, name: str) -> Histogram:
+        series = self._series.get((kind, name))
+        if series is None:
+            series = self._series.setdefault((kind, name), Histogram())
+        return series
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            series = self._get(kind, name)
+            series.observe(seconds)
+            if error:
+                series.errors += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def count_error(self, kind: str, name: str):
+        """Cuenta un error que no se puede asociar a una medición (por ejemplo, en `on_error`)."""
+        with self._lock:
+            self._get(kind, name).errors += 1
+
+    @contextmanager
+    def timer(self, kind: str, name: str):
+        """Mide el bloque; si lanza una excepción se cuenta como error (y se relanza)."""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.observe(kind, name, time.perf_counter() - start, error)
+
+    def timed(self, kind: str, name: str = None):
+        """Decorador para corrutinas: mide cada llamada con el nombre de la función."""
+        def decorator(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.timer(kind, label):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def samples(self, kind: str, name: str) -> list:
+        """Las últimas mediciones (en segundos) de una serie."""
+        with self._lock:
+            series = self._series.get((kind, name))
+            return list(series.recent) if series else []
+
+    def counts(self, *kinds) -> dict:
+        """Cantidad de mediciones de cada serie ({(tipo, nombre): llamadas}), solo de `kinds` si se indican."""
+        with self._lock:
+            return {key: series.count for key, series in self._series.items() if not kinds or key[0] in kinds}
+
+    def summary(self) -> list:
+        """
+        Returns:
+            list[dict]: Una entrada por serie con `kind`, `name`, `count`, `errors`, `avg`,
+            `p50`, `p95` y `p99` (en segundos), ordenadas por tipo y nombre.
+        """
+        with self._lock:
+            items = sorted(self._series.items())
+            rows = []
+            for (kind, name), series in items:
+                rows.append({
+                    'kind': kind,
+                    'name': name,
+                    'count': series.count,
+                    'errors': series.errors,
+                    'avg': series.sum / series.count if series.count else 0.0,
+                    'p50': series.quantile(0.50),
+                    'p95': series.quantile(0.95),
+                    'p99': series.quantile(0.99),
+                })
+        return rows
+
+    def render_prometheus(self) -> str:
+        """Texto en el formato de exposición de Prometheus (versión 0.0.4)."""
+        lines = [
+            "# HELP bot_operation_duration_seconds Duración de cada operación del bot.",
+            "# TYPE bot_operation_duration_seconds histogram",
+        ]
+        errors = [
+            "# HELP bot_operation_errors_total Operaciones que terminaron con una excepción.",
+            "# TYPE bot_operation_errors_total counter",
+        ]
+        with self._lock:
+            for (kind, name), series in sorted(self._series.items()):
+                labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float('inf'),), series.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f'bot_operation_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'bot_operation_duration_seconds_sum{{{labels}}} {series.sum}')
+                lines.append(f'bot_operation_duration_seconds_count{{{labels}}} {series.count}')
+                errors.append(f'bot_operation_errors_total{{{labels}}} {series.errors}')
+        lines.extend(errors)
+        lines.extend([
+            "# HELP bot_start_time_seconds Momento en que arrancó el proceso (epoch).",
+            "# TYPE bot_start_time_seconds gauge",
+            f"bot_start_time_seconds {self.started}",
+        ])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registro único del proceso (como el de prometheus_client): lo usan el servicio de Notion, el
+# bot, las vistas y las tareas sin tener que pasárselo de un módulo a otro.
+REGISTRY = MetricsRegistry()
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+
+
+async def start_http_server(port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY):
+    """
+    Publica `GET /metrics` en formato Prometheus. Escucha solo en la máquina local por defecto.
+
+    Returns:
+        aiohttp.web.AppRunner: Llamar a `await runner.cleanup()` para detenerlo.
+    """
+    from aiohttp import web
+
+    async def metrics(request):
+        return web.Response(text=registry.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,224 @@
+# Archivo: utils/notion_limiter.py
+# Límite global de peticiones a Notion con carriles de prioridad y manejo de Retry-After.
+
+import asyncio
+import collections
+import contextvars
+import email.utils
+import heapq
+import itertools
+import random
+import threading
+import time
+
+import httpx
+
+from utils.metrics import percentile
+
+# Carriles, de mayor a menor prioridad. Cuando hay cola, un carril solo avanza si no hay
+# peticiones esperando en un carril más prioritario.
+LANE_INTERACTIVE = 'interactive'  # Menús y flujos donde un usuario espera la respuesta
+LANE_SCHEDULER = 'scheduler'      # Mensajes programados
+LANE_ACTIVITY = 'activity'        # Registro de entradas/salidas de los canales de voz
+LANE_REPORTS = 'reports'          # Reportes y tareas de mantenimiento
+LANES = (LANE_INTERACTIVE, LANE_SCHEDULER, LANE_ACTIVITY, LANE_REPORTS)
+
+# Carril de la petición en curso. `NotionService.run` lo fija antes de llamar a Notion; las
+# llamadas que no indican carril van por el de menor prioridad.
+current_lane = contextvars.ContextVar('notion_lane', default=LANE_REPORTS)
+
+
+def retry_after_seconds(response: httpx.Response):
+    """Segundos indicados por la cabecera Retry-After (número o fecha HTTP), o None."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LaneMetrics:
+    """Tiempos de espera en la cola de un carril."""
+    def __init__(self):
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0  # Respuestas 429 recibidas en este carril
+        self.recent_waits = collections.deque(maxlen=500)
+
+    def record(self, waited: float):
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.recent_waits.append(waited)
+
+    def snapshot(self) -> dict:
+        return {
+            'requests': self.requests,
+            'avg_wait': self.total_wait / self.requests if self.requests else 0.0,
+            'p95_wait': percentile(self.recent_waits, 0.95),
+            'max_wait': self.max_wait,
+            'throttled': self.throttled,
+        }
+
+
+class PriorityRateLimiter:
+    """
+    Token bucket compartido por todas las peticiones a Notion (aprox. 3 por segundo por
+    integración). Las peticiones que tienen que esperar se atienden por prioridad de carril
+    y, dentro de un carril, por orden de llegada.
+
+    Es seguro usarlo desde varios hilos: las llamadas a Notion se hacen fuera del event loop
+    (ver `NotionService.run`), así que esperar un turno nunca bloquea al bot.
+    """
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = []  # heap de (prioridad, orden de llegada)
+        self._order = itertools.count()
+        self.metrics = {lane: LaneMetrics() for lane in LANES}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, lane: str) -> float:
+        """
+        Espera un turno para hacer una petición en `lane`.
+
+        Returns:
+            float: Segundos esperados.
+        """
+        lane = lane if lane in self.metrics else LANE_REPORTS
+        ticket = (LANES.index(lane), next(self._order))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                is_next = self._waiting[0] == ticket
+                if is_next and now >= self.paused_until and self.tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self.tokens -= 1
+                    waited = now - start
+                    self.metrics[lane].record(waited)
+                    # El siguiente en la cola vuelve a evaluar su turno
+                    self._cond.notify_all()
+                    return waited
+                if not is_next:
+                    timeout = None  # Se despierta cuando el primero de la cola avanza
+                elif now < self.paused_until:
+                    timeout = self.paused_until - now
+                else:
+                    timeout = (1 - self.tokens) / self.rate
+                self._cond.wait(timeout)
+
+    def throttle(self, lane: str, seconds: float):
+        """Detiene todas las peticiones durante `seconds` (tras un 429 de Notion)."""
+        with self._cond:
+            self.metrics.get(lane, self.metrics[LANE_REPORTS]).throttled += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {lane: metrics.snapshot() for lane, metrics in self.metrics.items()}
+
+
+class LaneSlots:
+    """
+    Plazas de los hilos que llaman a Notion, repartidas por prioridad de carril en el event loop,
+    antes de ocupar un hilo: una ráfaga de llamadas de baja prioridad espera aquí (sin hilo) en
+    lugar de llenar todos los hilos mientras espera turno en `PriorityRateLimiter`.
+
+    Hay `size` plazas; las últimas `reserved` solo las puede usar el carril interactivo, así
+    que un menú nunca espera a que termine una llamada de otro carril. Las llamadas que esperan
+    se atienden por carril y, dentro de un carril, por orden de llegada.
+    """
+    def __init__(self, size: int, reserved: int = 1):
+        self.size = max(1, size)
+        self.reserved = min(max(0, reserved), self.size - 1)
+        self.busy = 0
+        self._waiting = []  # heap de (prioridad, orden de llegada, future)
+        self._order = itertools.count()
+
+    def _has_room(self, lane: str) -> bool:
+        limit = self.size if lane == LANE_INTERACTIVE else self.size - self.reserved
+        return self.busy < limit
+
+    async def acquire(self, lane: str):
+        lane = lane if lane in LANES else LANE_REPORTS
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (LANES.index(lane), next(self._order), lane, future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # La plaza llegó justo cuando se canceló la espera
+            raise
+
+    def release(self):
+        self.busy -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiting:
+            _, _, lane, future = self._waiting[0]
+            if future.done():  # Espera cancelada
+                heapq.heappop(self._waiting)
+                continue
+            if not self._has_room(lane):
+                return
+            heapq.heappop(self._waiting)
+            self.busy += 1
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        return {'size': self.size, 'reserved': self.reserved, 'busy': self.busy, 'waiting': len(self._waiting)}
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    Transporte de httpx que pasa cada petición por el limitador y, si Notion responde 429,
+    espera lo indicado en Retry-After (o una espera exponencial) más un margen aleatorio
+    antes de reintentar.
+    """
+    def __init__(self, limiter: PriorityRateLimiter, transport: httpx.BaseTransport, max_retries: int = 3):
+        self.limiter = limiter
+        self.transport = transport
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        lane = current_lane.get()
+        attempt = 0
+        while True:
+            self.limiter.acquire(lane)
+            response = self.transport.handle_request(request)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = min(30.0, 2.0 ** attempt)
+            delay += random.uniform(0, 0.25 * delay + 0.1)
+            response.read()
+            response.close()
+            print(f"Advertencia: Notion respondió 429 (carril {lane}). Reintentando en {delay:.1f}s (intento {attempt}/{self.max_retries}).")
+            self.limiter.throttle(lane, delay)
+
+    def close(self):
+        self.transport.close()
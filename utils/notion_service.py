@@ -0,0 +1,160 @@
+# Archivo: utils/notion_service.py
+# Cliente de Notion compartido por todo el bot (una sola reserva de conexiones HTTP).
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from utils import metrics
+from utils.circuit_breaker import CircuitBreaker, CircuitBreakerTransport
+from utils.notion_limiter import LaneSlots, PriorityRateLimiter, RateLimitedTransport, current_lane
+
+
+class NotionService:
+    """
+    Único cliente de Notion del bot. Se crea en `bot.py` y se entrega a los cogs, las vistas
+    y el `DBManager` (como `bot.notion`), en lugar de que cada módulo construya el suyo.
+
+    - El cliente se crea la primera vez que se usa (`client`).
+    - Usa un `httpx.Client` con conexiones keep-alive: las llamadas seguidas reutilizan la
+      misma conexión TLS en lugar de pagar un handshake nuevo cada vez.
+    - Cuenta las peticiones y las conexiones abiertas (con la extensión `trace` de httpx)
+      para poder comprobar cuántas peticiones reutilizaron una conexión.
+    - Todas las peticiones pasan por un único limitador con carriles de prioridad
+      (`utils.notion_limiter`). Los cogs llaman a Notion con `await service.run(carril, ...)`,
+      que ejecuta la llamada en un hilo para que la espera no bloquee el event loop.
+    - Las llamadas usan sus propios hilos (`workers`), no los del executor por defecto de
+      asyncio, y esperan su plaza por carril antes de ocupar uno (`LaneSlots`), con
+      `interactive_workers` plazas reservadas para el carril interactivo.
+    - Un circuito (`utils.circuit_breaker`) corta las peticiones mientras Notion no responde:
+      fallan al instante en lugar de esperar `timeout` segundos cada una.
+    """
+    def __init__(self, token: str, max_connections: int = 4, keepalive_expiry: float = 30.0,
+                 rate_per_second: float = 3.0, burst: int = 3, max_retries: int = 3,
+                 timeout: float = 15.0, breaker_failures: int = 5, breaker_reset: float = 30.0,
+                 base_url: str = None, workers: int = 8, interactive_workers: int = 2):
+        self.token = token
+        self.base_url = base_url  # Otra URL de la API (por ejemplo, el Notion falso de benchmarks/)
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.limiter = PriorityRateLimiter(rate_per_second, burst)
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        self.slots = LaneSlots(workers, interactive_workers)
+        self._executor = None
+        self._client = None
+        self._http = None
+        self._lock = threading.Lock()  # El cliente puede usarse desde hilos (asyncio.to_thread)
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    @property
+    def client(self) -> "notion_client.Client":
+        """El cliente de Notion, creado la primera vez que se pide."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Se importa aquí: notion_client solo hace falta cuando se usa Notion por primera vez
+                    from notion_client import Client
+
+                    transport = httpx.HTTPTransport(limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=self.keepalive_expiry,
+                    ))
+                    self._http = httpx.Client(
+                        transport=CircuitBreakerTransport(
+                            self.breaker, RateLimitedTransport(self.limiter, transport, self.max_retries)
+                        ),
+                        timeout=self.timeout,
+                        event_hooks={"request": [self._on_request]},
+                    )
+                    options = {"base_url": self.base_url} if self.base_url else {}
+                    self._client = Client(auth=self.token, client=self._http, timeout_ms=int(self.timeout * 1000), **options)
+                    print("Cliente de Notion inicializado (conexiones compartidas).")
+        return self._client
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.token)
+
+    @property
+    def degraded(self) -> bool:
+        """True mientras el circuito no está cerrado (Notion no responde o se está probando)."""
+        return not self.breaker.is_closed
+
+    async def run(self, lane: str, func, *args, **kwargs):
+        """
+        Ejecuta una función que llama a Notion (por ejemplo un método de `DBManager`) en un
+        hilo, con sus peticiones en el carril `lane`. Cada llamada se mide con el nombre de la
+        función (por ejemplo `DBManager.get_resources`), incluida la espera en el limitador.
+        """
+        def call():
+            token = current_lane.set(lane)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current_lane.reset(token)
+        with metrics.timer(metrics.KIND_NOTION, getattr(func, '__qualname__', repr(func))):
+            await self.slots.acquire(lane)
+            loop = asyncio.get_running_loop()
+            try:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.slots.size, thread_name_prefix="notion")
+                future = self._executor.submit(contextvars.copy_context().run, call)
+            except BaseException:
+                self.slots.release()
+                raise
+            # La plaza se libera cuando el hilo termina, aunque quien esperaba se haya cancelado antes
+            future.add_done_callback(lambda _: self._release_from_thread(loop))
+            return await asyncio.wrap_future(future)
+
+    def _release_from_thread(self, loop):
+        try:
+            loop.call_soon_threadsafe(self.slots.release)
+        except RuntimeError:
+            pass  # El event loop ya se cerró
+
+    def close(self):
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+            self._http = None
+            self._client = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _on_request(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: dict):
+        # Eventos de httpcore: solo se emiten cuando se abre una conexión nueva
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Peticiones, conexiones abiertas, handshakes TLS y proporción de peticiones
+            que reutilizaron una conexión existente.
+        """
+        reused = max(0, self.requests - self.connections)
+        return {
+            'requests': self.requests,
+            'connections': self.connections,
+            'tls_handshakes': self.tls_handshakes,
+            'reused': reused,
+            'reuse_ratio': reused / self.requests if self.requests else 0.0,
+        }
@@ -1,44 +1,52 @@
 
-import os
-from notion_client import Client
 from datetime import datetime
 import config
 
-# Initialize Notion client
-notion = Client(auth=os.getenv("NOTION_TOKEN"))
+# Every function receives the bot's shared NotionService (`bot.notion`) as its first argument.
 
-def add_activity_log(id_member: str, entrada: bool, canal: str):
+def add_activity_log(notion_service, id_member: str, entrada: bool, canal: str, fecha_hora: str = None):
     """
     Adds a new activity log to the Notion database.
 
     Args:
+        notion_service (NotionService): The shared Notion client.
         id_member (str): The ID of the member.
         entrada (bool): True if the member is connecting, False if disconnecting.
         canal (str): The name of the channel.
+        fecha_hora (str, optional): ISO timestamp of the event. Defaults to now; spooled
+            logs pass the time at which the event actually happened.
+
+    Returns:
+        bool: True if the log was created.
     """
     try:
-        notion.pages.create(
+        notion_service.client.pages.create(
             parent={"database_id": config.NOTION_DATABASE_ACTIVIDAD_ID},
             properties={
                 "id_member": {"title": [{"text": {"content": id_member}}]},
-                "fecha_hora": {"date": {"start": datetime.now().isoformat()}},
+                "fecha_hora": {"date": {"start": fecha_hora or datetime.now().isoformat()}},
                 "entrada": {"checkbox": entrada},
                 "canal": {"rich_text": [{"text": {"content": canal}}]},
             },
         )
+        return True
     except Exception as e:
         print(f"Error adding activity log to Notion: {e}")
+        return False
 
-def get_activity_logs_for_today():
+def get_activity_logs_for_today(notion_service):
     """
     Retrieves all activity logs for the current day from the Notion database.
 
+    Args:
+        notion_service (NotionService): The shared Notion client.
+
     Returns:
         list: A list of activity log pages.
     """
     try:
         today = datetime.now().strftime("%Y-%m-%d")
-        response = notion.databases.query(
+        response = notion_service.client.databases.query(
             database_id=config.NOTION_DATABASE_ACTIVIDAD_ID,
             filter={
                 "property": "fecha_hora",
@@ -51,3 +59,62 @@ def get_activity_logs_for_today():
     except Exception as e:
         print(f"Error getting activity logs from Notion: {e}")
         return []
+
+def _rich_text(value) -> list:
+    """Formatea un valor como rich_text de Notion (máximo 2000 caracteres por bloque)."""
+    return [{"text": {"content": str(value or "")[:2000]}}]
+
+def _bug_report_properties(report: dict) -> dict:
+    properties = {
+        "reporte": {"title": [{"text": {"content": f"Bug #{report['id']}"}}]},
+        "plataforma": {"rich_text": _rich_text(report.get("platform"))},
+        "descripcion": {"rich_text": _rich_text(report.get("description"))},
+        "detalles": {"rich_text": _rich_text(report.get("details"))},
+        "reportero": {"rich_text": _rich_text(report.get("reporter_id"))},
+        "canal": {"rich_text": _rich_text(report.get("channel_id"))},
+        "estado": {"select": {"name": report.get("status")}},
+        "abierto": {"date": {"start": report.get("opened_at")}},
+    }
+    if report.get("resolved_at"):
+        properties["resuelto"] = {"date": {"start": report["resolved_at"]}}
+        properties["solucion"] = {"rich_text": _rich_text(report.get("solution"))}
+    return properties
+
+def add_bug_report(notion_service, report: dict):
+    """
+    Mirrors a new bug report into the Notion bugs database (if configured).
+
+    Args:
+        notion_service (NotionService): The shared Notion client.
+        report (dict): The bug report as stored in the local BugStore.
+
+    Returns:
+        str: The ID of the created Notion page, or None.
+    """
+    if not config.NOTION_DATABASE_BUGS_ID:
+        return None
+    try:
+        page = notion_service.client.pages.create(
+            parent={"database_id": config.NOTION_DATABASE_BUGS_ID},
+            properties=_bug_report_properties(report),
+        )
+        return page.get("id")
+    except Exception as e:
+        print(f"Error adding bug report to Notion: {e}")
+        return None
+
+def update_bug_report(notion_service, page_id: str, report: dict):
+    """
+    Updates the mirrored Notion page of a bug report (e.g. when it is resolved).
+
+    Args:
+        notion_service (NotionService): The shared Notion client.
+        page_id (str): The ID of the Notion page returned by `add_bug_report`.
+        report (dict): The bug report as stored in the local BugStore.
+    """
+    if not config.NOTION_DATABASE_BUGS_ID or not page_id:
+        return
+    try:
+        notion_service.client.pages.update(page_id=page_id, properties=_bug_report_properties(report))
+    except Exception as e:
+        print(f"Error updating bug report in Notion: {e}")
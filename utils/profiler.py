@@ -0,0 +1,145 @@
+# Archivo: utils/profiler.py
+# Perfilado bajo demanda del bot en producción: CPU por muestreo y memoria con tracemalloc.
+
+import collections
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def frame_label(code) -> str:
+    """'funcion (archivo:línea)' con la ruta relativa al proyecto o a site-packages."""
+    path = code.co_filename
+    if path.startswith(PROJECT_ROOT + os.sep):
+        path = os.path.relpath(path, PROJECT_ROOT)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Perfilador de CPU por muestreo: cada `interval` segundos copia la pila de todos los hilos
+    (`sys._current_frames`) y cuenta cuántas veces aparece cada pila. No instala ningún hook en
+    el intérprete, así que solo cuesta mientras se está ejecutando `run` (un hilo que se
+    despierta cada `interval`), y el código perfilado no se vuelve más lento.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._running = threading.Lock()  # Un solo perfil a la vez
+
+    @property
+    def busy(self) -> bool:
+        return self._running.locked()
+
+    def run(self, seconds: float) -> tuple:
+        """
+        Muestrea durante `seconds` segundos (bloquea: llamarlo con `asyncio.to_thread`).
+
+        Returns:
+            tuple: (collections.Counter {pila colapsada: muestras}, cantidad de muestras).
+        """
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("Ya hay un perfil de CPU en curso.")
+        try:
+            own = threading.get_ident()
+            stacks = collections.Counter()
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(frame_label(frame.f_code))
+                        frame = frame.f_back
+                    labels.append(names.get(ident, f"hilo-{ident}"))
+                    stacks[";".join(reversed(labels))] += 1
+                samples += 1
+                time.sleep(self.interval)
+            return stacks, samples
+        finally:
+            self._running.release()
+
+
+def collapse(stacks: collections.Counter) -> str:
+    """Formato 'pila colapsada' (una línea `f1;f2;f3 muestras`), el de flamegraph.pl y speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: collections.Counter, limit: int = 5) -> list:
+    """Funciones con más muestras propias (la más interna de cada pila): [(función, muestras)]."""
+    own = collections.Counter()
+    for stack, count in stacks.items():
+        own[stack.rsplit(";", 1)[-1]] += count
+    return own.most_common(limit)
+
+
+class MemoryTracker:
+    """
+    Asignaciones de memoria con tracemalloc durante una ventana acotada. El rastreo (que sí
+    tiene costo) solo está activo mientras dura `run`: toma una instantánea al empezar y otra
+    al terminar, y se apaga al final aunque algo falle.
+    """
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._running = threading.Lock()  # Una sola ventana a la vez
+        self._cancel = threading.Event()
+
+    @property
+    def busy(self) -> bool:
+        return self._running.locked()
+
+    @staticmethod
+    def _take():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def run(self, seconds: float, limit: int = 10) -> dict:
+        """
+        Rastrea la memoria durante `seconds` segundos (bloquea: llamarlo con `asyncio.to_thread`).
+
+        Returns:
+            dict: `current` y `peak` (bytes rastreados durante la ventana), `top` (las `limit`
+            líneas con más memoria asignada en la ventana y todavía viva) y `diff` (las que más
+            cambiaron entre el principio y el final).
+        """
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("Ya hay un rastreo de memoria en curso.")
+        try:
+            self._cancel.clear()
+            # Si el rastreo ya estaba activo (por ejemplo con PYTHONTRACEMALLOC) no se apaga al final
+            owned = not tracemalloc.is_tracing()
+            if owned:
+                tracemalloc.start(self.frames)
+            try:
+                first = self._take()
+                self._cancel.wait(seconds)
+                last = self._take()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                if owned:
+                    tracemalloc.stop()
+            return {
+                'current': current,
+                'peak': peak,
+                'top': last.statistics("lineno")[:limit],
+                'diff': last.compare_to(first, "lineno")[:limit],
+            }
+        finally:
+            self._running.release()
+
+    def stop(self):
+        """Termina antes de tiempo la ventana en curso (por ejemplo, al descargar el cog)."""
+        self._cancel.set()
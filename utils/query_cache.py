@@ -0,0 +1,168 @@
+# Archivo: utils/query_cache.py
+# Caché de resultados de consultas a Notion con vencimiento, stale-while-revalidate y límite de tamaño.
+
+import collections
+import threading
+import time
+
+
+class _Entry:
+    def __init__(self, value, ttl: float, stale_ttl: float):
+        self.value = value
+        self.fetched_at = time.monotonic()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class QueryCache:
+    """
+    Guarda el resultado de cada consulta durante `ttl` segundos.
+
+    - Hasta `ttl` segundos el resultado está fresco y se devuelve sin consultar.
+    - Entre `ttl` y `ttl + stale_ttl` segundos se devuelve igual en el momento (dato viejo),
+      y se vuelve a consultar en un hilo aparte para la próxima vez.
+    - Pasado ese tiempo se consulta de nuevo y quien pidió el dato espera el resultado.
+    - Con más de `max_entries` resultados se descarta el usado hace más tiempo.
+
+    Los errores de la consulta no se guardan: si la consulta falla, la excepción llega a
+    quien la pidió (o, en una actualización en segundo plano, se conserva el dato viejo).
+    Es seguro usarlo desde varios hilos.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, max_entries)
+        self._entries = collections.OrderedDict()  # {clave: _Entry}, del usado hace más tiempo al más reciente
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Cambia con cada invalidación: una consulta que empezó antes no guarda su resultado
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, loader, ttl: float, stale_ttl: float = 0.0):
+        """Devuelve el resultado guardado para `key` o lo obtiene con `loader()`."""
+        if ttl <= 0:
+            return loader()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = entry.age()
+                if age < entry.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry.value
+                if age < entry.ttl + entry.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh, args=(key, loader, ttl, stale_ttl, self._generation),
+                            name="notion-cache-refresh", daemon=True,
+                        ).start()
+                    return entry.value
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        self._store(key, value, ttl, stale_ttl, generation)
+        return value
+
+    def peek(self, key):
+        """El último resultado guardado para `key`, aunque esté vencido, o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    def refresh(self, key, loader):
+        """Vuelve a consultar `key` ahora (en este hilo), conservando su vencimiento."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            generation = self._generation
+        self._refresh(key, loader, entry.ttl, entry.stale_ttl, generation)
+
+    def export(self) -> list:
+        """Los resultados guardados, serializables a JSON (para la instantánea de arranque)."""
+        with self._lock:
+            return [
+                {"key": list(key), "value": entry.value, "ttl": entry.ttl, "stale_ttl": entry.stale_ttl}
+                for key, entry in self._entries.items()
+            ]
+
+    def restore(self, items: list):
+        """
+        Carga los resultados de `export`. Se cargan ya vencidos: se sirven en el momento y la
+        primera consulta (o una revalidación) los actualiza.
+        """
+        with self._lock:
+            for item in items[-self.max_entries:]:
+                entry = _Entry(item["value"], item["ttl"], item["stale_ttl"])
+                entry.fetched_at -= entry.ttl
+                self._entries[tuple(item["key"])] = entry
+
+    def _refresh(self, key, loader, ttl: float, stale_ttl: float, generation: int):
+        try:
+            value = loader()
+            self._store(key, value, ttl, stale_ttl, generation)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            print(f"Advertencia: No se pudo actualizar en segundo plano una consulta de Notion: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key, value, ttl: float, stale_ttl: float, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = _Entry(value, ttl, stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, prefix=None):
+        """
+        Descarta los resultados guardados cuya clave empieza por `prefix` (una tupla), o todos
+        si no se indica. Las consultas en curso tampoco guardarán su resultado.
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if prefix is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[:len(prefix)] == prefix]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,307 @@
+# Archivo: utils/questionnaire.py
+# Motor declarativo de cuestionarios (flujos de preguntas y respuestas) usado por los cogs.
+
+import json
+import os
+import time
+
+from utils.attachment_relay import attachment_metadata
+
+# Registro global de cuestionarios disponibles: {nombre: Questionnaire}
+# Cada cog registra sus cuestionarios al importarse con `register_questionnaire`.
+QUESTIONNAIRES = {}
+
+
+class Question:
+    """
+    Una pregunta de un cuestionario.
+
+    Args:
+        text (str): El texto que se envía al canal.
+        validator (callable, opcional): Función que recibe el `discord.Message` de respuesta y
+            devuelve un mensaje de error (str) si la respuesta no es válida, o None si lo es.
+        timeout (float, opcional): Segundos de espera para esta pregunta. Si es None se usa
+            el timeout del cuestionario.
+    """
+    def __init__(self, text: str, validator=None, timeout: float = None):
+        self.text = text
+        self.validator = validator
+        self.timeout = timeout
+
+
+class Questionnaire:
+    """
+    Definición declarativa de un cuestionario.
+
+    Args:
+        name (str): Nombre único del cuestionario (se guarda en las sesiones persistidas).
+        questions (list): Lista de objetos `Question`.
+        cog (str): Nombre del cog que implementa el manejador de finalización.
+        on_complete (str): Nombre del método del cog que se llama al terminar. Recibe
+            `(channel, member, answers, data)`. Los adjuntos de las respuestas llegan en
+            `data['attachments']`.
+        timeout (float, opcional): Segundos de espera por respuesta. None = sin límite.
+        timeout_message (str, opcional): Mensaje que se envía al canal si se agota el tiempo.
+    """
+    def __init__(self, name: str, questions: list, cog: str, on_complete: str,
+                 timeout: float = None, timeout_message: str = None):
+        self.name = name
+        self.questions = questions
+        self.cog = cog
+        self.on_complete = on_complete
+        self.timeout = timeout
+        self.timeout_message = timeout_message
+
+    def timeout_for(self, index: int):
+        """Devuelve el timeout (en segundos) de la pregunta en la posición `index`."""
+        question_timeout = self.questions[index].timeout
+        return question_timeout if question_timeout is not None else self.timeout
+
+
+def register_questionnaire(questionnaire: Questionnaire) -> Questionnaire:
+    """
+    Registra un cuestionario para que el motor pueda encontrarlo por su nombre.
+
+    Returns:
+        Questionnaire: El mismo cuestionario, para poder asignarlo a una constante del módulo.
+    """
+    QUESTIONNAIRES[questionnaire.name] = questionnaire
+    return questionnaire
+
+
+# --- VALIDADORES REUTILIZABLES ---
+
+def require_text(message):
+    """Valida que la respuesta tenga texto."""
+    if not message.content.strip():
+        return "❌ Por favor, responde con un mensaje de texto."
+    return None
+
+
+def require_text_or_attachment(message):
+    """Valida que la respuesta tenga texto o al menos un archivo adjunto."""
+    if not message.content.strip() and not message.attachments:
+        return "❌ Por favor, responde con un mensaje o adjunta un archivo."
+    return None
+
+
+class ConversationSession:
+    """
+    Estado de un cuestionario en curso para un usuario en un canal.
+    Es serializable para que los flujos abiertos sobrevivan a un reinicio del bot.
+    """
+    def __init__(self, channel_id: int, user_id: int, questionnaire: str,
+                 index: int = 0, answers: list = None, data: dict = None, deadline: float = None):
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.questionnaire = questionnaire
+        self.index = index
+        self.answers = answers if answers is not None else []
+        self.data = data if data is not None else {}
+        self.deadline = deadline
+
+    @property
+    def key(self):
+        return (self.channel_id, self.user_id)
+
+    def to_dict(self) -> dict:
+        return {
+            "channel_id": self.channel_id,
+            "user_id": self.user_id,
+            "questionnaire": self.questionnaire,
+            "index": self.index,
+            "answers": self.answers,
+            "data": self.data,
+            "deadline": self.deadline,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict):
+        return cls(
+            channel_id=raw["channel_id"],
+            user_id=raw["user_id"],
+            questionnaire=raw["questionnaire"],
+            index=raw.get("index", 0),
+            answers=raw.get("answers", []),
+            data=raw.get("data", {}),
+            deadline=raw.get("deadline"),
+        )
+
+
+class QuestionnaireEngine:
+    """
+    Motor que gestiona todas las sesiones de cuestionarios abiertas.
+
+    En lugar de registrar un `bot.wait_for` por pregunta (cuya función de verificación se
+    ejecuta contra cada mensaje del servidor), las sesiones se guardan en un diccionario
+    indexado por (channel_id, author_id): procesar un mensaje es una única búsqueda.
+    """
+    def __init__(self, bot, storage_path: str):
+        self.bot = bot
+        self.storage_path = storage_path
+        self.sessions = {}  # {(channel_id, user_id): ConversationSession}
+        self._dirty = False  # Hay cambios en `sessions` que todavía no se escribieron en disco
+
+    # --- PERSISTENCIA ---
+
+    def load(self):
+        """Carga las sesiones guardadas en disco (si existen)."""
+        if not os.path.exists(self.storage_path):
+            return
+        try:
+            with open(self.storage_path, "r", encoding="utf-8") as f:
+                raw_sessions = json.load(f)
+            for raw in raw_sessions:
+                session = ConversationSession.from_dict(raw)
+                self.sessions[session.key] = session
+            if self.sessions:
+                print(f"ℹ️ Se restauraron {len(self.sessions)} conversaciones abiertas.")
+        except Exception as e:
+            print(f"❌ Error al cargar las conversaciones guardadas: {e}")
+
+    def save(self):
+        """Guarda las sesiones abiertas en disco de forma atómica."""
+        try:
+            os.makedirs(os.path.dirname(self.storage_path) or ".", exist_ok=True)
+            tmp_path = f"{self.storage_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([s.to_dict() for s in self.sessions.values()], f, ensure_ascii=False)
+            os.replace(tmp_path, self.storage_path)
+        except Exception as e:
+            print(f"❌ Error al guardar las conversaciones: {e}")
+
+    def mark_dirty(self):
+        """
+        Anota que las sesiones cambiaron. No se escribe en disco en cada respuesta: `flush`
+        guarda los cambios pendientes desde el bucle de expiración (cada pocos segundos).
+        """
+        self._dirty = True
+
+    def flush(self):
+        """Guarda las sesiones en disco si hubo cambios desde el último guardado."""
+        if self._dirty:
+            self._dirty = False
+            self.save()
+
+    # --- CONSULTAS ---
+
+    def get_session(self, channel_id: int, user_id: int):
+        return self.sessions.get((channel_id, user_id))
+
+    def user_has_session(self, user_id: int, questionnaire: str = None) -> bool:
+        """Indica si el usuario tiene algún cuestionario abierto (opcionalmente de un tipo concreto)."""
+        return any(
+            s.user_id == user_id and (questionnaire is None or s.questionnaire == questionnaire)
+            for s in self.sessions.values()
+        )
+
+    # --- CICLO DE VIDA DE LAS SESIONES ---
+
+    def _deadline(self, questionnaire: Questionnaire, index: int):
+        timeout = questionnaire.timeout_for(index)
+        return time.time() + timeout if timeout else None
+
+    async def start(self, channel, member, name: str, data: dict = None, intro: str = None):
+        """
+        Abre un cuestionario para `member` en `channel` y envía la primera pregunta.
+        Si ya había una sesión abierta para ese par (canal, usuario) se reemplaza.
+
+        Args:
+            intro (str, opcional): Texto que se antepone a la primera pregunta en el mismo mensaje.
+        """
+        questionnaire = QUESTIONNAIRES[name]
+        session = ConversationSession(
+            channel_id=channel.id,
+            user_id=member.id,
+            questionnaire=name,
+            data=data,
+            deadline=self._deadline(questionnaire, 0),
+        )
+        self.sessions[session.key] = session
+        self.mark_dirty()
+
+        first_question = questionnaire.questions[0].text
+        await channel.send(f"{intro}\n\n{first_question}" if intro else first_question)
+        return session
+
+    def cancel(self, channel_id: int, user_id: int):
+        """Cierra una sesión sin llamar a su manejador de finalización."""
+        if self.sessions.pop((channel_id, user_id), None):
+            self.mark_dirty()
+
+    async def dispatch(self, message) -> bool:
+        """
+        Procesa un mensaje si pertenece a un cuestionario abierto.
+
+        Returns:
+            bool: True si el mensaje fue consumido como respuesta de un cuestionario.
+        """
+        session = self.sessions.get((message.channel.id, message.author.id))
+        if session is None:
+            return False
+
+        questionnaire = QUESTIONNAIRES.get(session.questionnaire)
+        if questionnaire is None:
+            print(f"Advertencia: Cuestionario desconocido '{session.questionnaire}'. Se descarta la sesión.")
+            self.cancel(*session.key)
+            return False
+
+        question = questionnaire.questions[session.index]
+        if question.validator:
+            error = question.validator(message)
+            if error:
+                await message.channel.send(error)
+                return True
+
+        # Actualizar el estado antes de cualquier `await` para que dos mensajes
+        # seguidos no respondan a la misma pregunta.
+        session.answers.append(message.content)
+        if message.attachments:
+            # Solo se guardan los metadatos (URL de la CDN, nombre, tamaño); nada se descarga aquí
+            session.data.setdefault('attachments', []).extend(
+                attachment_metadata(attachment) for attachment in message.attachments
+            )
+        session.index += 1
+
+        if session.index < len(questionnaire.questions):
+            session.deadline = self._deadline(questionnaire, session.index)
+            self.mark_dirty()
+            await message.channel.send(questionnaire.questions[session.index].text)
+            return True
+
+        del self.sessions[session.key]
+        self.mark_dirty()
+
+        cog = self.bot.get_cog(questionnaire.cog)
+        handler = getattr(cog, questionnaire.on_complete, None) if cog else None
+        if handler is None:
+            print(f"Advertencia: No se encontró el manejador '{questionnaire.cog}.{questionnaire.on_complete}'.")
+            return True
+        try:
+            await handler(message.channel, message.author, list(session.answers), dict(session.data))
+        except Exception as e:
+            print(f"❌ Error al finalizar el cuestionario '{questionnaire.name}': {e}")
+        return True
+
+    async def expire_sessions(self, now: float = None):
+        """
+        Cierra las sesiones cuyo tiempo de espera se agotó, avisa en su canal y guarda en disco
+        los cambios pendientes.
+        """
+        now = now if now is not None else time.time()
+        expired = [s for s in self.sessions.values() if s.deadline is not None and s.deadline <= now]
+        for session in expired:
+            del self.sessions[session.key]
+        if expired:
+            self.mark_dirty()
+        self.flush()
+
+        for session in expired:
+            questionnaire = QUESTIONNAIRES.get(session.questionnaire)
+            channel = self.bot.get_channel(session.channel_id)
+            if not channel or not questionnaire or not questionnaire.timeout_message:
+                continue
+            try:
+                await channel.send(questionnaire.timeout_message)
+            except Exception as e:
+                print(f"Error al notificar el fin del tiempo en el canal {session.channel_id}: {e}")
@@ -0,0 +1,71 @@
+# Archivo: utils/single_flight.py
+# Agrupa consultas idénticas que están en curso al mismo tiempo en una sola petición.
+
+import threading
+
+
+class _Call:
+    """Una consulta en curso y su resultado (o su error), compartido por todos los que la esperan."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Si llega una consulta con la misma clave que otra que todavía no terminó, en lugar de
+    repetirla espera a la primera y recibe su mismo resultado (o su misma excepción).
+
+    No es una caché: en cuanto la consulta termina, la siguiente con esa clave vuelve a
+    consultar. Es seguro usarlo desde varios hilos (las llamadas a Notion se hacen con
+    `NotionService.run`, cada una en su hilo).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # {clave: _Call en curso}
+        self.executed = 0   # Consultas que llegaron a Notion
+        self.coalesced = 0  # Consultas que reutilizaron una en curso
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Consultas ejecutadas, consultas agrupadas y proporción de consultas que
+            no llegaron a Notion por haberse agrupado con otra.
+        """
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'coalescing_ratio': self.coalesced / total if total else 0.0,
+            }
@@ -0,0 +1,39 @@
+# Archivo: utils/startup_timer.py
+# Tiempos de cada fase del arranque del bot, desde que se empieza a ejecutar bot.py hasta on_ready.
+
+import time
+
+
+class StartupTimer:
+    """
+    Marca el final de cada fase del arranque (`mark`) y muestra el desglose (`report`).
+    Los tiempos de carga de cada cog se guardan aparte con `cog` porque se cargan en paralelo.
+    """
+    def __init__(self, start: float = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []  # [(fase, segundos)]
+        self.cogs = {}    # {cog: segundos}
+        self.reported = False
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def cog(self, name: str, seconds: float):
+        self.cogs[name] = seconds
+
+    def total(self) -> float:
+        return self.last - self.start
+
+    def report(self):
+        """Imprime el desglose una sola vez (on_ready se repite en cada reconexión)."""
+        if self.reported:
+            return
+        self.reported = True
+        print(f"ℹ️ Arranque completo en {self.total() * 1000:.0f} ms:")
+        for phase, seconds in self.phases:
+            print(f"  -> {phase}: {seconds * 1000:.0f} ms")
+        for name, seconds in sorted(self.cogs.items(), key=lambda item: -item[1]):
+            print(f"     · {name}: {seconds * 1000:.0f} ms")
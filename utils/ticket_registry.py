@@ -0,0 +1,177 @@
+# Archivo: utils/ticket_registry.py
+# Registro en memoria (persistido en SQLite) de los canales de tickets abiertos.
+
+import re
+import datetime
+
+from utils.local_db import open_connection
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    channel_id INTEGER PRIMARY KEY,
+    member_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    category_id INTEGER,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_member ON tickets (member_id);
+"""
+
+KIND_BUG = 'bug'
+KIND_ONBOARDING = 'onboarding'
+
+
+class Ticket:
+    """Un canal de ticket abierto y el miembro al que pertenece."""
+    def __init__(self, channel_id: int, member_id: int, kind: str, category_id: int = None, created_at: str = None):
+        self.channel_id = channel_id
+        self.member_id = member_id
+        self.kind = kind
+        self.category_id = category_id
+        self.created_at = created_at or datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+# Marca que el bot pone en el topic de cada canal de ticket que crea. Permite recuperar un
+# ticket que falte en el registro (por ejemplo, si se perdió la base) sin confundirlo con los
+# canales creados a mano en las mismas categorías.
+TICKET_MARKER = re.compile(r"\[ticket:(\w+):(\d+)\]")
+
+
+def ticket_marker(kind: str, member_id: int) -> str:
+    return f"[ticket:{kind}:{member_id}]"
+
+
+def parse_ticket_marker(topic: str):
+    """
+    Returns:
+        tuple: (tipo, member_id) de la marca del topic, o None si el canal no la tiene.
+    """
+    match = TICKET_MARKER.search(topic or "")
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+class TicketRegistry:
+    """
+    Índices en memoria de los tickets abiertos:
+
+    - `by_channel`: channel_id -> Ticket
+    - `by_member`: member_id -> {channel_id, ...}
+
+    Todas las consultas son O(1). Cada cambio se guarda también en SQLite para que el
+    registro sobreviva a los reinicios; al iniciar se reconcilia con las categorías reales.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = None
+        self.by_channel = {}
+        self.by_member = {}
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = open_connection(self.db_path)
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def load(self):
+        """Carga en memoria los tickets guardados."""
+        self.by_channel.clear()
+        self.by_member.clear()
+        for row in self.connect().execute("SELECT * FROM tickets"):
+            self._index(Ticket(row['channel_id'], row['member_id'], row['kind'], row['category_id'], row['created_at']))
+
+    def _index(self, ticket: Ticket):
+        self.by_channel[ticket.channel_id] = ticket
+        self.by_member.setdefault(ticket.member_id, set()).add(ticket.channel_id)
+
+    def _unindex(self, channel_id: int):
+        ticket = self.by_channel.pop(channel_id, None)
+        if ticket is None:
+            return None
+        channels = self.by_member.get(ticket.member_id)
+        if channels is not None:
+            channels.discard(channel_id)
+            if not channels:
+                del self.by_member[ticket.member_id]
+        return ticket
+
+    # --- CONSULTAS ---
+
+    def get(self, channel_id: int, kind: str = None):
+        """Devuelve el ticket del canal (opcionalmente solo si es de un tipo concreto)."""
+        ticket = self.by_channel.get(channel_id)
+        if ticket is not None and kind is not None and ticket.kind != kind:
+            return None
+        return ticket
+
+    def open_for_member(self, member_id: int, kind: str = None) -> list:
+        """Tickets abiertos de un miembro."""
+        return [
+            self.by_channel[channel_id] for channel_id in self.by_member.get(member_id, ())
+            if kind is None or self.by_channel[channel_id].kind == kind
+        ]
+
+    # --- CAMBIOS ---
+
+    def add(self, channel_id: int, member_id: int, kind: str, category_id: int = None) -> Ticket:
+        ticket = Ticket(channel_id, member_id, kind, category_id)
+        self._unindex(channel_id)
+        self._index(ticket)
+        conn = self.connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO tickets (channel_id, member_id, kind, category_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (ticket.channel_id, ticket.member_id, ticket.kind, ticket.category_id, ticket.created_at)
+        )
+        conn.commit()
+        return ticket
+
+    def remove(self, channel_id: int):
+        ticket = self._unindex(channel_id)
+        if ticket is not None:
+            conn = self.connect()
+            conn.execute("DELETE FROM tickets WHERE channel_id = ?", (channel_id,))
+            conn.commit()
+        return ticket
+
+    def move(self, channel_id: int, category_id: int):
+        """Actualiza la categoría de un ticket (por ejemplo, al archivarlo)."""
+        ticket = self.by_channel.get(channel_id)
+        if ticket is None or ticket.category_id == category_id:
+            return
+        ticket.category_id = category_id
+        conn = self.connect()
+        conn.execute("UPDATE tickets SET category_id = ? WHERE channel_id = ?", (category_id, channel_id))
+        conn.commit()
+
+    def rebuild_from_categories(self, categories: list, kind: str):
+        """
+        Reconcilia el registro con los canales reales de un grupo de categorías (la base, sus
+        desbordes y su archivo) en una sola pasada: descarta los tickets de ese tipo cuyo canal
+        ya no existe y registra los que faltan, solo si el canal tiene la marca del bot en el
+        topic (`ticket_marker`). El resto de canales de las categorías no se toca.
+        """
+        present = set()
+        added = 0
+        for category in categories:
+            for channel in category.text_channels:
+                present.add(channel.id)
+                if channel.id in self.by_channel:
+                    self.move(channel.id, category.id)
+                    continue
+                marker = parse_ticket_marker(channel.topic)
+                if marker is not None and marker[0] == kind:
+                    self.add(channel.id, marker[1], kind, category.id)
+                    added += 1
+
+        stale = [
+            ticket.channel_id for ticket in self.by_channel.values()
+            if ticket.kind == kind and ticket.channel_id not in present
+        ]
+        for channel_id in stale:
+            self.remove(channel_id)
+        return added, len(stale)
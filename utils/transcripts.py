@@ -0,0 +1,61 @@
+# Archivo: utils/transcripts.py
+# Exportación de la conversación de un canal de ticket a un archivo JSONL comprimido.
+
+import datetime
+import gzip
+import json
+import os
+
+import discord
+
+from utils.attachment_relay import attachment_metadata
+
+
+def message_record(message: discord.Message) -> dict:
+    """Una línea del transcript. Los adjuntos se guardan como referencia (URL de la CDN), sin descargarlos."""
+    return {
+        "id": message.id,
+        "created_at": message.created_at.isoformat(),
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "bot": message.author.bot,
+        "content": message.content,
+        "attachments": [attachment_metadata(attachment) for attachment in message.attachments],
+        "embeds": len(message.embeds),
+        "reply_to": message.reference.message_id if message.reference else None,
+    }
+
+
+def transcript_path(directory: str, channel: discord.abc.GuildChannel) -> str:
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return os.path.join(directory, f"{channel.id}-{timestamp}.jsonl.gz")
+
+
+async def export_transcript(channel: discord.TextChannel, path: str) -> int:
+    """
+    Escribe el historial completo de `channel` (del más antiguo al más reciente) en `path`
+    como JSONL comprimido con gzip.
+
+    `channel.history` pide los mensajes a Discord de a páginas de 100 y cada mensaje se
+    escribe en cuanto llega, así que la memoria usada no depende de la cantidad de mensajes
+    del canal. El archivo se escribe primero con otro nombre y se renombra al terminar, para
+    que nunca quede un transcript a medias con el nombre final.
+
+    Returns:
+        int: Cantidad de mensajes exportados.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            async for message in channel.history(limit=None, oldest_first=True):
+                f.write(json.dumps(message_record(message), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
@@ -2,14 +2,18 @@
 
 import discord
 import asyncio
-import config # Importa la configuración para acceder a user_conversations
-# Importamos el DBManager para interactuar con la base de datos de recursos
-from database.db_manager import DBManager
+import config # Importa la configuración para acceder a los IDs de contacto
+from utils.instrumentation import InstrumentedView
+from utils.notion_limiter import LANE_INTERACTIVE
 
-# Instancia global del DBManager para ser utilizada por las vistas
-db_manager = DBManager()
 
-class CloseTicketView(discord.ui.View):
+def cached_notice(bot) -> str:
+    """Aviso para los menús de recursos cuando Notion no responde y se muestran datos guardados."""
+    if bot.notion.degraded:
+        return "\n⚠️ *Notion no responde en este momento: se muestran datos en caché.*"
+    return ""
+
+class CloseTicketView(InstrumentedView):
     """
     Vista que contiene un botón para cerrar un canal de ticket.
     """
@@ -47,7 +51,12 @@ class CloseTicketView(discord.ui.View):
 
         await asyncio.sleep(5) # Espera 5 segundos antes de eliminar el canal
         try:
-            await self.channel_to_close.delete()
+            # Guardar la conversación antes de eliminar el canal
+            ticket_cog = interaction.client.get_cog('TicketManagement')
+            if ticket_cog:
+                await ticket_cog.close_ticket_channel(self.channel_to_close)
+            else:
+                await self.channel_to_close.delete()
         except discord.Forbidden:
             await interaction.followup.send("❌ No tengo permisos para eliminar este canal. Por favor, contacta a un administrador.", ephemeral=True)
         except Exception as e:
@@ -55,13 +64,14 @@ class CloseTicketView(discord.ui.View):
             print(f"Error al cerrar el canal {self.channel_to_close.name}: {e}")
 
 
-class ResourceDisplayView(discord.ui.View):
+class ResourceDisplayView(InstrumentedView):
     """
     Vista para mostrar los recursos finales encontrados.
     """
-    def __init__(self, resources: list, current_difficulty: str, current_category: str, current_subcategory: str = None):
+    def __init__(self, resources: list, current_difficulty: str, current_category: str, current_subcategory: str = None, notice: str = ""):
         super().__init__(timeout=180) # 3 minutos de timeout
         self.resources = resources
+        self.notice = notice # Aviso de datos en caché (ver `cached_notice`)
         self.current_difficulty = current_difficulty
         self.current_category = current_category
         self.current_subcategory = current_subcategory
@@ -91,7 +101,7 @@ class ResourceDisplayView(discord.ui.View):
             response_message = f"📚 **Recursos encontrados para '{self.current_category}'"
             if self.current_subcategory:
                 response_message += f" (Subcategoría: '{self.current_subcategory}')"
-            response_message += f" (Dificultad: '{self.current_difficulty}'):**\n\n"
+            response_message += f" (Dificultad: '{self.current_difficulty}'):**{self.notice}\n\n"
 
             for i, res in enumerate(self.resources):
                 response_message += (
@@ -113,22 +123,22 @@ class ResourceDisplayView(discord.ui.View):
                 f"No se encontraron recursos para la dificultad `{self.current_difficulty}`, "
                 f"categoría `{self.current_category}`"
                 f"{f' y subcategoría `{self.current_subcategory}`' if self.current_subcategory else ''}. "
-                "Intenta con otra selección.", ephemeral=False, view=self
+                f"Intenta con otra selección.{self.notice}", ephemeral=False, view=self
             )
 
 
-class SubcategorySelectionView(discord.ui.View):
+class SubcategorySelectionView(InstrumentedView):
     """
     Vista para seleccionar una subcategoría de recursos.
     """
-    def __init__(self, bot, difficulty: str, category: str):
+    def __init__(self, bot, difficulty: str, category: str, subcategories: list = None):
         super().__init__(timeout=180)
         self.bot = bot
         self.difficulty = difficulty
         self.category = category
         self.message = None
 
-        self._add_subcategory_buttons()
+        self._add_subcategory_buttons(subcategories)
 
     async def on_timeout(self):
         """
@@ -146,14 +156,13 @@ class SubcategorySelectionView(discord.ui.View):
             except Exception as e:
                 print(f"Error al editar mensaje de SubcategorySelectionView en timeout: {e}")
 
-    def _add_subcategory_buttons(self):
-        """Añade botones para cada subcategoría disponible."""
-        if not db_manager.connect():
+    def _add_subcategory_buttons(self, subcategories: list):
+        """Añade botones para cada subcategoría disponible (None si no se pudo consultar la DB)."""
+        if subcategories is None:
             print("Error: No se pudo conectar a la base de datos para obtener subcategorías.")
             self.add_item(discord.ui.Button(label="Error de DB", style=discord.ButtonStyle.red, disabled=True))
             return
 
-        subcategories = db_manager.get_distinct_subcategories(difficulty=self.difficulty, category=self.category)
         if not subcategories:
             self.add_item(discord.ui.Button(label="No hay subcategorías disponibles", style=discord.ButtonStyle.grey, disabled=True))
             return
@@ -173,13 +182,13 @@ class SubcategorySelectionView(discord.ui.View):
         """
         await interaction.response.defer() # Deferir la respuesta para dar tiempo a la DB
         
-        resources = db_manager.get_resources(category=self.category, difficulty=self.difficulty)
+        resources = await self.bot.notion.run(LANE_INTERACTIVE, self.bot.db_manager.get_resources, category=self.category, difficulty=self.difficulty)
         
         for item in self.children:
             item.disabled = True
         await interaction.message.edit(content=f"Mostrando recursos para '{self.category}' (Dificultad: '{self.difficulty}').", view=self)
 
-        resource_view = ResourceDisplayView(resources, self.difficulty, self.category)
+        resource_view = ResourceDisplayView(resources, self.difficulty, self.category, notice=cached_notice(self.bot))
         await resource_view.send_resources(interaction)
 
 
@@ -190,7 +199,9 @@ class SubcategorySelectionView(discord.ui.View):
         if interaction.data and interaction.data.get("custom_id", "").startswith("subcat_"):
             selected_subcategory = interaction.data["custom_id"].replace("subcat_", "")
             await interaction.response.defer() # Deferir la respuesta para dar tiempo a la DB
-            resources = db_manager.get_resources(
+            resources = await self.bot.notion.run(
+                LANE_INTERACTIVE,
+                self.bot.db_manager.get_resources,
                 category=self.category,
                 subcategory=selected_subcategory,
                 difficulty=self.difficulty
@@ -199,23 +210,31 @@ class SubcategorySelectionView(discord.ui.View):
                 item.disabled = True
             await interaction.message.edit(content=f"Has seleccionado la subcategoría: **{selected_subcategory.title()}** (Categoría: {self.category.title()}, Dificultad: {self.difficulty.title()}).", view=self)
             
-            resource_view = ResourceDisplayView(resources, self.difficulty, self.category, selected_subcategory)
+            resource_view = ResourceDisplayView(resources, self.difficulty, self.category, selected_subcategory, notice=cached_notice(self.bot))
             await resource_view.send_resources(interaction)
             return False # No continuar con otros botones en esta interacción
         return True # Permitir que otros botones se procesen
 
 
-class CategorySelectionView(discord.ui.View):
+class CategorySelectionView(InstrumentedView):
     """
     Vista para seleccionar una categoría de recursos.
     """
-    def __init__(self, bot, difficulty: str):
+    def __init__(self, bot, difficulty: str, categories: list = None):
         super().__init__(timeout=180)
         self.bot = bot
         self.difficulty = difficulty
         self.message = None
 
-        self._add_category_buttons()
+        self._add_category_buttons(categories)
+
+    @classmethod
+    async def create(cls, bot, difficulty: str):
+        """Consulta las categorías en Notion (sin bloquear el bot) y construye la vista."""
+        categories = None
+        if bot.db_manager.connect():
+            categories = await bot.notion.run(LANE_INTERACTIVE, bot.db_manager.get_distinct_categories, difficulty=difficulty)
+        return cls(bot, difficulty, categories)
 
     async def on_timeout(self):
         """
@@ -233,14 +252,13 @@ class CategorySelectionView(discord.ui.View):
             except Exception as e:
                 print(f"Error al editar mensaje de CategorySelectionView en timeout: {e}")
 
-    def _add_category_buttons(self):
-        """Añade botones para cada categoría disponible."""
-        if not db_manager.connect():
+    def _add_category_buttons(self, categories: list):
+        """Añade botones para cada categoría disponible (None si no se pudo consultar la DB)."""
+        if categories is None:
             print("Error: No se pudo conectar a la base de datos para obtener categorías.")
             self.add_item(discord.ui.Button(label="Error de DB", style=discord.ButtonStyle.red, disabled=True))
             return
 
-        categories = db_manager.get_distinct_categories(difficulty=self.difficulty)
         if not categories:
             self.add_item(discord.ui.Button(label="No hay categorías disponibles", style=discord.ButtonStyle.grey, disabled=True))
             return
@@ -266,17 +284,17 @@ class CategorySelectionView(discord.ui.View):
             await interaction.message.edit(content=f"Has seleccionado la categoría: **{selected_category.title()}** (Dificultad: {self.difficulty.title()}).", view=self)
 
             # Obtener subcategorías para la dificultad y categoría seleccionadas
-            subcategories = db_manager.get_distinct_subcategories(difficulty=self.difficulty, category=selected_category)
+            subcategories = await self.bot.notion.run(LANE_INTERACTIVE, self.bot.db_manager.get_distinct_subcategories, difficulty=self.difficulty, category=selected_category)
             print(f"Subcategorías encontradas para '{selected_category}': {subcategories}") # DEBUG: Para ver qué devuelve la DB
             if subcategories:
-                subcategory_view = SubcategorySelectionView(self.bot, self.difficulty, selected_category)
-                await interaction.followup.send("Por favor, selecciona una subcategoría o ver todos:", view=subcategory_view)
+                subcategory_view = SubcategorySelectionView(self.bot, self.difficulty, selected_category, subcategories)
+                await interaction.followup.send(f"Por favor, selecciona una subcategoría o ver todos:{cached_notice(self.bot)}", view=subcategory_view)
                 subcategory_view.message = interaction.message # Asignar el mensaje para timeout
                 print("Subcategorías encontradas, enviando vista de selección.")
             else:
                 # Si no hay subcategorías, ir directamente a mostrar recursos de la categoría
-                resources = db_manager.get_resources(category=selected_category, difficulty=self.difficulty)
-                resource_view = ResourceDisplayView(resources, self.difficulty, selected_category)
+                resources = await self.bot.notion.run(LANE_INTERACTIVE, self.bot.db_manager.get_resources, category=selected_category, difficulty=self.difficulty)
+                resource_view = ResourceDisplayView(resources, self.difficulty, selected_category, notice=cached_notice(self.bot))
                 await resource_view.send_resources(interaction)
                 print("No se encontraron subcategorías, mostrando recursos directamente.")
             return False # No continuar con otros botones en esta interacción
@@ -284,16 +302,24 @@ class CategorySelectionView(discord.ui.View):
         return True # Permitir que otros botones se procesen
 
 
-class DifficultySelectionView(discord.ui.View):
+class DifficultySelectionView(InstrumentedView):
     """
     Vista para seleccionar la dificultad de los recursos.
     """
-    def __init__(self, bot):
+    def __init__(self, bot, difficulties: list = None):
         super().__init__(timeout=180) # 3 minutos de timeout
         self.bot = bot
         self.message = None # Para almacenar el mensaje
 
-        self._add_difficulty_buttons()
+        self._add_difficulty_buttons(difficulties)
+
+    @classmethod
+    async def create(cls, bot):
+        """Consulta las dificultades en Notion (sin bloquear el bot) y construye la vista."""
+        difficulties = None
+        if bot.db_manager.connect():
+            difficulties = await bot.notion.run(LANE_INTERACTIVE, bot.db_manager.get_distinct_difficulties)
+        return cls(bot, difficulties)
 
     async def on_timeout(self):
         """
@@ -311,14 +337,13 @@ class DifficultySelectionView(discord.ui.View):
             except Exception as e:
                 print(f"Error al editar mensaje de DifficultySelectionView en timeout: {e}")
 
-    def _add_difficulty_buttons(self):
-        """Añade botones para cada dificultad disponible."""
-        if not db_manager.connect():
+    def _add_difficulty_buttons(self, difficulties: list):
+        """Añade botones para cada dificultad disponible (None si no se pudo consultar la DB)."""
+        if difficulties is None:
             print("Error: No se pudo conectar a la base de datos para obtener dificultades. Asegúrate de que la DB esté corriendo y las credenciales sean correctas.")
             self.add_item(discord.ui.Button(label="Error de DB", style=discord.ButtonStyle.red, disabled=True))
             return
 
-        difficulties = db_manager.get_distinct_difficulties()
         print(f"Dificultades obtenidas de la DB: {difficulties}") # DEBUG: Para ver qué devuelve la DB
         
         if not difficulties:
@@ -346,8 +371,8 @@ class DifficultySelectionView(discord.ui.View):
             await interaction.message.edit(content=f"Has seleccionado la dificultad: **{selected_difficulty.title()}**.", view=self)
 
             # Crear y enviar la siguiente vista de selección de categoría
-            category_view = CategorySelectionView(self.bot, selected_difficulty)
-            await interaction.followup.send("Por favor, selecciona una categoría:", view=category_view)
+            category_view = await CategorySelectionView.create(self.bot, selected_difficulty)
+            await interaction.followup.send(f"Por favor, selecciona una categoría:{cached_notice(self.bot)}", view=category_view)
             category_view.message = interaction.message # Asignar el mensaje para timeout
             return False # No continuar con otros botones en esta interacción
 
@@ -355,7 +380,7 @@ class DifficultySelectionView(discord.ui.View):
 
 
 # Nueva clase de vista para la selección de contacto humano
-class HumanSelectionView(discord.ui.View):
+class HumanSelectionView(InstrumentedView):
     """
     Vista para seleccionar a la persona de contacto (Valery o Belu).
     """
@@ -415,18 +440,15 @@ class HumanSelectionView(discord.ui.View):
         await interaction.message.edit(content=interaction.message.content + f"\n\nHas seleccionado a: <@{human_id}>", view=self)
 
         self.selected_human_id = human_id
-        # Iniciar el estado de la conversación con la primera pregunta
-        config.user_conversations[self.original_user_id]['state'] = 1
-        config.user_conversations[self.original_user_id]['selected_human'] = self.selected_human_id
-
-        await interaction.followup.send(
-            "¡Perfecto! Para poder ayudarte mejor, por favor, responde las preguntas:\n\n"
-            "**1. Describe el problema o dificultad que encontraste. Sé específico y da todos los detalles necesarios para que podamos ayudarte mejor.**",
-            ephemeral=False
-        )
+        # Iniciar el cuestionario en este canal con la primera pregunta
+        human_cog = self.bot.get_cog('HumanInteraction')
+        if not human_cog:
+            await interaction.followup.send("❌ Error interno: El módulo de contacto humano no está cargado. Contacta a un administrador.", ephemeral=True)
+            return
+        await human_cog.start_human_contact_flow(interaction.channel, interaction.user, self.selected_human_id)
 
 
-class MainMenuView(discord.ui.View):
+class MainMenuView(InstrumentedView):
     """
     Vista del menú principal del bot, presentando opciones iniciales con botones.
     """
@@ -491,9 +513,9 @@ class MainMenuView(discord.ui.View):
         await interaction.message.edit(content="Has seleccionado 'Necesito un Recurso'. Iniciando búsqueda...", view=self)
 
         # Crear y enviar la vista de selección de dificultad en el mismo canal
-        difficulty_view = DifficultySelectionView(self.bot)
+        difficulty_view = await DifficultySelectionView.create(self.bot)
         # El mensaje se envía a través de `followup` ya que la interacción ya fue diferida
-        difficulty_view.message = await interaction.followup.send("Por favor, selecciona la dificultad del recurso:", view=difficulty_view)
+        difficulty_view.message = await interaction.followup.send(f"Por favor, selecciona la dificultad del recurso:{cached_notice(self.bot)}", view=difficulty_view)
 
 
     @discord.ui.button(label="Consultores", style=discord.ButtonStyle.danger, custom_id="human_contact", emoji="🙋")
@@ -511,12 +533,12 @@ class MainMenuView(discord.ui.View):
         await interaction.message.edit(content="Has seleccionado 'Consultores'. ¿Con quién te gustaría hablar?", view=self)
 
         user_id = interaction.user.id
-        if user_id in config.user_conversations and config.user_conversations[user_id]['state'] != 0:
+        conversations = self.bot.get_cog('Conversations')
+        if conversations and conversations.has_open_questionnaire(user_id, 'human_contact'):
             await interaction.followup.send("Ya tienes una conversación en curso para contactar a un humano. Por favor, completa esa conversación o espera.", ephemeral=True)
             return
 
-        # 3. Inicializa el estado de la conversación (state 0) y envía la nueva vista de selección
-        config.user_conversations[user_id] = {'state': 0, 'answers': [], 'channel_id': None, 'selected_human': None}
+        # 3. Envía la nueva vista de selección (el cuestionario empieza al elegir a la persona)
         human_selection_view = HumanSelectionView(self.bot, user_id)
         # Es crucial asignar el mensaje a la vista para que el on_timeout pueda editarlo
         human_selection_view.message = await interaction.followup.send("Por favor, selecciona con quién quieres hablar:", view=human_selection_view)